@@ -22,11 +22,12 @@ import time
 from glusto.core import Glusto as g
 from glustolibs.gluster.brickmux_ops import is_brick_mux_enabled
 from glustolibs.gluster.gluster_init import restart_glusterd
-from glustolibs.gluster.volume_ops import (get_volume_info, get_volume_status)
+from glustolibs.gluster.volume_ops import (
+    get_volume_info, get_volume_status, invalidate_volume_snapshot_cache)
 from glustolibs.gluster.volume_libs import (get_subvols,
                                             get_client_quorum_info,
                                             get_volume_type_info)
-from glustolibs.gluster.lib_utils import (get_extended_attributes_info)
+from glustolibs.gluster.lib_utils import wait_for_condition
 
 
 def get_all_bricks(mnode, volname):
@@ -96,6 +97,9 @@ def bring_bricks_offline(volname, bricks_list,
         node, _ = brick.split(":")
         node_list.append(node)
 
+    # Brick status of the volume changes irrespective of the result
+    invalidate_volume_snapshot_cache(volname)
+
     if is_brick_mux_enabled(node_list[0]):
         _rc = True
         failed_to_bring_offline_list = []
@@ -122,6 +126,8 @@ def bring_bricks_offline(volname, bricks_list,
                 failed_to_bring_offline_list.append(brick)
                 _rc = False
 
+        # Drop whatever was cached while the bricks were going down
+        invalidate_volume_snapshot_cache(volname)
         if not _rc:
             g.log.error("Unable to bring some of the bricks %s offline",
                         failed_to_bring_offline_list)
@@ -150,8 +156,11 @@ def bring_bricks_offline(volname, bricks_list,
         else:
             g.log.error("Invalid method '%s' to bring brick offline",
                         bring_brick_offline_method)
+            invalidate_volume_snapshot_cache(volname)
             return False
 
+    # Drop whatever was cached while the bricks were going down
+    invalidate_volume_snapshot_cache(volname)
     if not _rc:
         g.log.error("Unable to bring some of the bricks %s offline",
                     failed_to_bring_offline_list)
@@ -236,10 +245,13 @@ def bring_bricks_online(mnode, volname, bricks_list,
         else:
             g.log.error("Invalid method '%s' to bring brick online",
                         bring_brick_online_method)
+            invalidate_volume_snapshot_cache(volname)
             return False
 
+    invalidate_volume_snapshot_cache(volname)
     g.log.info("Waiting for 30 seconds for all the bricks to be online")
     time.sleep(30)
+    invalidate_volume_snapshot_cache(volname)
     return _rc
 
 
@@ -257,7 +269,7 @@ def are_bricks_offline(mnode, volname, bricks_list):
     """
     _rc = True
     online_bricks_list = []
-    volume_status = get_volume_status(mnode, volname)
+    volume_status = get_volume_status(mnode, volname, use_cache=False)
     if not volume_status:
         g.log.error("Unable to check if bricks are offline for the volume %s",
                     volname)
@@ -292,7 +304,7 @@ def are_bricks_online(mnode, volname, bricks_list):
     """
     _rc = True
     offline_bricks_list = []
-    volume_status = get_volume_status(mnode, volname)
+    volume_status = get_volume_status(mnode, volname, use_cache=False)
     if not volume_status:
         g.log.error("Unable to check if bricks are online for the volume %s",
                     volname)
@@ -326,7 +338,7 @@ def get_offline_bricks_list(mnode, volname):
         NoneType: None on failure in getting volume status
     """
     offline_bricks_list = []
-    volume_status = get_volume_status(mnode, volname)
+    volume_status = get_volume_status(mnode, volname, use_cache=False)
     if not volume_status:
         g.log.error("Unable to get offline bricks_list for the volume %s",
                     volname)
@@ -354,7 +366,7 @@ def get_online_bricks_list(mnode, volname):
         NoneType: None on failure in getting volume status
     """
     online_bricks_list = []
-    volume_status = get_volume_status(mnode, volname)
+    volume_status = get_volume_status(mnode, volname, use_cache=False)
     if not volume_status:
         g.log.error("Unable to get online bricks_list for the volume %s",
                     volname)
@@ -608,24 +620,14 @@ def wait_for_bricks_to_be_online(mnode, volname, timeout=300):
     if not all_bricks:
         return False
 
-    counter = 0
-    flag = 0
-    while counter < timeout:
-        status = are_bricks_online(mnode, volname, all_bricks)
-
-        if status:
-            flag = 1
-            break
-        if not status:
-            time.sleep(10)
-            counter = counter + 10
-
-    if not flag:
+    ret = wait_for_condition(
+        lambda: are_bricks_online(mnode, volname, all_bricks),
+        timeout=timeout)
+    if not ret:
         g.log.error("All Bricks of the volume '%s' are not online "
                     "even after %d minutes", volname, timeout/60.0)
         return False
-    else:
-        g.log.info("All Bricks of the volume '%s' are online ", volname)
+    g.log.info("All Bricks of the volume '%s' are online ", volname)
     return True
 
 
@@ -670,22 +672,24 @@ def validate_xattr_on_all_bricks(bricks_list, file_path, xattr):
                                      "dir1/file1",
                                      "xattr")
     """
+    # Adding here to avoid cyclic imports
+    from glustolibs.gluster.glusterfile import get_fattr_bulk
+
+    host_paths = []
+    for brick in bricks_list:
+        brick_node, brick_path = brick.split(":")
+        host_paths.append((brick_node,
+                           "{0}/{1}".format(brick_path, file_path)))
 
     time_counter = 250
     g.log.info("The heal monitoring timeout is : %d minutes",
                (time_counter // 60))
     while time_counter > 0:
-        attr_vals = {}
-        for brick in bricks_list:
-            brick_node, brick_path = brick.split(":")
-            attr_vals[brick] = (
-                get_extended_attributes_info(brick_node,
-                                             ["{0}/{1}".format(brick_path,
-                                                               file_path)],
-                                             attr_name=xattr))
-        ec_version_vals = [list(val.values())[0][xattr] for val in
+        # One getfattr per brick node for all of its bricks
+        attr_vals = get_fattr_bulk(host_paths, fattr=xattr)
+        ec_version_vals = [(val or {}).get(xattr) for val in
                            list(attr_vals.values())]
-        if len(set(ec_version_vals)) == 1:
+        if len(set(ec_version_vals)) == 1 and None not in ec_version_vals:
             return True
         else:
             time.sleep(120)
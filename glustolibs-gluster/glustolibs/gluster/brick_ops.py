@@ -18,6 +18,7 @@
 
 
 from glusto.core import Glusto as g
+from glustolibs.gluster.volume_ops import invalidate_volume_snapshot_cache
 
 
 def add_brick(mnode, volname, bricks_list, force=False, **kwargs):
@@ -72,7 +73,9 @@ def add_brick(mnode, volname, bricks_list, force=False, **kwargs):
     cmd = ("gluster volume add-brick %s %s %s %s %s" %
            (volname, replica, arbiter, ' '.join(bricks_list), force_value))
 
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def remove_brick(mnode, volname, bricks_list, option, xml=False, **kwargs):
@@ -122,7 +125,9 @@ def remove_brick(mnode, volname, bricks_list, option, xml=False, **kwargs):
     cmd = ("gluster volume remove-brick %s %s %s %s %s" %
            (volname, replica, ' '.join(bricks_list), option, xml_str))
 
-    return g.run(mnode, cmd, log_level=log_level)
+    ret = g.run(mnode, cmd, log_level=log_level)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def replace_brick(mnode, volname, src_brick, dst_brick):
@@ -147,7 +152,9 @@ def replace_brick(mnode, volname, src_brick, dst_brick):
     """
     cmd = ("gluster volume replace-brick %s %s %s commit force" %
            (volname, src_brick, dst_brick))
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def reset_brick(mnode, volname, src_brick, option, dst_brick=None,
@@ -197,4 +204,6 @@ def reset_brick(mnode, volname, src_brick, option, dst_brick=None,
             else:
                 cmd = ("gluster volume reset-brick %s %s %s %s"
                        % (volname, src_brick, dst_brick, option))
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
@@ -53,6 +53,48 @@ def check_hashrange(brickdir_path):
     return None
 
 
+def get_hashranges(brickdir_paths):
+    """Get the hash ranges of a list of brick directories. The directories
+    of a host are all read with a single getfattr and the hosts are queried
+    concurrently.
+
+    Args:
+        brickdir_paths (list): paths of the directories as returned from
+            pathinfo (e.g., server1.example.com:/bricks/brick1/testdir1)
+
+    Returns:
+        dict: (low, high) hash range of every brick directory in the format
+            {brickdir_path: (low, high)}. The value is None for a directory
+            without a hash range.
+    """
+    host_paths = {}
+    for brickdir_path in brickdir_paths:
+        (host, fqpath) = brickdir_path.split(':')
+        host_paths.setdefault(host, []).append(fqpath)
+
+    procs = {}
+    for host, fqpaths in host_paths.items():
+        command = ("getfattr --absolute-names -n trusted.glusterfs.dht "
+                   "-e hex %s 2> /dev/null" % ' '.join(fqpaths))
+        procs[host] = g.run_async(host, command)
+
+    hashranges = dict((brickdir_path, None)
+                      for brickdir_path in brickdir_paths)
+    for host, proc in procs.items():
+        _, rout, _ = proc.async_communicate()
+        fqpath = None
+        for line in rout.splitlines():
+            if line.startswith('# file: '):
+                fqpath = line[len('# file: '):].strip()
+            elif line.startswith('trusted.glusterfs.dht=') and fqpath:
+                # Grab the trailing 16 hex bytes
+                trailing_hash_hex = line.split('=')[1].strip()[-16:]
+                hashranges['%s:%s' % (host, fqpath)] = (
+                    int(trailing_hash_hex[0:8], 16),
+                    int(trailing_hash_hex[-8:], 16))
+    return hashranges
+
+
 def get_hashrange(brickdir_path):
     """Check the gluster version and then the volume type.
        And accordingly, get the int hash range for a brick.
@@ -116,12 +158,16 @@ def file_exists(host, filename):
 
 class BrickDir(object):
     """Directory on a brick"""
-    def __init__(self, path):
+    def __init__(self, path, hashrange=None):
         self._path = path
         (self._host, self._fqpath) = self._path.split(':')
         self._hashrange = None
         self._hashrange_low = None
         self._hashrange_high = None
+        if hashrange is not None:
+            # Hash range already known to the caller (see get_hashranges)
+            self._hashrange = hashrange
+            (self._hashrange_low, self._hashrange_high) = hashrange
 
     def _check_hashrange(self):
         """get the hash range for a brick from a remote system"""
@@ -188,6 +234,8 @@ class BrickDir(object):
             else:
                 return self._hashrange_high
 
+        return self._hashrange_high
+
     def hashrange_contains_hash(self, filehash):
         """Check if a hash number falls between the brick hashrange
 
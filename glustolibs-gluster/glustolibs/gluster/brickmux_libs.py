@@ -25,7 +25,7 @@ except ImportError:
     from itertools import izip_longest as zip_longest
 
 from glusto.core import Glusto as g
-from glustolibs.gluster.volume_ops import get_volume_list
+from glustolibs.gluster.volume_ops import get_volume_info
 from glustolibs.gluster.lib_utils import get_servers_bricks_dict
 
 
@@ -97,6 +97,42 @@ def get_current_brick_index(mnode):
     return len(brick_index.splitlines())
 
 
+def get_multivol_brick_index(mnode):
+    """
+    Get the number of bricks of all the volumes of the cluster, which is the
+    index of the next brick formed by form_bricks_for_multivol.
+
+    Args:
+        mnode (str): Node on which commands has to be executed.
+
+    Returns:
+        NoneType: If unable to get the volume info
+        int: Count of the bricks of all the volumes in the cluster.
+    """
+    # A single volume info for all the volumes
+    volinfo = get_volume_info(mnode)
+    if volinfo is None:
+        g.log.error("Unable to get the volume info from %s" % mnode)
+        return None
+
+    brick_index = 0
+    for volume in volinfo.values():
+        brick_index += len(volume.get('bricks', {}).get('brick', []))
+    return brick_index
+
+
+def _form_bricks_list(all_bricks, volname, number_of_bricks, brick_index):
+    """Form the bricks list of a volume, starting from the brick at
+    brick_index of all the bricks of the servers"""
+    brick_list_for_volume = []
+    for num in range(number_of_bricks):
+        brick = brick_index % len(all_bricks)
+        brick_list_for_volume.append("%s/%s_brick%d" % (all_bricks[brick],
+                                                        volname, brick_index))
+        brick_index += 1
+    return brick_list_for_volume
+
+
 def form_bricks_for_multivol(mnode, volname, number_of_bricks, servers,
                              servers_info):
     """
@@ -118,18 +154,41 @@ def form_bricks_for_multivol(mnode, volname, number_of_bricks, servers,
         Nonetype: If unable to fetch the brick list
 
     """
-    if not isinstance(servers, list):
-        servers = [servers]
+    bricks_lists = form_bricks_for_multivols(mnode, [volname],
+                                             number_of_bricks, servers,
+                                             servers_info)
+    if bricks_lists is None:
+        return None
+    return bricks_lists[volname]
 
-    brick_index, brick_list_for_volume = 0, []
 
-    # Importing get_all_bricks() from bricks_libs to avoid cyclic imports
-    from glustolibs.gluster.brick_libs import get_all_bricks
+def form_bricks_for_multivols(mnode, volnames, number_of_bricks, servers,
+                              servers_info):
+    """
+    Forms the brick lists of several volumes to be created, as
+    form_bricks_for_multivol would for each of them if the volumes were
+    created one after the other. The cluster and the servers are queried
+    only once for all the volumes.
+
+    Args:
+        mnode (str): Node on which commands has to be executed.
+        volnames (list): Names of the volumes, in creation order
+        number_of_bricks (int): The number of bricks of each volume.
+        servers (str|list): A server|List of servers from which the bricks
+                            needs to be selected for creating the brick list.
+        servers_info (dict): Dict of server info of each servers.
 
-    # Get all volume list present in the cluster from mnode
-    current_vol_list = get_volume_list(mnode)
-    for volume in current_vol_list:
-        brick_index = brick_index + len(get_all_bricks(mnode, volume))
+    Returns:
+        dict: List of bricks of each volume in the format
+            {volname: bricks_list}.
+        Nonetype: If unable to fetch the brick list
+    """
+    if not isinstance(servers, list):
+        servers = [servers]
+
+    brick_index = get_multivol_brick_index(mnode)
+    if brick_index is None:
+        return None
     g.log.info("current brick_index %s" % brick_index)
 
     # Get all bricks_count and bricks_list
@@ -140,10 +199,9 @@ def form_bricks_for_multivol(mnode, volname, number_of_bricks, servers,
                     "servers")
         return None
 
-    for num in range(number_of_bricks):
-        brick = brick_index % all_brick_count
-        brick_list_for_volume.append("%s/%s_brick%d" % (bricks_list[brick],
-                                                        volname, brick_index))
-        brick_index += 1
-
-    return brick_list_for_volume
+    bricks_lists = {}
+    for volname in volnames:
+        bricks_lists[volname] = _form_bricks_list(
+            bricks_list, volname, number_of_bricks, brick_index)
+        brick_index += number_of_bricks
+    return bricks_lists
@@ -17,19 +17,19 @@
 #
 """Module for library DHT test utility functions"""
 
+import binascii
 import os
 
 from glusto.core import Glusto as g
 
-from glustolibs.gluster.glusterfile import (GlusterFile, calculate_hash,
-                                            get_pathinfo, file_exists)
-from glustolibs.gluster.glusterdir import GlusterDir
-from glustolibs.gluster.layout import Layout
+from glustolibs.gluster.glusterfile import (calculate_hash, get_pathinfo,
+                                            gf_dm_hashfn, parse_pathinfo)
+from glustolibs.gluster.glusterdir import walk_dir_info
+from glustolibs.gluster.layout import Layout, LayoutMap
 import glustolibs.gluster.constants as k
 import glustolibs.gluster.exceptions as gex
 from glustolibs.gluster.brickdir import BrickDir
 from glustolibs.gluster.volume_libs import get_subvols, get_volume_type
-from glustolibs.misc.misc_libs import upload_scripts
 
 
 def run_layout_tests(mnode, fqpath, layout, test_type):
@@ -43,21 +43,26 @@ def run_layout_tests(mnode, fqpath, layout, test_type):
             g.log.info("Cannot check for layout completeness as"
                        " volume under test is Replicate/Disperse/Arbiter")
         else:
-            if test_type & k.TEST_LAYOUT_IS_COMPLETE:
-                g.log.info("Testing layout complete for %s" % fqpath)
-                if not layout.is_complete:
-                    msg = ("Layout for %s IS NOT COMPLETE" % fqpath)
-                    g.log.error(msg)
-                    raise gex.LayoutIsNotCompleteError(msg)
-            if test_type & k.TEST_LAYOUT_IS_BALANCED:
-                g.log.info("Testing layout balance for %s" % fqpath)
-                if not layout.is_balanced:
-                    msg = ("Layout for %s IS NOT BALANCED" % fqpath)
-                    g.log.error(msg)
-                    raise gex.LayoutIsNotBalancedError(msg)
-
-            # returning True until logic requires non-exception error check(s)
-            return True
+            return _run_layout_checks(fqpath, layout, test_type)
+
+
+def _run_layout_checks(fqpath, layout, test_type):
+    """run the is_complete and/or is_balanced tests on a layout"""
+    if test_type & k.TEST_LAYOUT_IS_COMPLETE:
+        g.log.info("Testing layout complete for %s" % fqpath)
+        if not layout.is_complete:
+            msg = ("Layout for %s IS NOT COMPLETE" % fqpath)
+            g.log.error(msg)
+            raise gex.LayoutIsNotCompleteError(msg)
+    if test_type & k.TEST_LAYOUT_IS_BALANCED:
+        g.log.info("Testing layout balance for %s" % fqpath)
+        if not layout.is_balanced:
+            msg = ("Layout for %s IS NOT BALANCED" % fqpath)
+            g.log.error(msg)
+            raise gex.LayoutIsNotBalancedError(msg)
+
+    # returning True until logic requires non-exception error check(s)
+    return True
 
 
 def run_hashed_bricks_test(gfile):
@@ -78,6 +83,9 @@ def validate_files_in_dir(mnode, rootdir,
                           test_type=k.TEST_ALL):
     """walk a directory tree and check if layout is_complete.
 
+    The tree is walked once on mnode and once on every brick host (hosts
+    walked concurrently) and the checks are run on the collected data.
+
     Args:
         mnode (str): The host of the directory being traversed.
         rootdir (str): The fully qualified path of the dir being traversed.
@@ -117,66 +125,124 @@ def validate_files_in_dir(mnode, rootdir,
         validate_files_in_dir(clients[0], '/mnt/glusterfs',
                               test_type=k.TEST_FILE_EXISTS_ON_HASHED_BRICKS)
     """
-    layout_cache = {}
-
-    script_path = ("/usr/share/glustolibs/scripts/walk_dir.py")
-    if not file_exists(mnode, script_path):
-        if upload_scripts(mnode, script_path,
-                          "/usr/share/glustolibs/scripts/"):
-            g.log.info("Successfully uploaded script "
-                       "walk_dir.py!")
-        else:
-            g.log.error("Faild to upload walk_dir.py!")
-            return False
-    else:
-        g.log.info("compute_hash.py already present!")
-
-    cmd = ("/usr/bin/env python {0} {1}".format(script_path, rootdir))
-    ret, out, _ = g.run(mnode, cmd)
-    if ret:
-        g.log.error('Unable to run the script on node {0}'
-                    .format(mnode))
+    # Walk the tree once on the mount and once per brick host and run the
+    # checks locally on the collected data
+    ret = walk_dir_info({mnode: [rootdir]},
+                        dir_xattrs=['trusted.glusterfs.pathinfo'])
+    if ret is None:
+        g.log.error('Unable to walk %s on node %s' % (rootdir, mnode))
+        return False
+    mount_entries = ret[mnode]
+    rootdir = mount_entries[0]['path']
+    pathinfo = parse_pathinfo(
+        _decode_xattr(mount_entries[0], 'trusted.glusterfs.pathinfo'))
+
+    # Brick directories of rootdir grouped by host
+    host_rootdirs = {}
+    for brickdir_path in pathinfo['brickdir_paths']:
+        (host, fqpath) = brickdir_path.split(':')
+        host_rootdirs.setdefault(host, []).append(fqpath)
+    ret = walk_dir_info(host_rootdirs,
+                        dir_xattrs=['trusted.glusterfs.dht'],
+                        file_xattrs=['trusted.glusterfs.dht.linkto'])
+    if ret is None:
+        g.log.error('Unable to walk the bricks of %s' % rootdir)
         return False
-    for walkies in eval(out):
-        g.log.info("TESTING DIRECTORY %s..." % walkies[0])
-
-        # check directories
-        if file_type & k.FILETYPE_DIR:
-            for testdir in walkies[1]:
-                fqpath = os.path.join(walkies[0], testdir)
-                gdir = GlusterDir(mnode, fqpath)
-
-                if gdir.parent_dir in layout_cache:
-                    layout = layout_cache[gdir.parent_dir]
-                else:
-                    layout = Layout(gdir.parent_dir_pathinfo)
-                    layout_cache[gdir.parent_dir] = layout
-
-                    run_layout_tests(mnode, gdir.parent_dir, layout, test_type)
-
-                if test_type & k.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
-                    run_hashed_bricks_test(gdir)
-
-        # check files
-        if file_type & k.FILETYPE_FILE:
-            for file in walkies[2]:
-                fqpath = os.path.join(walkies[0], file)
-                gfile = GlusterFile(mnode, fqpath)
-
-                if gfile.parent_dir in layout_cache:
-                    layout = layout_cache[gfile.parent_dir]
-                else:
-                    layout = Layout(gfile.parent_dir_pathinfo)
-                    layout_cache[gfile.parent_dir] = layout
-
-                    run_layout_tests(mnode, gfile.parent_dir, layout,
-                                     test_type)
-
-                if test_type & k.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
-                    run_hashed_bricks_test(gfile)
+
+    # Hash ranges of the brick directories, entries and DHT linkto files
+    # on each brick, keyed by the path relative to rootdir
+    hashranges, brick_entries, brick_linkto = {}, {}, {}
+    for host, entries in ret.items():
+        for brick_rootdir in host_rootdirs[host]:
+            brick_rootdir = os.path.normpath(brick_rootdir)
+            brickdir_path = "%s:%s" % (host, brick_rootdir)
+            hashranges[brickdir_path] = {}
+            brick_entries[brickdir_path] = set()
+            brick_linkto[brickdir_path] = set()
+            for entry in entries:
+                relpath = os.path.relpath(entry['path'], brick_rootdir)
+                if relpath.startswith(os.pardir):
+                    continue
+                brick_entries[brickdir_path].add(relpath)
+                if 'trusted.glusterfs.dht.linkto' in entry['xattrs']:
+                    brick_linkto[brickdir_path].add(relpath)
+                if entry['type'] == 'd':
+                    dht = entry['xattrs'].get('trusted.glusterfs.dht')
+                    if dht is not None:
+                        hashranges[brickdir_path][relpath] = (
+                            int(dht[-16:-8], 16), int(dht[-8:], 16))
+
+    if not any(hashranges.values()):
+        g.log.info("Cannot check layouts as volume under test is"
+                   " Replicate/Disperse/Arbiter and DHT pass-through was"
+                   " enabled after Gluster 6.0")
+        test_type &= ~(k.TEST_LAYOUT_IS_COMPLETE | k.TEST_LAYOUT_IS_BALANCED)
+
+    layout_cache = {}
+    for entry in mount_entries[1:]:
+        if entry['type'] == 'd':
+            if not file_type & k.FILETYPE_DIR:
+                continue
+        elif not file_type & k.FILETYPE_FILE:
+            continue
+        relpath = os.path.relpath(entry['path'], rootdir)
+        parent_relpath = os.path.dirname(relpath) or os.curdir
+
+        if parent_relpath not in layout_cache:
+            parent_dir = os.path.normpath(os.path.join(rootdir,
+                                                       parent_relpath))
+            g.log.info("TESTING DIRECTORY %s..." % parent_dir)
+            parent_hashranges = dict(
+                (os.path.normpath(os.path.join(brickdir_path,
+                                               parent_relpath)),
+                 hashranges[brickdir_path].get(parent_relpath))
+                for brickdir_path in brick_entries)
+            layout = Layout({'brickdir_paths': list(parent_hashranges)},
+                            hashranges=parent_hashranges)
+            layout_cache[parent_relpath] = layout
+
+            _run_layout_checks(parent_dir, layout, test_type)
+
+        if test_type & k.TEST_FILE_EXISTS_ON_HASHED_BRICKS:
+            g.log.info("Testing file/dir %s existence on hashed brick(s)." %
+                       entry['path'])
+            filehash = gf_dm_hashfn(os.path.basename(relpath))
+            for brickdir_path, entries in brick_entries.items():
+                hashrange = hashranges[brickdir_path].get(parent_relpath)
+                if (hashrange is None or
+                        not hashrange[0] <= filehash <= hashrange[1]):
+                    continue
+                if relpath not in entries:
+                    msg = ("File/Dir %s DOES NOT EXIST on hashed bricks." %
+                           entry['path'])
+                    g.log.error(msg)
+                    raise gex.FileDoesNotExistOnHashedBricksError(msg)
+                if relpath not in brick_linkto[brickdir_path]:
+                    continue
+
+                # Only a linkto file on the hashed brick, the data file
+                # has to be on one of the other bricks
+                g.log.info("File %s is a linkto file on hashed brick %s" %
+                           (relpath, brickdir_path))
+                if not any(relpath in brick_entries[cached_path] and
+                           relpath not in brick_linkto[cached_path]
+                           for cached_path in brick_entries):
+                    msg = ("File %s has a linkto file on hashed brick %s "
+                           "but NO DATA FILE on any brick." %
+                           (entry['path'], brickdir_path))
+                    g.log.error(msg)
+                    raise gex.FileDoesNotExistOnHashedBricksError(msg)
     return True
 
 
+def _decode_xattr(entry, xattr):
+    """Get the text value of a hex encoded xattr of a walk_dir_info entry"""
+    value = entry['xattrs'].get(xattr)
+    if value is None:
+        return ''
+    return binascii.unhexlify(value[2:]).decode('utf-8').rstrip('\x00')
+
+
 def create_brickobjectlist(subvols, path):
     '''
         Args:
@@ -201,7 +267,7 @@ def create_brickobjectlist(subvols, path):
     return brickobject
 
 
-def find_hashed_subvol(subvols, parent_path, name):
+def find_hashed_subvol(subvols, parent_path, name, layout_map=None):
     '''
         Args:
             subvols:  subvol list
@@ -212,6 +278,9 @@ def find_hashed_subvol(subvols, parent_path, name):
                          parent_path
 
             name: file or directory name
+            layout_map: LayoutMap of parent_path to look the hash up in,
+                         to share one between several lookups under the
+                         same parent. Built for the call if not given.
 
         Return Values:
             hashed_subvol object: An object of type BrickDir type representing
@@ -219,27 +288,21 @@ def find_hashed_subvol(subvols, parent_path, name):
 
             subvol_count: The subvol index in the subvol list
     '''
-    # pylint: disable=protected-access
     if subvols is None or parent_path is None or name is None:
         g.log.error("empty arguments")
         return None, -1
 
-    brickobject = create_brickobjectlist(subvols, parent_path)
-    hash_num = calculate_hash(brickobject[0]._host, name)
-
-    count = -1
-    for brickdir in brickobject:
-        count += 1
-        ret = brickdir.hashrange_contains_hash(hash_num)
-        if ret == 1:
-            g.log.debug('hash subvolume is %s', brickdir._host)
-            hashed_subvol = brickdir
-            break
+    if layout_map is None:
+        layout_map = LayoutMap(subvols, parent_path)
+    hash_num = calculate_hash(layout_map.brickdirs[0].host, name)
 
+    hashed_subvol, count = layout_map.find_subvol(hash_num)
+    if hashed_subvol is not None:
+        g.log.debug('hash subvolume is %s', hashed_subvol.host)
     return hashed_subvol, count
 
 
-def find_nonhashed_subvol(subvols, parent_path, name):
+def find_nonhashed_subvol(subvols, parent_path, name, layout_map=None):
     '''
         Args:
             subvols: subvol list
@@ -250,6 +313,9 @@ def find_nonhashed_subvol(subvols, parent_path, name):
                          parent_path
 
             name: file or directory name
+            layout_map: LayoutMap of parent_path to look the hash up in,
+                         to share one between several lookups under the
+                         same parent. Built for the call if not given.
 
         Return Values:
             nonhashed_subvol object: An object of type BrickDir type
@@ -257,30 +323,26 @@ def find_nonhashed_subvol(subvols, parent_path, name):
 
             subvol_count: The subvol index in the subvol list
     '''
-    # pylint: disable=protected-access
     if subvols is None or parent_path is None or name is None:
         g.log.error("empty arguments")
         return None, -1
 
-    brickobject = create_brickobjectlist(subvols, parent_path)
-    hash_num = calculate_hash(brickobject[0]._host, name)
+    if layout_map is None:
+        layout_map = LayoutMap(subvols, parent_path)
+    hash_num = calculate_hash(layout_map.brickdirs[0].host, name)
 
-    count = -1
-    for brickdir in brickobject:
-        count += 1
-        ret = brickdir.hashrange_contains_hash(hash_num)
-        if ret == 1:
+    _, hashed_count = layout_map.find_subvol(hash_num)
+    for count, brickdir in enumerate(layout_map.brickdirs):
+        if count == hashed_count:
             g.log.debug('hash subvolume is %s', brickdir.path)
             continue
+        g.log.info('nonhashed subvol %s', brickdir.host)
+        return brickdir, count
 
-        nonhashed_subvol = brickdir
-        g.log.info('nonhashed subvol %s', brickdir._host)
-        break
+    return None, -1
 
-    return nonhashed_subvol, count
 
-
-def find_new_hashed(subvols, parent_path, oldname):
+def find_new_hashed(subvols, parent_path, oldname, layout_map=None):
     '''
         This is written for rename case so that the new name will hash to a
         different subvol than that of the the old name.
@@ -290,6 +352,8 @@ def find_new_hashed(subvols, parent_path, oldname):
             subvols = list of subvols
             parent_path = parent path (relative to mount) of "oldname"
             oldname = name of the source file for rename operation
+            layout_map = LayoutMap of parent_path, built for the call if
+                         not given
 
         Return Values:
             For success returns an object of type NewHashed holding
@@ -297,50 +361,32 @@ def find_new_hashed(subvols, parent_path, oldname):
 
             For Failure returns None
     '''
-    # pylint: disable=protected-access
-    # pylint: disable=pointless-string-statement
-    # pylint: disable=too-many-locals
-    # pylint: disable=too-many-statements
-    # pylint: disable=too-many-branches
-    # pylint: disable=too-many-return-statements
-    brickobject = create_brickobjectlist(subvols, parent_path)
-    if brickobject is None:
-        g.log.error("could not form brickobject list")
-        return None
-
-    for bro in brickobject:
-        bro._get_hashrange()
-        low = bro._hashrange_low
-        high = bro._hashrange_high
-        g.log.debug("low hashrange %s high hashrange %s", str(low), str(high))
-        g.log.debug("absoulte path %s", bro._fqpath)
-
-    hash_num = calculate_hash(brickobject[0]._host, oldname)
-    oldhashed, _ = find_hashed_subvol(subvols, parent_path, oldname)
+    if layout_map is None:
+        layout_map = LayoutMap(subvols, parent_path)
+    for brickdir in layout_map.brickdirs:
+        g.log.debug("hashrange of %s: %s", brickdir.fqpath,
+                    brickdir.hashrange)
+
+    oldhashed, oldcount = find_hashed_subvol(subvols, parent_path, oldname,
+                                             layout_map)
     if oldhashed is None:
         g.log.error("could not find old hashed subvol")
         return None
 
-    g.log.debug("oldhashed: %s oldname: %s oldhash %s", oldhashed._host,
-                oldname, hash_num)
+    g.log.debug("oldhashed: %s oldname: %s", oldhashed.host, oldname)
 
-    count = -1
     for item in range(1, 5000, 1):
-        newhash = calculate_hash(brickobject[0]._host, str(item))
-        for brickdir in brickobject:
-            count += 1
-            ret = brickdir.hashrange_contains_hash(newhash)
-            if ret == 1:
-                if oldhashed._fqpath != brickdir._fqpath:
-                    g.log.debug("oldhashed %s new %s count %s",
-                                oldhashed, brickdir._host, str(count))
-                    return NewHashed(item, brickdir, count)
-
-        count = -1
+        newhash = calculate_hash(oldhashed.host, str(item))
+        brickdir, count = layout_map.find_subvol(newhash)
+        if brickdir is not None and count != oldcount:
+            g.log.debug("oldhashed %s new %s count %s",
+                        oldhashed, brickdir.host, str(count))
+            return NewHashed(item, brickdir, count)
     return None
 
 
-def find_specific_hashed(subvols, parent_path, subvol, existing_names=None):
+def find_specific_hashed(subvols, parent_path, subvol, existing_names=None,
+                         layout_map=None):
     """ Finds filename that hashes to a specific subvol.
 
     Args:
@@ -348,6 +394,8 @@ def find_specific_hashed(subvols, parent_path, subvol, existing_names=None):
            parent_path(str): parent path (relative to mount) of "oldname"
            subvol(str): The subvol to which the new name has to be hashed
            existing_names(int|list): The name(s) already hashed to subvol
+           layout_map(LayoutMap): LayoutMap of parent_path, built for the
+                                  call if not given
 
     Returns:
              (Class Object): For success returns an object of type NewHashed
@@ -355,26 +403,19 @@ def find_specific_hashed(subvols, parent_path, subvol, existing_names=None):
                             None, otherwise
      Note: The new hash will be searched under the same parent
     """
-    # pylint: disable=protected-access
     if not isinstance(existing_names, list):
         existing_names = [existing_names]
-    brickobject = create_brickobjectlist(subvols, parent_path)
-    if brickobject is None:
-        g.log.error("could not form brickobject list")
-        return None
-    count = -1
+    if layout_map is None:
+        layout_map = LayoutMap(subvols, parent_path)
     for item in range(1, 5000, 1):
-        newhash = calculate_hash(brickobject[0]._host, str(item))
-        for brickdir in brickobject:
-            count += 1
-            if (subvol._fqpath == brickdir._fqpath and
-                    item not in existing_names):
-                ret = brickdir.hashrange_contains_hash(newhash)
-                if ret:
-                    g.log.debug("oldhashed %s new %s count %s",
-                                subvol, brickdir._host, str(count))
-                    return NewHashed(item, brickdir, count)
-        count = -1
+        if item in existing_names:
+            continue
+        newhash = calculate_hash(subvol.host, str(item))
+        brickdir, count = layout_map.find_subvol(newhash)
+        if brickdir is not None and subvol.fqpath == brickdir.fqpath:
+            g.log.debug("oldhashed %s new %s count %s",
+                        subvol, brickdir.host, str(count))
+            return NewHashed(item, brickdir, count)
     return None
 
 
@@ -22,14 +22,12 @@
 from copy import deepcopy
 from datetime import datetime
 from inspect import isclass
+from multiprocessing.pool import ThreadPool
 from os.path import join as path_join
 from random import choice as random_choice
-from socket import (
-    gethostbyname,
-    gaierror,
-)
+from socket import gaierror
 from unittest import TestCase
-from time import sleep
+from time import sleep, time
 
 from glusto.core import Glusto as g
 
@@ -37,7 +35,11 @@ from glustolibs.gluster.exceptions import (
     ConfigError,
     ExecutionError,
 )
-from glustolibs.gluster.lib_utils import inject_msg_in_logs
+from glustolibs.gluster.lib_utils import (
+    get_ip_of_host,
+    inject_msg_in_logs,
+    run_on_nodes,
+)
 from glustolibs.gluster.mount_ops import create_mount_objs
 from glustolibs.gluster.nfs_libs import export_volume_through_nfs
 from glustolibs.gluster.peer_ops import (
@@ -45,7 +47,12 @@ from glustolibs.gluster.peer_ops import (
     peer_probe_servers, peer_status
 )
 from glustolibs.gluster.gluster_init import (
-    restart_glusterd, stop_glusterd, wait_for_glusterd_to_start)
+    restart_glusterd, wait_for_glusterd_to_start)
+from glustolibs.gluster.remote_agent import (
+    DEFAULT_AGENT_TIMEOUT,
+    disable_remote_agents,
+    enable_remote_agents,
+)
 from glustolibs.gluster.samba_libs import share_volume_over_smb
 from glustolibs.gluster.shared_storage_ops import is_shared_volume_mounted
 from glustolibs.gluster.volume_libs import (
@@ -57,12 +64,12 @@ from glustolibs.gluster.volume_libs import (
 from glustolibs.gluster.brick_libs import (
     wait_for_bricks_to_be_online, get_offline_bricks_list)
 from glustolibs.gluster.volume_ops import (
-    set_volume_options, volume_reset, volume_start)
+    enable_volume_snapshot_cache, set_volume_options, volume_reset,
+    volume_start)
 from glustolibs.io.utils import log_mounts_info
 from glustolibs.gluster.geo_rep_libs import setup_master_and_slave_volumes
 from glustolibs.gluster.nfs_ganesha_ops import (
     teardown_nfs_ganesha_cluster)
-from glustolibs.misc.misc_libs import kill_process
 
 
 class runs_on(g.CarteTestClass):
@@ -107,6 +114,8 @@ class GlusterBaseClass(TestCase):
     volume_type = None
     mount_type = None
     error_or_failure_exists = False
+    _log_mounts_info = True
+    _pipelined_volume_setup = False
 
     @staticmethod
     def get_super_method(obj, method_name):
@@ -167,7 +176,8 @@ class GlusterBaseClass(TestCase):
 
     @classmethod
     def get_ip_from_hostname(cls, nodes):
-        """Returns list of IP's for the list of nodes in order.
+        """Returns list of IP's for the list of nodes in order, from the
+        shared host resolution cache of lib_utils.
 
         Args:
             nodes(list): List of nodes hostnames
@@ -180,7 +190,7 @@ class GlusterBaseClass(TestCase):
             nodes = [nodes]
         for node in nodes:
             try:
-                ip = gethostbyname(node)
+                ip = get_ip_of_host(node)
             except gaierror as e:
                 g.log.error("Failed to get the IP of Host: %s : %s", node,
                             e.strerror)
@@ -264,74 +274,78 @@ class GlusterBaseClass(TestCase):
         Returns (bool): True if setup cleanup is successful.
             False otherwise.
         """
-        if error_or_failure_exists:
-            shared_storage_mounted = False
-            if is_shared_volume_mounted(cls.mnode):
-                shared_storage_mounted = True
-            ret = stop_glusterd(cls.servers)
-            if not ret:
-                g.log.error("Failed to stop glusterd")
-                cmd_list = ("pkill `pidof glusterd`",
-                            "rm /var/run/glusterd.socket")
-                for server in cls.servers:
-                    for cmd in cmd_list:
-                        ret, _, _ = g.run(server, cmd, "root")
-                        if ret:
-                            g.log.error("Failed to stop glusterd")
-                            return False
-            for server in cls.servers:
-                ret, out, _ = g.run(server, "pgrep glusterfsd", "root")
-                if not ret:
-                    ret = kill_process(server,
-                                       process_ids=out.strip().split('\n'))
-                    if not ret:
-                        g.log.error("Unable to kill process {}".format(
-                            out.strip().split('\n')))
-                        return False
+        if not error_or_failure_exists:
+            return None
+
+        shared_storage_mounted = False
+        if is_shared_volume_mounted(cls.mnode):
+            shared_storage_mounted = True
+
+        def _cleanup_script(node):
+            """One script doing all the cleanup of a node"""
+            cmds = []
+            if node in cls.clients:
+                # Failures to unmount are not fatal, nothing may be mounted
+                cmds.append("(umount /mnt/*; rm -rf /mnt/*; true)")
+            if node in cls.servers:
+                brick_root = cls.all_servers_info[node]['brick_root']
+                cmds.append("(service glusterd stop || "
+                            "(kill -9 `pidof glusterd`; "
+                            "rm -f /var/run/glusterd.socket))")
+                cmds.append("(! pids=`pgrep glusterfsd` || kill -9 $pids)")
                 if not shared_storage_mounted:
-                    cmd_list = (
-                        "rm -rf /var/lib/glusterd/vols/*",
-                        "rm -rf /var/lib/glusterd/snaps/*",
-                        "rm -rf /var/lib/glusterd/peers/*",
-                        "rm -rf {}/*/*".format(
-                            cls.all_servers_info[server]['brick_root']))
+                    cmds.append("rm -rf /var/lib/glusterd/vols/* "
+                                "/var/lib/glusterd/snaps/* "
+                                "/var/lib/glusterd/peers/* "
+                                "{}/*/*".format(brick_root))
                 else:
-                    cmd_list = (
-                        "for vol in `ls /var/lib/glusterd/vols/ | "
-                        "grep -v gluster_shared_storage`;do "
-                        "rm -rf /var/lib/glusterd/vols/$vol;done",
-                        "rm -rf /var/lib/glusterd/snaps/*"
-                        "rm -rf {}/*/*".format(
-                            cls.all_servers_info[server]['brick_root']))
-                for cmd in cmd_list:
-                    ret, _, _ = g.run(server, cmd, "root")
-                    if ret:
-                        g.log.error(
-                            "failed to cleanup server {}".format(server))
-                        return False
-            ret = restart_glusterd(cls.servers)
-            if not ret:
-                g.log.error("Failed to start glusterd")
-                return False
-            sleep(2)
-            ret = wait_for_glusterd_to_start(cls.servers)
+                    cmds.append("(for vol in `ls /var/lib/glusterd/vols/ | "
+                                "grep -v gluster_shared_storage`;do "
+                                "rm -rf /var/lib/glusterd/vols/$vol;done)")
+                    cmds.append("rm -rf /var/lib/glusterd/snaps/* "
+                                "{}/*/*".format(brick_root))
+            return " && ".join(cmds)
+
+        # Clean all the servers and clients at once
+        start = time()
+        nodes = list(cls.servers)
+        nodes += [client for client in cls.clients if client not in nodes]
+        results = run_on_nodes(nodes, _cleanup_script, user="root")
+        for node, result in results.items():
+            g.log.debug("scratch_cleanup of %s took %.1f seconds", node,
+                        result.duration)
+        g.log.info("scratch_cleanup: cleanup of %d nodes took %.1f "
+                   "seconds", len(nodes), time() - start)
+        failed_servers = [node for node in results.failed_nodes
+                          if node in cls.servers]
+        if failed_servers:
+            for server in failed_servers:
+                g.log.error("failed to cleanup server {}: {}".format(
+                    server, results[server].err))
+            return False
+
+        start = time()
+        ret = restart_glusterd(cls.servers)
+        if not ret:
+            g.log.error("Failed to start glusterd")
+            return False
+        sleep(2)
+        ret = wait_for_glusterd_to_start(cls.servers)
+        if not ret:
+            g.log.error("Failed to bring glusterd up")
+            return False
+        g.log.info("scratch_cleanup: restart of glusterd took %.1f seconds",
+                   time() - start)
+
+        if not shared_storage_mounted:
+            start = time()
+            ret = peer_probe_servers(cls.mnode, cls.servers)
             if not ret:
-                g.log.error("Failed to bring glusterd up")
+                g.log.error("Failed to peer probe servers")
                 return False
-            if not shared_storage_mounted:
-                ret = peer_probe_servers(cls.mnode, cls.servers)
-                if not ret:
-                    g.log.error("Failed to peer probe servers")
-                    return False
-            for client in cls.clients:
-                cmd_list = ("umount /mnt/*", "rm -rf /mnt/*")
-                for cmd in cmd_list:
-                    ret = g.run(client, cmd, "root")
-                    if ret:
-                        g.log.error(
-                            "failed to unmount/already unmounted {}"
-                            .format(client))
-            return True
+            g.log.info("scratch_cleanup: peer probe took %.1f seconds",
+                       time() - start)
+        return True
 
     @classmethod
     def setup_volume(cls, volume_create_force=False, only_volume_create=False):
@@ -369,14 +383,17 @@ class GlusterBaseClass(TestCase):
 
         # Setup Volume
         g.log.info("Setting up volume %s", cls.volname)
+        start_time = time()
         ret = setup_volume(mnode=cls.mnode,
                            all_servers_info=cls.all_servers_info,
                            volume_config=cls.volume, force=force_volume_create,
-                           create_only=only_volume_create)
+                           create_only=only_volume_create,
+                           pipelined=cls._pipelined_volume_setup)
         if not ret:
             g.log.error("Failed to Setup volume %s", cls.volname)
             return False
-        g.log.info("Successful in setting up volume %s", cls.volname)
+        g.log.info("Successful in setting up volume %s in %.2f seconds",
+                   cls.volname, time() - start_time)
 
         # Returning the value without proceeding for next steps
         if only_volume_create and ret:
@@ -463,40 +480,77 @@ class GlusterBaseClass(TestCase):
         return True
 
     @classmethod
-    def mount_volume(cls, mounts):
-        """Mount volume
+    def _run_on_mounts(cls, func, mounts, max_workers=16):
+        """Run func on every mount obj, concurrently on all the mounts
+
+        Args:
+            func (callable): function taking a mount obj and returning
+                None on success or the error message on failure.
+            mounts(list): List of mount_objs
+
+        Returns (list): the (mount_obj, error message) of the mounts on
+            which func failed.
+        """
+        if not mounts:
+            return []
+        pool = ThreadPool(min(max_workers, len(mounts)))
+        try:
+            errors = pool.map(func, mounts)
+        finally:
+            pool.close()
+            pool.join()
+        return [(mount_obj, err) for mount_obj, err in zip(mounts, errors)
+                if err is not None]
+
+    @classmethod
+    def mount_volume(cls, mounts, log_info=None):
+        """Mount volume, on all the mount objs at once
 
         Args:
             mounts(list): List of mount_objs
 
+        Kwargs:
+            log_info(bool): Log the mounts info (see
+                glustolibs.io.utils.log_mounts_info) after mounting.
+                Defaults to the 'log_mounts_info' config option, True if
+                not set.
+
         Returns (bool): True if mounting the volume for a mount obj is
             successful. False otherwise
         """
         g.log.info("Starting to mount volume %s", cls.volname)
-        for mount_obj in mounts:
+
+        def _mount(mount_obj):
             # For nfs-ganesha, mount is done via vip
             if cls.enable_nfs_ganesha:
                 mount_obj.server_system = cls.vips[0]
             g.log.info("Mounting volume '%s:%s' on '%s:%s'",
                        mount_obj.server_system, mount_obj.volname,
                        mount_obj.client_system, mount_obj.mountpoint)
-            ret = mount_obj.mount()
-            if not ret:
-                g.log.error("Failed to mount volume '%s:%s' on '%s:%s'",
-                            mount_obj.server_system, mount_obj.volname,
-                            mount_obj.client_system, mount_obj.mountpoint)
-                return False
-            else:
-                g.log.info("Successful in mounting volume '%s:%s' on "
-                           "'%s:%s'", mount_obj.server_system,
-                           mount_obj.volname, mount_obj.client_system,
-                           mount_obj.mountpoint)
+            if not mount_obj.mount():
+                return "mount failed"
+            g.log.info("Successful in mounting volume '%s:%s' on "
+                       "'%s:%s'", mount_obj.server_system,
+                       mount_obj.volname, mount_obj.client_system,
+                       mount_obj.mountpoint)
+            return None
+
+        failures = cls._run_on_mounts(_mount, mounts)
+        for mount_obj, _ in failures:
+            g.log.error("Failed to mount volume '%s:%s' on '%s:%s'",
+                        mount_obj.server_system, mount_obj.volname,
+                        mount_obj.client_system, mount_obj.mountpoint)
+        if failures:
+            g.log.error("Failed to mount %d of the %d mount objs for the "
+                        "volume %s", len(failures), len(mounts), cls.volname)
+            return False
         g.log.info("Successful in mounting all mount objs for the volume %s",
                    cls.volname)
 
         # Get mounts info
-        g.log.info("Get mounts Info:")
-        log_mounts_info(mounts)
+        if cls._log_mounts_info if log_info is None else log_info:
+            g.log.info("Get mounts Info:")
+            log_mounts_info(mounts)
 
         return True
 
@@ -572,54 +626,61 @@ class GlusterBaseClass(TestCase):
         return True
 
     @classmethod
-    def unmount_volume(cls, mounts):
-        """Unmount all mounts for the volume
+    def unmount_volume(cls, mounts, log_info=None):
+        """Unmount all mounts for the volume, all at once
 
         Args:
             mounts(list): List of mount_objs
 
+        Kwargs:
+            log_info(bool): Log the mounts info (see
+                glustolibs.io.utils.log_mounts_info) after unmounting.
+                Defaults to the 'log_mounts_info' config option, True if
+                not set. The info is always logged if an unmount fails.
+
         Returns (bool): True if unmounting the volume for a mount obj is
             successful. False otherwise
         """
         # Unmount volume
         g.log.info("Starting to UnMount Volume %s", cls.volname)
-        for mount_obj in mounts:
+
+        def _unmount(mount_obj):
             g.log.info("UnMounting volume '%s:%s' on '%s:%s'",
                        mount_obj.server_system, mount_obj.volname,
                        mount_obj.client_system, mount_obj.mountpoint)
-            ret = mount_obj.unmount()
-            if not ret:
-                g.log.error("Failed to unmount volume '%s:%s' on '%s:%s'",
-                            mount_obj.server_system, mount_obj.volname,
-                            mount_obj.client_system, mount_obj.mountpoint)
-
-                # Get mounts info
-                g.log.info("Get mounts Info:")
-                log_mounts_info(cls.mounts)
-
-                return False
+            if not mount_obj.unmount():
+                return "unmount failed"
 
-            g.log.info("Starting to delete the directory path used for "
-                       "mounting")
             cmd = ('rm -rf %s' % mount_obj.mountpoint)
             ret, _, err = g.run(
                 mount_obj.client_system, cmd, user=mount_obj.user)
             if ret:
-                g.log.error(
-                    "failed to delete the directory path used for "
-                    "mounting %s: %s" % (mount_obj.mountpoint, err))
-                return False
+                return ("failed to delete the directory path used for "
+                        "mounting: %s" % err)
 
             g.log.info(
-                "Successful in deleting the directory path used for "
-                "mounting '%s:%s' on '%s:%s'" % (
+                "Successful in unmounting and deleting the directory path "
+                "used for mounting '%s:%s' on '%s:%s'" % (
                     mount_obj.server_system,
                     mount_obj.volname, mount_obj.client_system,
                     mount_obj.mountpoint))
+            return None
+
+        failures = cls._run_on_mounts(_unmount, mounts)
+        for mount_obj, err in failures:
+            g.log.error("Failed to unmount volume '%s:%s' on '%s:%s': %s",
+                        mount_obj.server_system, mount_obj.volname,
+                        mount_obj.client_system, mount_obj.mountpoint, err)
+        if failures:
+            # Get mounts info
+            g.log.info("Get mounts Info:")
+            log_mounts_info(cls.mounts)
+            return False
 
         # Get mounts info
-        g.log.info("Get mounts Info:")
-        log_mounts_info(mounts)
+        if cls._log_mounts_info if log_info is None else log_info:
+            g.log.info("Get mounts Info:")
+            log_mounts_info(mounts)
 
         return True
 
@@ -855,12 +916,35 @@ class GlusterBaseClass(TestCase):
                         cls.default_volume_type_config[volume_type] = (
                             default_volume_type_from_config[volume_type])
 
+        # Log the mounts info after mounting and unmounting volumes
+        cls._log_mounts_info = g.config.get('gluster', {}).get(
+            'log_mounts_info', True)
+
         # Create Volume with force option
         cls.volume_create_force = False
         if g.config.get('gluster', {}).get('volume_create_force'):
             cls.volume_create_force = (
                 g.config['gluster']['volume_create_force'])
 
+        # Setup the volumes with one script on mnode
+        cls._pipelined_volume_setup = g.config.get('gluster', {}).get(
+            'pipelined_volume_setup', False)
+
+        # Cache volume info and status for the configured number of seconds
+        if g.config.get('gluster', {}).get('volume_snapshot_cache_ttl'):
+            enable_volume_snapshot_cache(
+                g.config['gluster']['volume_snapshot_cache_ttl'])
+
+        # Run g.run commands through persistent agents on the nodes,
+        # stopped in tearDownClass
+        cls._use_remote_agent = bool(
+            g.config.get('gluster', {}).get('use_remote_agent'))
+        if cls._use_remote_agent:
+            enable_remote_agents(
+                cls.all_servers + cls.all_clients,
+                timeout=g.config['gluster'].get('remote_agent_timeout',
+                                                DEFAULT_AGENT_TIMEOUT))
+
         # Default volume options which is applicable for all the volumes
         cls.volume_options = {}
         if g.config.get('gluster', {}).get('volume_options'):
@@ -1084,6 +1168,8 @@ class GlusterBaseClass(TestCase):
         msg = "Teardownclass: %s : %s" % (cls.__name__, cls.glustotest_run_id)
         g.log.info(msg)
         cls.inject_msg_in_gluster_logs(msg)
+        if getattr(cls, '_use_remote_agent', False):
+            disable_remote_agents()
 
     def doCleanups(self):
         if (self.error_or_failure_exists or
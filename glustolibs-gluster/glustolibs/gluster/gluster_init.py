@@ -19,8 +19,9 @@
     Description: This file contains the methods for starting/stopping glusterd
         and other initial gluster environment setup helpers.
 """
-from time import sleep
 from glusto.core import Glusto as g
+from glustolibs.gluster.lib_utils import run_on_nodes, wait_for_condition
+from glustolibs.gluster.volume_ops import invalidate_volume_snapshot_cache
 
 
 def start_glusterd(servers, enable_retry=True):
@@ -35,28 +36,23 @@ def start_glusterd(servers, enable_retry=True):
                             do nothing.
 
     Returns:
-        bool : True if starting glusterd is successful on all servers.
-            False otherwise.
+        NodeResults : Outcome on every server (see
+            lib_utils.run_on_nodes). True if starting glusterd is
+            successful on all servers. False otherwise.
     """
-    if not isinstance(servers, list):
-        servers = [servers]
-
     cmd = "pgrep glusterd || service glusterd start"
-    results = g.run_parallel(servers, cmd)
+    results = run_on_nodes(servers, cmd)
+    invalidate_volume_snapshot_cache()
 
-    _rc = True
-    for server, ret_values in results.items():
-        retcode, _, _ = ret_values
-        if retcode != 0:
-            g.log.error("Unable to start glusterd on server %s", server)
-            _rc = False
-    if not _rc and enable_retry:
-        ret = reset_failed_glusterd(servers)
-        if ret:
-            ret = start_glusterd(servers)
-        return ret
+    failed_servers = results.failed_nodes
+    for server in failed_servers:
+        g.log.error("Unable to start glusterd on server %s", server)
+    if failed_servers and enable_retry:
+        # Retry only on the servers where it failed
+        if reset_failed_glusterd(failed_servers):
+            results.update(start_glusterd(failed_servers))
 
-    return _rc
+    return results
 
 
 def stop_glusterd(servers):
@@ -67,25 +63,17 @@ def stop_glusterd(servers):
             has to be stopped.
 
     Returns:
-        bool : True if stopping glusterd is successful on all servers.
-            False otherwise.
+        NodeResults : Outcome on every server (see
+            lib_utils.run_on_nodes). True if stopping glusterd is
+            successful on all servers. False otherwise.
     """
-    if not isinstance(servers, list):
-        servers = [servers]
-
     cmd = "service glusterd stop"
-    results = g.run_parallel(servers, cmd)
-
-    _rc = True
-    for server, ret_values in results.items():
-        retcode, _, _ = ret_values
-        if retcode != 0:
-            g.log.error("Unable to stop glusterd on server %s", server)
-            _rc = False
-    if not _rc:
-        return False
+    results = run_on_nodes(servers, cmd)
+    invalidate_volume_snapshot_cache()
 
-    return True
+    for server in results.failed_nodes:
+        g.log.error("Unable to stop glusterd on server %s", server)
+    return results
 
 
 def restart_glusterd(servers, enable_retry=True):
@@ -100,27 +88,22 @@ def restart_glusterd(servers, enable_retry=True):
                             do nothing.
 
     Returns:
-        bool : True if restarting glusterd is successful on all servers.
-            False otherwise.
+        NodeResults : Outcome on every server (see
+            lib_utils.run_on_nodes). True if restarting glusterd is
+            successful on all servers. False otherwise.
     """
-    if not isinstance(servers, list):
-        servers = [servers]
-
     cmd = "service glusterd restart"
-    results = g.run_parallel(servers, cmd)
+    results = run_on_nodes(servers, cmd)
+    invalidate_volume_snapshot_cache()
 
-    _rc = True
-    for server, ret_values in results.items():
-        retcode, _, _ = ret_values
-        if retcode != 0:
-            g.log.error("Unable to restart glusterd on server %s", server)
-            _rc = False
-    if not _rc and enable_retry:
-        ret = reset_failed_glusterd(servers)
-        if ret:
-            ret = restart_glusterd(servers)
-        return ret
-    return _rc
+    failed_servers = results.failed_nodes
+    for server in failed_servers:
+        g.log.error("Unable to restart glusterd on server %s", server)
+    if failed_servers and enable_retry:
+        # Retry only on the servers where it failed
+        if reset_failed_glusterd(failed_servers):
+            results.update(restart_glusterd(failed_servers))
+    return results
 
 
 def reset_failed_glusterd(servers):
@@ -278,14 +261,12 @@ def wait_for_glusterd_to_start(servers, glusterd_start_wait_timeout=80):
     """
     if not isinstance(servers, list):
         servers = [servers]
-    count = 0
-    while count <= glusterd_start_wait_timeout:
-        ret = is_glusterd_running(servers)
-        if not ret:
-            g.log.info("glusterd is running on %s", servers)
-            return True
-        sleep(1)
-        count += 1
+    ret = wait_for_condition(lambda: is_glusterd_running(servers) == 0,
+                             timeout=glusterd_start_wait_timeout,
+                             max_interval=1)
+    if ret:
+        g.log.info("glusterd is running on %s", servers)
+        return True
     g.log.error("glusterd is not running on %s", servers)
     return False
 
@@ -24,9 +24,11 @@ state and manage properties of a file in both locations.
 GlusterDir inherits from GlusterFile.
 """
 
+import json
+
 from glusto.core import Glusto as g
 
-from glustolibs.gluster.glusterfile import GlusterFile
+from glustolibs.gluster.glusterfile import GlusterFile, file_exists
 
 
 def mkdir(host, fqpath, parents=False, mode=None):
@@ -107,6 +109,63 @@ def get_dir_contents(host, path, recursive=False):
     return(list(filter(None, out.split("\n"))))
 
 
+def walk_dir_info(host_rootdirs, dir_xattrs=None, file_xattrs=None):
+    """Walk directory trees with a single remote command per host and get
+    the type, stat data and extended attributes of every entry.
+
+    The hosts are walked concurrently by the walk_dir_info.py script, which
+    streams one JSON object per entry.
+
+    Args:
+        host_rootdirs (dict): The directories to walk on each host in the
+            format {host: [rootdir1, rootdir2]}.
+
+    Kwargs:
+        dir_xattrs (list): Extended attributes to read on directories.
+        file_xattrs (list): Extended attributes to read on other entries.
+
+    Returns:
+        dict: The entries of each host in the format
+            {host: [{'path': '/mnt/glusterfs/dir1', 'type': 'd',
+                     'stat': {'mode': 16877, 'size': 4096, ...},
+                     'xattrs': {'trusted.glusterfs.dht': '0x0000...'}}]}
+        None: If the walk failed on any of the hosts.
+    """
+    # Adding here to avoid cyclic imports
+    from glustolibs.misc.misc_libs import upload_scripts
+
+    script_path = "/usr/share/glustolibs/scripts/walk_dir_info.py"
+    hosts = [host for host in host_rootdirs
+             if not file_exists(host, script_path)]
+    if hosts:
+        if not upload_scripts(hosts, script_path,
+                              "/usr/share/glustolibs/scripts/"):
+            g.log.error("Failed to upload walk_dir_info.py to %s" % hosts)
+            return None
+        g.log.info("Successfully uploaded walk_dir_info.py to %s" % hosts)
+
+    options = ''.join([" --dir-xattr %s" % xattr
+                       for xattr in dir_xattrs or []] +
+                      [" --file-xattr %s" % xattr
+                       for xattr in file_xattrs or []])
+    procs = {}
+    for host, rootdirs in host_rootdirs.items():
+        cmd = ("/usr/bin/env python %s%s %s" %
+               (script_path, options, ' '.join(rootdirs)))
+        procs[host] = g.run_async(host, cmd)
+
+    entries = {}
+    for host, proc in procs.items():
+        ret, out, err = proc.async_communicate()
+        if ret:
+            g.log.error("Failed to walk %s on %s: %s" %
+                        (host_rootdirs[host], host, err))
+            return None
+        entries[host] = [json.loads(line) for line in out.splitlines()
+                         if line.strip()]
+    return entries
+
+
 class GlusterDir(GlusterFile):
     """Class to handle directories specific to Gluster (client and backend)"""
     def mkdir(self, parents=False, mode=None):
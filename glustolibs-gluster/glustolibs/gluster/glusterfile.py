@@ -22,60 +22,125 @@ This module provides low-level functions and a GlusterFile class to maintain
 state and manage properties of a file in both locations.
 """
 
-import ctypes
 import os
 import re
+import struct
+try:
+    from shlex import quote  # Python 3
+except ImportError:
+    from pipes import quote  # Python 2
 
 from glusto.core import Glusto as g
 from glustolibs.gluster.layout import Layout
-from glustolibs.misc.misc_libs import upload_scripts
+
+
+# Bytes of quoted paths in a command of _run_per_host, well below the
+# 128 KiB limit of the kernel on a single argument as the command is run
+# with 'sh -c'
+MAX_PATHS_BYTES = 64 * 1024
+
+# Constants of the Davies-Meyer hash used by DHT (libglusterfs/src/hashfn.c)
+DM_DELTA = 0x9E3779B9
+DM_FULLROUNDS = 10
+DM_PARTROUNDS = 6
+DM_MASK = 0xFFFFFFFF
+
+
+def _dm_round(rounds, array, h0, h1):
+    """Python equivalent of dm_round() of libglusterfs."""
+    total, b0, b1 = 0, h0, h1
+    for _ in range(rounds):
+        total = (total + DM_DELTA) & DM_MASK
+        b0 = (b0 + ((((b1 << 4) + array[0]) ^ (b1 + total) ^
+                     ((b1 >> 5) + array[1])))) & DM_MASK
+        b1 = (b1 + ((((b0 << 4) + array[2]) ^ (b0 + total) ^
+                     ((b0 >> 5) + array[3])))) & DM_MASK
+    return (h0 + b0) & DM_MASK, (h1 + b1) & DM_MASK
+
+
+def gf_dm_hashfn(name):
+    """Python equivalent of gf_dm_hashfn() of libglusterfs, the hash DHT
+    uses to place a name on a subvolume.
+
+    The result matches the one of libglusterfs.so.0 on little endian
+    platforms (where char is signed), without needing the library.
+
+    Args:
+        name (str|bytes): The name to hash. Unicode names are hashed on
+            their utf-8 encoding.
+
+    Returns:
+        int: 32 bit hash of the name.
+    """
+    if not isinstance(name, bytes):
+        name = name.encode('utf-8')
+    msg = bytearray(name)
+    length = len(msg)
+    h0, h1 = 0x9464a485, 0x542e1a94
+
+    pad = (length | (length << 8)) & DM_MASK
+    pad = (pad | (pad << 16)) & DM_MASK
+
+    full_words = length // 4
+    words = struct.unpack('<%dI' % full_words, bytes(msg[:full_words * 4]))
+    full_quads = length // 16
+    for i in range(full_quads):
+        h0, h1 = _dm_round(DM_PARTROUNDS, words[i * 4:i * 4 + 4], h0, h1)
+
+    index = full_quads * 4
+    full_words -= index
+    full_bytes = length - index * 4
+    array = []
+    for _ in range(4):
+        if full_words:
+            array.append(words[index])
+            index += 1
+            full_words -= 1
+            full_bytes -= 4
+        else:
+            value = pad
+            while full_bytes:
+                byte = msg[length - full_bytes]
+                if byte > 0x7F:
+                    # char is signed, the byte gets sign extended
+                    byte |= 0xFFFFFF00
+                value = ((value << 8) | byte) & DM_MASK
+                full_bytes -= 1
+            array.append(value)
+    h0, h1 = _dm_round(DM_FULLROUNDS, array, h0, h1)
+    return h0 ^ h1
+
+
+def calculate_hashes(names):
+    """Computes the DHT hash of a batch of names on the controller.
+
+    Args:
+        names (list): List of names to hash.
+
+    Returns:
+        list: Integer hash of every name, in the order of names.
+
+    Example:
+        >>> calculate_hashes([str(num) for num in range(1, 5000)])
+    """
+    return [gf_dm_hashfn(name) for name in names]
 
 
 def calculate_hash(host, filename):
-    """ Function to import DHT Hash library.
+    """ Function to compute the DHT hash of a name.
+
+    The hash is computed locally with gf_dm_hashfn. The host argument is
+    retained for compatibility with the callers.
 
     Args:
+        host (str): The hostname/ip of the remote system.
         filename (str): the name of the file
 
     Returns:
         An integer representation of the hash
-
-    TODO: For testcases specifically testing hashing routine
-          consider using a baseline external Davies-Meyer hash_value.c
-          Creating comparison hash from same library we are testing
-          may not be best practice here. (Holloway)
-    """
-    try:
-        # Check if libglusterfs.so.0 is available locally
-        glusterfs = ctypes.cdll.LoadLibrary("libglusterfs.so.0")
-        g.log.debug("Library libglusterfs.so.0 loaded locally")
-        computed_hash = (
-            ctypes.c_uint32(glusterfs.gf_dm_hashfn(filename,
-                                                   len(filename))))
-        hash_value = int(computed_hash.value)
-    except OSError:
-        script_path = ("/usr/share/glustolibs/scripts/"
-                       "compute_hash.py")
-        if not file_exists(host, script_path):
-            if upload_scripts(host, script_path,
-                              '/usr/share/glustolibs/scripts/'):
-                g.log.info("Successfully uploaded script "
-                           "compute_hash.py!")
-            else:
-                g.log.error('Unable to upload the script to node {0}'
-                            .format(host))
-                return 0
-        else:
-            g.log.info("compute_hash.py already present!")
-        cmd = ("/usr/bin/env python {0} {1}".format(script_path,
-                                                    filename))
-        ret, out, _ = g.run(host, cmd)
-        if ret:
-            g.log.error('Unable to run the script on node {0}'
-                        .format(host))
-            return 0
-        hash_value = int(out.split('\n')[0])
-    return hash_value
+    """
+    # pylint: disable=unused-argument
+    return gf_dm_hashfn(filename)
 
 
 def get_mountpoint(host, fqpath):
@@ -156,6 +221,149 @@ def get_fattr_list(host, fqpath, encode_hex=False):
     return None
 
 
+def _run_per_host(host_paths, command):
+    """Run a command on every file of a list of remote files, with a single
+    command per host (or a few for long lists) and the hosts running
+    concurrently.
+
+    Args:
+        host_paths (list): (host, fqpath) tuples of the files.
+        command (str): The command to run, the quoted paths of the files
+            on the host are appended to it.
+
+    Returns:
+        dict: The (rcode, rout, rerr) of the command run on each host in
+            the format {host: (rcode, rout, rerr)}. The outputs of the
+            commands of a host are concatenated and rcode is the first
+            non zero return code, if any.
+    """
+    chunks, sizes = {}, {}
+    for host, fqpath in host_paths:
+        host_chunks = chunks.setdefault(host, [[]])
+        qpath = quote(fqpath)
+        if (host_chunks[-1] and
+                sizes[host] + len(qpath) + 1 > MAX_PATHS_BYTES):
+            host_chunks.append([])
+            sizes[host] = 0
+        host_chunks[-1].append(qpath)
+        sizes[host] = sizes.get(host, 0) + len(qpath) + 1
+
+    procs = []
+    for host, host_chunks in chunks.items():
+        for qpaths in host_chunks:
+            procs.append((host, g.run_async(host, "%s %s" % (
+                command, ' '.join(qpaths)))))
+
+    results = {}
+    for host, proc in procs:
+        rcode, rout, rerr = proc.async_communicate()
+        if host in results:
+            prev_rcode, prev_rout, prev_rerr = results[host]
+            rcode = prev_rcode or rcode
+            rout = prev_rout + rout
+            rerr = prev_rerr + rerr
+        results[host] = (rcode, rout, rerr)
+    return results
+
+
+def get_fattr_bulk(host_paths, fattr=None, encode="hex"):
+    """getfattr for a list of files spread over remote systems, with a
+    single getfattr per host.
+
+    Args:
+        host_paths (list): (host, fqpath) tuples of the files.
+
+    Kwargs:
+        fattr (str): name of the fattr to retrieve. All the fattrs are
+                     retrieved if None.
+        encode(str): The supported types of encoding are
+                     [hex|text|base64]
+                     Defaults to hex type of encoding
+
+    Returns:
+        dict: The fattrs of every file in the format
+            {(host, fqpath): {fattr: value}}. The value is None for the
+            files which do not exist or have none of the fattrs.
+
+    Example:
+        get_fattr_bulk([('server1', '/bricks/brick1/file1'),
+                        ('server2', '/bricks/brick2/file1')],
+                       fattr='trusted.gfid')
+    """
+    command = "getfattr --absolute-names -e '%s'" % encode
+    if fattr is None:
+        command += " -d -m -"
+    else:
+        command += " -n '%s'" % fattr
+
+    fattrs = dict(((host, fqpath), None) for host, fqpath in host_paths)
+    for host, (_, rout, _) in _run_per_host(host_paths, command).items():
+        file_fattrs = None
+        for line in rout.splitlines():
+            if line.startswith('# file: '):
+                # getfattr escapes '\\', '\n' and '\r' in octal
+                fqpath = re.sub(r'\\([0-7]{3})',
+                                lambda match: chr(int(match.group(1), 8)),
+                                line[len('# file: '):])
+                file_fattrs = {}
+                fattrs[(host, fqpath)] = file_fattrs
+            elif '=' in line and file_fattrs is not None:
+                key, value = line.split('=', 1)
+                file_fattrs[key] = value.replace('"', '')
+
+    return fattrs
+
+
+def get_file_stat_bulk(host_paths):
+    """Get file stat information about a list of files spread over remote
+    systems, with a single stat per host.
+
+    Args:
+        host_paths (list): (host, fqpath) tuples of the files.
+
+    Returns:
+        dict: The stat data of every file in the format
+            {(host, fqpath): stat_data}, stat_data being the dictionary
+            returned by get_file_stat. It is None for the files which
+            could not be stat'ed.
+    """
+    statformat = '%F$%n$%i$%a$%s$%h$%u$%g$%U$%G$%x$%y$%z$%X$%Y$%Z'
+    stats = dict(((host, fqpath), None) for host, fqpath in host_paths)
+    results = _run_per_host(host_paths, "stat -c '%s'" % statformat)
+    for host, (_, rout, rerr) in results.items():
+        for line in rout.splitlines():
+            stat_data = _parse_stat(line)
+            stats[(host, stat_data['filename'])] = stat_data
+        if rerr:
+            g.log.error("Could not stat files on %s: %s" %
+                        (host, rerr.strip()))
+
+    return stats
+
+
+def get_md5sum_bulk(host_paths):
+    """Get the md5 checksum for a list of files spread over remote systems,
+    with a single md5sum per host.
+
+    Args:
+        host_paths (list): (host, fqpath) tuples of the files.
+
+    Returns:
+        dict: The md5sum of every file, as returned by get_md5sum, in the
+            format {(host, fqpath): md5sum}. It is None for the files which
+            could not be read.
+    """
+    md5sums = dict(((host, fqpath), None) for host, fqpath in host_paths)
+    for host, (_, rout, rerr) in _run_per_host(host_paths,
+                                               "md5sum").items():
+        for line in rout.splitlines():
+            md5sums[(host, line.split(None, 1)[1])] = line.strip()
+        if rerr:
+            g.log.error("md5sum failed on %s: %s" % (host, rerr.strip()))
+
+    return md5sums
+
+
 def set_fattr(host, fqpath, fattr, value):
     """setfattr for filepath on remote system
 
@@ -251,37 +459,44 @@ def get_file_stat(host, fqpath):
     command = "stat -c '%s' %s" % (statformat, fqpath)
     rcode, rout, rerr = g.run(host, command)
     if rcode == 0:
-        stat_data = {}
-        stat_string = rout.strip()
-        (filetype, filename, inode,
-         access, size, links,
-         uid, gid, username, groupname,
-         atime, mtime, ctime, epoch_atime,
-         epoch_mtime, epoch_ctime) = stat_string.split("$")
-
-        stat_data['filetype'] = filetype
-        stat_data['filename'] = filename
-        stat_data["inode"] = inode
-        stat_data["access"] = access
-        stat_data["size"] = size
-        stat_data["links"] = links
-        stat_data["username"] = username
-        stat_data["groupname"] = groupname
-        stat_data["uid"] = uid
-        stat_data["gid"] = gid
-        stat_data["atime"] = atime
-        stat_data["mtime"] = mtime
-        stat_data["ctime"] = ctime
-        stat_data["epoch_atime"] = epoch_atime
-        stat_data["epoch_mtime"] = epoch_mtime
-        stat_data["epoch_ctime"] = epoch_ctime
-
-        return stat_data
+        return _parse_stat(rout.strip())
 
     g.log.error("Could not stat file %s: %s" % (fqpath, rerr))
     return None
 
 
+def _parse_stat(stat_string):
+    """Parse the output of stat for the format used by get_file_stat"""
+    stat_data = {}
+    # The filename may have '$' in it, the other fields cannot
+    fields = stat_string.split("$")
+    filetype = fields[0]
+    filename = "$".join(fields[1:-14])
+    (inode, access, size, links,
+     uid, gid, username, groupname,
+     atime, mtime, ctime, epoch_atime,
+     epoch_mtime, epoch_ctime) = fields[-14:]
+
+    stat_data['filetype'] = filetype
+    stat_data['filename'] = filename
+    stat_data["inode"] = inode
+    stat_data["access"] = access
+    stat_data["size"] = size
+    stat_data["links"] = links
+    stat_data["username"] = username
+    stat_data["groupname"] = groupname
+    stat_data["uid"] = uid
+    stat_data["gid"] = gid
+    stat_data["atime"] = atime
+    stat_data["mtime"] = mtime
+    stat_data["ctime"] = ctime
+    stat_data["epoch_atime"] = epoch_atime
+    stat_data["epoch_mtime"] = epoch_mtime
+    stat_data["epoch_ctime"] = epoch_ctime
+
+    return stat_data
+
+
 def set_file_permissions(host, fqpath, perms):
     """Set permissions on a remote file.
 
@@ -399,11 +614,24 @@ def get_pathinfo(host, fqpath):
     Returns:
         A dictionary of pathinfo data for a remote file. None on fail.
     """
+    return parse_pathinfo(get_fattr(host, fqpath,
+                                    'trusted.glusterfs.pathinfo',
+                                    encode="text"))
+
+
+def parse_pathinfo(raw):
+    """Parse the value of the trusted.glusterfs.pathinfo xattr.
+
+    Args:
+        raw (str): The pathinfo xattr value as text.
+
+    Returns:
+        A dictionary of pathinfo data with the raw value and the list of
+        brick directories ('brickdir_paths').
+    """
     pathinfo = {}
-    pathinfo['raw'] = get_fattr(host, fqpath, 'trusted.glusterfs.pathinfo',
-                                encode="text")
-    pathinfo['brickdir_paths'] = re.findall(r".*?POSIX.*?:(\S+)\>",
-                                            pathinfo['raw'])
+    pathinfo['raw'] = raw
+    pathinfo['brickdir_paths'] = re.findall(r".*?POSIX.*?:(\S+)\>", raw)
 
     return pathinfo
 
@@ -780,12 +1008,12 @@ class GlusterFile(object):
     @property
     def stat_on_bricks(self):
         """dict: a dictionary of stat dictionaries for the file on bricks"""
-        file_stats = {}
-        for brickdir_path in self.pathinfo['brickdir_paths']:
-            (host, fqpath) = brickdir_path.split(':')
-            file_stats[brickdir_path] = get_file_stat(host, fqpath)
+        host_paths = [tuple(brickdir_path.split(':'))
+                      for brickdir_path in self.pathinfo['brickdir_paths']]
+        file_stats = get_file_stat_bulk(host_paths)
 
-        return file_stats
+        return dict(('%s:%s' % host_path, file_stats[host_path])
+                    for host_path in host_paths)
 
     @property
     def stat(self):
@@ -801,12 +1029,12 @@ class GlusterFile(object):
     def md5sum_on_bricks(self):
         """dict: a dictionary of md5sums for the file on bricks"""
         # TODO: handle dispersed ???
-        file_md5s = {}
-        for brickdir_path in self.pathinfo['brickdir_paths']:
-            (host, fqpath) = brickdir_path.split(':')
-            file_md5s[brickdir_path] = get_md5sum(host, fqpath)
+        host_paths = [tuple(brickdir_path.split(':'))
+                      for brickdir_path in self.pathinfo['brickdir_paths']]
+        file_md5s = get_md5sum_bulk(host_paths)
 
-        return file_md5s
+        return dict(('%s:%s' % host_path, file_md5s[host_path])
+                    for host_path in host_paths)
 
     @property
     def md5sum(self):
@@ -23,6 +23,7 @@
 import time
 from glusto.core import Glusto as g
 from glustolibs.gluster.volume_ops import get_volume_status
+from glustolibs.gluster.lib_utils import wait_for_condition
 try:
     import xml.etree.cElementTree as etree
 except ImportError:
@@ -41,7 +42,8 @@ def is_heal_enabled(mnode, volname):
         NoneType: None if unable to get the volume status.
     """
     enabled = True
-    vol_status_dict = get_volume_status(mnode, volname, service='shd')
+    vol_status_dict = get_volume_status(mnode, volname, service='shd',
+                                        use_cache=False)
     if vol_status_dict is None:
         g.log.error("Failed to check if heal is enabled on volume %s or not" %
                     volname)
@@ -108,7 +110,7 @@ def are_all_self_heal_daemons_are_online(mnode, volname):
                    "volume %s" % volname)
     # Get volume status
     vol_status = get_volume_status(mnode=mnode, volname=volname,
-                                   service=service)
+                                   service=service, use_cache=False)
     if vol_status is None:
         g.log.error(failure_msg)
         return None
@@ -135,8 +137,88 @@ def are_all_self_heal_daemons_are_online(mnode, volname):
         return False
 
 
+def get_pending_heal_entries_on_bricks(bricks_list):
+    """Gets the number of entries pending heal in the
+        .glusterfs/indices/xattrop directory of every brick. The bricks of a
+        node are all checked with a single command and the nodes are
+        checked concurrently.
+
+    Args:
+        bricks_list (list): List of bricks.
+            Example: ['abc.com:/bricks/brick1/testvol_brick0']
+
+    Returns:
+        dict: Number of pending entries of every brick in the format
+            {brick: count}. The count is None for a brick on which the
+            number of entries couldn't be found.
+    """
+    node_bricks = {}
+    for brick in bricks_list:
+        brick_node, brick_path = brick.split(":")
+        node_bricks.setdefault(brick_node, []).append(brick_path)
+
+    procs = {}
+    for brick_node, brick_paths in node_bricks.items():
+        cmd = ("for brick in %s; do echo $brick `ls -1 "
+               "$brick/.glusterfs/indices/xattrop/ | grep -ve \"xattrop-\" | "
+               "wc -l`; done" % ' '.join(brick_paths))
+        procs[brick_node] = g.run_async(brick_node, cmd)
+
+    pending_entries = dict((brick, None) for brick in bricks_list)
+    for brick_node, proc in procs.items():
+        ret, out, err = proc.async_communicate()
+        if ret != 0:
+            g.log.error("Unable to get the pending heal entries of bricks "
+                        "on node %s: %s", brick_node, err)
+            continue
+        for line in out.splitlines():
+            try:
+                brick_path, count = line.split()
+                pending_entries["%s:%s" % (brick_node, brick_path)] = (
+                    int(count))
+            except ValueError:
+                g.log.error("Unexpected output '%s' from node %s",
+                            line, brick_node)
+    return pending_entries
+
+
+def get_heal_throughput(heal_stats):
+    """Computes the heal throughput from the time series of pending heal
+        entries collected by monitor_heal_completion.
+
+    Args:
+        heal_stats (dict): Time series of pending entries per brick in the
+            format {brick: [(timestamp, count), ...]}
+
+    Returns:
+        dict: Healed entries per second of every brick and of the whole
+            volume under the key 'total'. Throughput is 0.0 for a brick with
+            less than two samples.
+    """
+    throughput = {}
+    total_healed, start_time, end_time = 0, None, None
+    for brick, samples in heal_stats.items():
+        samples = [sample for sample in samples if sample[1] is not None]
+        if len(samples) < 2:
+            throughput[brick] = 0.0
+            continue
+        healed = max(samples[0][1] - samples[-1][1], 0)
+        duration = samples[-1][0] - samples[0][0]
+        throughput[brick] = (healed / float(duration)) if duration else 0.0
+        total_healed += healed
+        if start_time is None or samples[0][0] < start_time:
+            start_time = samples[0][0]
+        if end_time is None or samples[-1][0] > end_time:
+            end_time = samples[-1][0]
+    throughput['total'] = 0.0
+    if start_time is not None and end_time > start_time:
+        throughput['total'] = total_healed / float(end_time - start_time)
+    return throughput
+
+
 def monitor_heal_completion(mnode, volname, timeout_period=1200,
-                            bricks=None, interval_check=120):
+                            bricks=None, interval_check=120,
+                            heal_stats=None):
     """Monitors heal completion by looking into .glusterfs/indices/xattrop
         directory of every brick for certain time. When there are no entries
         in all the brick directories then heal is successful. Otherwise heal is
@@ -151,15 +233,19 @@ def monitor_heal_completion(mnode, volname, timeout_period=1200,
     Kwargs:
         bricks : list of bricks to monitor heal, if not provided
                  heal will be monitored on all bricks of volume
-        interval_check : Time in seconds, for every given interval checks
-                         the heal info, defaults to 120.
+        interval_check : Maximum time in seconds between two checks of the
+                         pending entries, defaults to 120. The checks start
+                         at an interval of a second and back off up to it.
+        heal_stats (dict): If given, it is filled with the time series of
+                           pending entries of every brick in the format
+                           {brick: [(timestamp, count), ...]}, which can be
+                           passed to get_heal_throughput.
 
     Return:
         bool: True if heal is complete within timeout_period. False otherwise
     """
     if timeout_period != 0:
         heal_monitor_timeout = timeout_period
-    time_counter = heal_monitor_timeout
     g.log.info("The heal monitoring timeout is : %d minutes" %
                (heal_monitor_timeout / 60))
 
@@ -172,20 +258,21 @@ def monitor_heal_completion(mnode, volname, timeout_period=1200,
                     "on the volume %s" % volname)
         return False
 
-    while time_counter > 0:
-        heal_complete = True
-        for brick in bricks_list:
-            brick_node, brick_path = brick.split(":")
-            cmd = ("ls -1 %s/.glusterfs/indices/xattrop/ | "
-                   "grep -ve \"xattrop-\" | wc -l" % brick_path)
-            ret, out, err = g.run(brick_node, cmd)
-            if out.strip('\n') != "0":
-                heal_complete = False
-        if heal_complete:
-            break
-        else:
-            time.sleep(interval_check)
-            time_counter = time_counter - interval_check
+    if heal_stats is None:
+        heal_stats = {}
+
+    def _is_xattrop_empty():
+        timestamp = time.time()
+        pending_entries = get_pending_heal_entries_on_bricks(bricks_list)
+        for brick, count in pending_entries.items():
+            heal_stats.setdefault(brick, []).append((timestamp, count))
+        return all(count == 0 for count in pending_entries.values())
+
+    heal_complete = wait_for_condition(
+        _is_xattrop_empty, timeout=heal_monitor_timeout, interval=1,
+        max_interval=interval_check)
+    g.log.info("Heal throughput in entries/sec: %s",
+               get_heal_throughput(heal_stats))
 
     if heal_complete and bricks:
         # In EC volumes, check heal completion only on online bricks
@@ -312,24 +399,15 @@ def wait_for_self_heal_daemons_to_be_online(mnode, volname, timeout=300):
                    "to be online", volname)
         return True
 
-    counter = 0
-    flag = 0
-    while counter < timeout:
-        status = are_all_self_heal_daemons_are_online(mnode, volname)
-        if status:
-            flag = 1
-            break
-        if not status:
-            time.sleep(10)
-            counter = counter + 10
-
-    if not flag:
+    ret = wait_for_condition(
+        lambda: are_all_self_heal_daemons_are_online(mnode, volname),
+        timeout=timeout)
+    if not ret:
         g.log.error("All self-heal-daemons of the volume '%s' are not online "
                     "even after %d minutes" % (volname, timeout/60.0))
         return False
-    else:
-        g.log.info("All self-heal-daemons of the volume '%s' are online ",
-                   volname)
+    g.log.info("All self-heal-daemons of the volume '%s' are online ",
+               volname)
     return True
 
 
@@ -543,7 +621,7 @@ def is_shd_daemon_running(mnode, node, volname):
     if not ret and glustershd_pids[node] != -1:
         return False
     # Verifying glustershd process is no longer running from get status.
-    vol_status = get_volume_status(mnode, volname)
+    vol_status = get_volume_status(mnode, volname, use_cache=False)
     if vol_status is None:
         return False
     try:
@@ -20,10 +20,8 @@
 """
 
 from glusto.core import Glusto as g
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+from glustolibs.gluster.volume_ops import invalidate_volume_snapshot_cache
+from glustolibs.gluster.xml_parser import ParseError, get_xml_records
 
 
 def trigger_heal(mnode, volname):
@@ -76,6 +74,7 @@ def enable_heal(mnode, volname):
     """
     cmd = "gluster volume heal %s enable" % volname
     ret, _, _ = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
     if ret != 0:
         return False
 
@@ -96,6 +95,7 @@ def disable_heal(mnode, volname):
     """
     cmd = "gluster volume heal %s disable" % volname
     ret, _, _ = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
     if ret != 0:
         return False
 
@@ -116,6 +116,7 @@ def enable_self_heal_daemon(mnode, volname):
     """
     cmd = "gluster volume set %s self-heal-daemon on" % volname
     ret, _, _ = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
     if ret != 0:
         return False
 
@@ -136,6 +137,7 @@ def disable_self_heal_daemon(mnode, volname):
     """
     cmd = "gluster volume set %s self-heal-daemon off" % volname
     ret, _, _ = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
     if ret != 0:
         return False
 
@@ -258,6 +260,25 @@ def heal_info_split_brain(mnode, volname):
     return g.run(mnode, cmd)
 
 
+def _heal_info_brick(elem):
+    """Converts a 'brick' element of the heal info xml output to a dict,
+    its 'file' children being gathered in the format [{gfid: path}].
+
+    Heal info lists up to every entry of the volume, so the bricks are
+    converted in one plain loop rather than through an XmlRecord.
+    """
+    brick = {}
+    files = []
+    for child in elem:
+        if child.tag == 'file':
+            files.append({child.attrib['gfid']: child.text})
+        else:
+            brick[child.tag] = child.text
+    if files:
+        brick['file'] = files
+    return brick
+
+
 def get_heal_info(mnode, volname):
     """From the xml output of heal info command get the heal info data.
 
@@ -278,30 +299,12 @@ def get_heal_info(mnode, volname):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        return get_xml_records(out, "healInfo/bricks/brick",
+                               _heal_info_brick)
+    except ParseError:
         g.log.error("Failed to parse the gluster heal info xml output.")
         return None
 
-    heal_info_data = []
-    for brick in root.findall("healInfo/bricks/brick"):
-        brick_heal_info = {}
-        brick_files_to_heal = []
-        file_to_heal_exist = False
-        for element in brick.getchildren():
-            if element.tag == "file":
-                file_to_heal_exist = True
-                file_info = {}
-                file_info[element.attrib['gfid']] = element.text
-                brick_files_to_heal.append(file_info)
-
-            else:
-                brick_heal_info[element.tag] = element.text
-        if file_to_heal_exist:
-            brick_heal_info['file'] = brick_files_to_heal
-        heal_info_data.append(brick_heal_info)
-    return heal_info_data
-
 
 def get_heal_info_summary(mnode, volname):
     """From the xml output of heal info command  get heal info summary
@@ -364,30 +367,12 @@ def get_heal_info_split_brain(mnode, volname):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        return get_xml_records(out, "healInfo/bricks/brick",
+                               _heal_info_brick)
+    except ParseError:
         g.log.error("Failed to parse the gluster heal info xml output.")
         return None
 
-    heal_info_split_brain_data = []
-    for brick in root.findall("healInfo/bricks/brick"):
-        brick_heal_info_split_brain = {}
-        brick_files_in_split_brain = []
-        is_file_in_split_brain = False
-        for element in brick.getchildren():
-            if element.tag == "file":
-                is_file_in_split_brain = True
-                file_info = {}
-                file_info[element.attrib['gfid']] = element.text
-                brick_files_in_split_brain.append(file_info)
-
-            else:
-                brick_heal_info_split_brain[element.tag] = element.text
-        if is_file_in_split_brain:
-            brick_heal_info_split_brain['file'] = brick_files_in_split_brain
-        heal_info_split_brain_data.append(brick_heal_info_split_brain)
-    return heal_info_split_brain_data
-
 
 def get_heal_info_split_brain_summary(mnode, volname):
     """Get heal info split_brain summary i.e Bricks and it's
@@ -17,8 +17,10 @@
 #
 """Module for library DHT layout class and related functions"""
 
+from bisect import bisect_right
+
 from glusto.core import Glusto as g
-from glustolibs.gluster.brickdir import BrickDir
+from glustolibs.gluster.brickdir import BrickDir, get_hashranges
 
 
 class Layout(object):
@@ -32,6 +34,16 @@ class Layout(object):
         from glustolibs.gluster.volume_libs import get_volume_type
 
         self._brickdirs = []
+        if self._hashranges is not None:
+            # Hash ranges already collected by the caller, bricks without
+            # one (DHT pass-through) have no layout
+            for brickdir_path in self._pathinfo['brickdir_paths']:
+                hashrange = self._hashranges.get(brickdir_path)
+                if hashrange is not None:
+                    self._brickdirs.append(BrickDir(brickdir_path,
+                                                    hashrange))
+            return
+
         for brickdir_path in self._pathinfo['brickdir_paths']:
             (host, _) = brickdir_path.split(':')
             ret = get_volume_type(brickdir_path)
@@ -48,14 +60,20 @@ class Layout(object):
                                             brickdir.hashrange))
                     self._brickdirs.append(brickdir)
 
-    def __init__(self, pathinfo):
+    def __init__(self, pathinfo, hashranges=None):
         """Init the layout class
 
         Args:
             pathinfo (dict): pathinfo collected from client directory
+
+        Kwargs:
+            hashranges (dict): (low, high) hash range of the brick
+                directories in the format {brickdir_path: (low, high)}.
+                When given, the layout is built from it instead of being
+                read from the bricks.
         """
         self._pathinfo = pathinfo
-        self._get_layout()
+        self._hashranges = hashranges
         self._zero_hashrange_brickdirs = None
         self._brickdirs = None
 
@@ -76,6 +94,9 @@ class Layout(object):
         # Adding here to avoid cyclic imports
         from glustolibs.gluster.volume_libs import get_volume_type
 
+        if self._hashranges is not None:
+            return self._check_complete()
+
         for brickdir_path in self._pathinfo['brickdir_paths']:
             (host, _) = brickdir_path.split(':')
             if get_volume_type(brickdir_path) in ('Replicate', 'Disperse',
@@ -84,56 +105,62 @@ class Layout(object):
                            " under test is Replicate/Disperse/Arbiter and DHT"
                            " pass-though was enabled after Gluster 6.")
             else:
-                joined_hashranges = []
-                for brickdir in self.brickdirs:
-                    # join all of the hashranges into a single list
-                    joined_hashranges += brickdir.hashrange
-                g.log.debug("joined range list: %s" % joined_hashranges)
-                # remove duplicate hashes
-                collapsed_ranges = list(set(joined_hashranges))
-                # sort the range list for good measure
-                collapsed_ranges.sort()
-
-                # first hash in the list is 0?
-                if collapsed_ranges[0] != 0:
-                    g.log.error('First hash in range (%d) is not zero' %
-                                collapsed_ranges[0])
-                    return False
+                return self._check_complete()
 
-                # last hash in the list is 32-bits high?
-                if collapsed_ranges[-1] != int(0xffffffff):
-                    g.log.error('Last hash in ranges (%s) is not 0xffffffff' %
-                                hex(collapsed_ranges[-1]))
-                    return False
+    def _check_complete(self):
+        """Check the hash ranges of the brickdirs for completeness"""
+        joined_hashranges = []
+        for brickdir in self.brickdirs:
+            # join all of the hashranges into a single list
+            joined_hashranges += brickdir.hashrange
+        g.log.debug("joined range list: %s" % joined_hashranges)
+        if not joined_hashranges:
+            g.log.error("Layout has no hash ranges")
+            return False
+        # remove duplicate hashes
+        collapsed_ranges = list(set(joined_hashranges))
+        # sort the range list for good measure
+        collapsed_ranges.sort()
+
+        # first hash in the list is 0?
+        if collapsed_ranges[0] != 0:
+            g.log.error('First hash in range (%d) is not zero' %
+                        collapsed_ranges[0])
+            return False
 
-                # remove the first and last hashes
-                clipped_ranges = collapsed_ranges[1:-1]
-                g.log.debug('clipped: %s' % clipped_ranges)
+        # last hash in the list is 32-bits high?
+        if collapsed_ranges[-1] != int(0xffffffff):
+            g.log.error('Last hash in ranges (%s) is not 0xffffffff' %
+                        hex(collapsed_ranges[-1]))
+            return False
 
-                # walk through the list in pairs and look for diff == 1
-                iter_ranges = iter(clipped_ranges)
-                for first in iter_ranges:
-                    second = next(iter_ranges)
-                    hash_difference = second - first
-                    g.log.debug('%d - %d = %d' % (second, first,
-                                                  hash_difference))
-                    if hash_difference > 1:
-                        g.log.error("Layout has holes")
+        # remove the first and last hashes
+        clipped_ranges = collapsed_ranges[1:-1]
+        g.log.debug('clipped: %s' % clipped_ranges)
 
-                        return False
-                    elif hash_difference < 1:
-                        g.log.error("Layout has overlaps")
+        # walk through the list in pairs and look for diff == 1
+        iter_ranges = iter(clipped_ranges)
+        for first in iter_ranges:
+            second = next(iter_ranges)
+            hash_difference = second - first
+            g.log.debug('%d - %d = %d' % (second, first, hash_difference))
+            if hash_difference > 1:
+                g.log.error("Layout has holes")
 
-                        return False
+                return False
+            elif hash_difference < 1:
+                g.log.error("Layout has overlaps")
 
-                return True
+                return False
+
+        return True
 
     @property
     def has_zero_hashranges(self):
         """Check brickdirs for zero hashrange"""
         # TODO: change this to use self.zero_hashrange_brickdirs and set bool
         low_and_high_zero = False
-        for brickdir in self._brickdirs:
+        for brickdir in self.brickdirs:
             if brickdir.has_zero_hashrange:
                 low_and_high_zero = True
 
@@ -144,7 +171,7 @@ class Layout(object):
         """list: the list of zero_hashrange_brickdirs"""
         if self._zero_hashrange_brickdirs is None:
             zero_hashrange_brickdirs = []
-            for brickdir in self._brickdirs:
+            for brickdir in self.brickdirs:
                 if brickdir.has_zero_hashrange():
                     zero_hashrange_brickdirs.append(brickdir)
             self._zero_hashrange_brickdirs = zero_hashrange_brickdirs
@@ -155,7 +182,7 @@ class Layout(object):
     def is_balanced(self):
         """Checks for balanced distribution in equal-sized bricks"""
         baseline_size = None
-        for brickdir in self._brickdirs:
+        for brickdir in self.brickdirs:
             hashrange_low = brickdir.hashrange_low
             hashrange_high = brickdir.hashrange_high
 
@@ -173,3 +200,64 @@ class Layout(object):
                     return False
 
         return True
+
+
+class LayoutMap(object):
+    """Hash ranges of a directory on every subvol of a volume.
+
+    The ranges are fetched once (one getfattr per server, servers queried
+    concurrently) and kept sorted, so that the subvol a hash falls in is
+    found by bisection. The map is a snapshot of the layout: build a new
+    one after the layout or the subvols may have changed (rebalance,
+    add-brick, remove-brick, volume recreated, directory recreated).
+    """
+    def __init__(self, subvols, parent_path):
+        """Init the layout map class
+
+        Args:
+            subvols (list): list of subvols (output of get_subvols)
+            parent_path (str): path of the directory relative to the brick
+                root (e.g. "dir1" for /mnt/glusterfs/dir1)
+        """
+        # Only one brick is accounted from one subvol
+        brickdir_paths = [subvol[0] + "/" + parent_path for subvol in subvols]
+        if len(brickdir_paths) > 1:
+            hashranges = get_hashranges(brickdir_paths)
+        else:
+            # Without distribution every hash lands on the only subvol
+            hashranges = {brickdir_paths[0]: (0, int(0xffffffff))}
+
+        self._brickdirs = []
+        sorted_ranges = []
+        for index, brickdir_path in enumerate(brickdir_paths):
+            hashrange = hashranges[brickdir_path]
+            self._brickdirs.append(BrickDir(brickdir_path, hashrange))
+            if hashrange is None:
+                g.log.error("Could not get hashrange of %s" % brickdir_path)
+            elif hashrange != (0, 0):
+                sorted_ranges.append((hashrange[0], hashrange[1], index))
+        sorted_ranges.sort()
+        self._lows = [hashrange[0] for hashrange in sorted_ranges]
+        self._ranges = sorted_ranges
+
+    @property
+    def brickdirs(self):
+        """list: brickdirs of the directory, in the order of subvols"""
+        return self._brickdirs
+
+    def find_subvol(self, filehash):
+        """Find the subvol whose hash range contains the hash
+
+        Args:
+            filehash (int): hash being looked up
+
+        Returns:
+            tuple: (brickdir, subvol index) of the hashed subvol.
+                (None, -1) if no hash range contains the hash.
+        """
+        position = bisect_right(self._lows, filehash) - 1
+        if position >= 0:
+            _, high, index = self._ranges[position]
+            if filehash <= high:
+                return self._brickdirs[index], index
+        return None, -1
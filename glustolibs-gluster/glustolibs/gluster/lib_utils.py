@@ -23,11 +23,15 @@ from glusto.core import Glusto as g
 from glustolibs.gluster.volume_ops import get_volume_info
 from glustolibs.gluster.mount_ops import mount_volume, umount_volume
 import re
+import socket
 import time
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from threading import Lock
 import tempfile
 
 ONE_GB_BYTES = 1073741824.0
+INCREMENTAL_AREQUAL_SCRIPT = ("/usr/share/glustolibs/scripts/"
+                              "arequal_incremental.py")
 
 
 def append_string_to_file(mnode, filename, str_to_add_in_file,
@@ -289,15 +293,19 @@ def get_servers_bricks_dict(servers, servers_info):
     servers_bricks_dict = OrderedDict()
     if not isinstance(servers, list):
         servers = [servers]
+
+    def _mounts_cmd(server):
+        return ("cat /proc/mounts | grep %s | awk '{ print $2}'"
+                % servers_info[server]["brick_root"])
+
+    # Fetch the mounts of all the servers at once
+    results = run_on_nodes(servers, _mounts_cmd)
     for server in servers:
-        server_info = servers_info[server]
-        brick_root = server_info["brick_root"]
-        ret, out, err = g.run(server, "cat /proc/mounts | grep %s"
-                              " | awk '{ print $2}'" % brick_root)
-        if ret != 0:
+        if not results[server].ok:
             g.log.error("bricks not available on %s" % server)
         else:
-            servers_bricks_dict[server] = out.strip().split("\n")
+            servers_bricks_dict[server] = (
+                results[server].out.strip().split("\n"))
 
     for key, value in list(servers_bricks_dict.items()):
         value.sort()
@@ -387,8 +395,184 @@ def get_servers_unused_bricks_dict(mnode, servers, servers_info):
     return servers_unused_bricks_dict
 
 
+class BrickAllocator(object):
+    """Index of the used and free bricks of servers, to hand out bricks
+    without querying the cluster again for every brick list.
+
+    The index is built from one gluster volume info snapshot and the
+    bricks mounted on the servers, then updated in place as the bricks are
+    allocated or released. Bricks are handed out round-robin across the
+    servers, continuing from the server after the last one used.
+
+    Example:
+        >>> allocator = BrickAllocator(mnode, servers, servers_info)
+        >>> bricks = allocator.plan([("vol1", 6), ("vol2", 3)])
+        >>> bricks["vol2"]
+        ['server1:/bricks/brick2/vol2_brick0', ...]
+    """
+    def __init__(self, mnode, servers, servers_info):
+        """Build the index of the free bricks
+
+        Args:
+            mnode (str): The node on which gluster volume info command
+                has to be executed.
+            servers (str|list): A server|List of servers from which the
+                bricks are allocated.
+            servers_info (dict): dict of server info of each servers.
+        """
+        if not isinstance(servers, list):
+            servers = [servers]
+        self.mnode = mnode
+        self.servers = servers
+        self.servers_info = servers_info
+        self._next_server = 0
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the index from the current state of the cluster, for
+        bricks allocated or freed without going through the allocator.
+
+        Returns:
+            bool: True if the index was rebuilt. False if the volume info
+                could not be fetched, the index then only knows the
+                mounted bricks.
+        """
+        servers_bricks = get_servers_bricks_dict(self.servers,
+                                                 self.servers_info)
+        volinfo = get_volume_info(self.mnode)
+        self._brick_counts = {}
+        used_bricks = set()
+        for volname, info in list((volinfo or {}).items()):
+            self._brick_counts[volname] = int(info.get('brickCount', 0))
+            bricks = info.get('bricks', {}).get('brick', [])
+            if not isinstance(bricks, list):
+                bricks = [bricks]
+            for brick in bricks:
+                used_bricks.add(self._brick_mount(brick['name']))
+
+        # Same semantics as get_servers_unused_bricks_dict()
+        self._free_bricks = OrderedDict()
+        for server, bricks in list(servers_bricks.items()):
+            self._free_bricks[server] = [
+                brick for brick in bricks
+                if (server, brick) not in used_bricks]
+        if volinfo is None:
+            g.log.error("Failed to get the volume info from %s, assuming "
+                        "all the bricks are free" % self.mnode)
+            return False
+        return True
+
+    @staticmethod
+    def _brick_mount(brick):
+        """Split 'server:/mount/dir' into (server, '/mount')"""
+        server, path = brick.split(':', 1)
+        return server, path.rsplit('/', 1)[0]
+
+    @property
+    def free_bricks(self):
+        """OrderedDict: free bricks in the format {server: [bricks]}, for
+        the servers with free bricks"""
+        return OrderedDict((server, list(bricks)) for server, bricks in
+                           list(self._free_bricks.items()) if bricks)
+
+    @property
+    def volnames(self):
+        """list: names of the volumes in the cluster when the index was
+        built, and of the volumes bricks were allocated for since"""
+        return list(self._brick_counts.keys())
+
+    @property
+    def num_free_bricks(self):
+        """int: number of free bricks on all the servers"""
+        return sum(len(bricks) for bricks in self._free_bricks.values())
+
+    def allocate(self, volname, number_of_bricks, dirname=None):
+        """Allocate bricks for create-volume/add-brick/replace-brick
+
+        Args:
+            volname (str): Volume name for which we require brick-list.
+            number_of_bricks (int): The number of bricks to allocate.
+
+        Kwargs:
+            dirname (str): Name of the directory for glusterfs brick.
+                Defaults to the volume name.
+
+        Returns:
+            list - List of bricks, numbered after the bricks the volume
+                already has.
+            None - if number_of_bricks is greater than free bricks.
+        """
+        if self.num_free_bricks < number_of_bricks:
+            g.log.error("Not enough bricks available for creating the "
+                        "bricks")
+            return None
+
+        if not dirname or " " in dirname:
+            dirname = volname
+        servers = list(self._free_bricks.keys())
+        brick_index = self._brick_counts.get(volname, 0)
+        bricks_list = []
+        while len(bricks_list) < number_of_bricks:
+            server = servers[self._next_server % len(servers)]
+            self._next_server = (self._next_server + 1) % len(servers)
+            if not self._free_bricks[server]:
+                continue
+            bricks_list.append("%s:%s/%s_brick%s" % (
+                server, self._free_bricks[server].pop(0), dirname,
+                brick_index + len(bricks_list)))
+        self._brick_counts[volname] = brick_index + number_of_bricks
+        return bricks_list
+
+    def release(self, bricks):
+        """Put bricks back in the free bricks, e.g. after a volume using
+        them was deleted or the bricks were removed from a volume.
+
+        Args:
+            bricks (str|list): brick(s) in the format 'server:/brick/path'
+        """
+        if not isinstance(bricks, list):
+            bricks = [bricks]
+        for brick in bricks:
+            server, mount = self._brick_mount(brick)
+            if (server in self._free_bricks and
+                    mount not in self._free_bricks[server]):
+                self._free_bricks[server].append(mount)
+                self._free_bricks[server].sort()
+
+    def forget_volume(self, volname):
+        """Reset the brick numbering of a deleted volume
+
+        Args:
+            volname (str): Name of the deleted volume
+        """
+        self._brick_counts.pop(volname, None)
+
+    def plan(self, volumes):
+        """Allocate the bricks of a batch of volumes in one pass
+
+        Args:
+            volumes (list): (volname, number_of_bricks) of each volume, in
+                the order the bricks are allocated.
+
+        Returns:
+            OrderedDict: bricks list of every volume, in the format
+                {volname: bricks_list}.
+            None - if there are not enough free bricks for all the
+                volumes, nothing is allocated then.
+        """
+        needed = sum(number_of_bricks for _, number_of_bricks in volumes)
+        if self.num_free_bricks < needed:
+            g.log.error("Not enough bricks available for the %d volumes: "
+                        "%d needed, %d free" % (len(volumes), needed,
+                                                self.num_free_bricks))
+            return None
+        return OrderedDict((volname, self.allocate(volname,
+                                                   number_of_bricks))
+                           for volname, number_of_bricks in volumes)
+
+
 def form_bricks_list(mnode, volname, number_of_bricks, servers, servers_info,
-                     dirname=None):
+                     dirname=None, allocator=None):
     """Forms bricks list for create-volume/add-brick given the num_of_bricks
         servers and servers_info.
 
@@ -403,6 +587,9 @@ def form_bricks_list(mnode, volname, number_of_bricks, servers, servers_info,
 
     kwargs:
         dirname (str): Name of the directory for glusterfs brick
+        allocator (BrickAllocator): Allocator to take the bricks from,
+            to form several brick lists without querying the cluster for
+            each of them. Defaults to an allocator of its own.
 
     Returns:
         list - List of bricks to use with volume-create/add-brick
@@ -412,57 +599,9 @@ def form_bricks_list(mnode, volname, number_of_bricks, servers, servers_info,
         form_bricks_path(g.config['servers'](0), "testvol", 6,
                          g.config['servers'], g.config['servers_info'])
     """
-    if not isinstance(servers, list):
-        servers = [servers]
-    dict_index = 0
-    bricks_list = []
-
-    servers_unused_bricks_dict = get_servers_unused_bricks_dict(mnode, servers,
-                                                                servers_info)
-    num_of_unused_bricks = 0
-    for each_server_unused_bricks_list in list(
-            servers_unused_bricks_dict.values()):
-        num_of_unused_bricks = (num_of_unused_bricks +
-                                len(each_server_unused_bricks_list))
-
-    if num_of_unused_bricks < number_of_bricks:
-        g.log.error("Not enough bricks available for creating the bricks")
-        return None
-
-    brick_index = 0
-    vol_info_dict = get_volume_info(mnode, volname)
-    if vol_info_dict:
-        brick_index = int(vol_info_dict[volname]['brickCount'])
-
-    for num in range(brick_index, brick_index + number_of_bricks):
-        # current_server is the server from which brick path will be created
-        current_server = list(servers_unused_bricks_dict.keys())[dict_index]
-        current_server_unused_bricks_list = (
-            list(servers_unused_bricks_dict.values())[dict_index])
-        brick_path = ''
-        if current_server_unused_bricks_list:
-            if dirname and (" " not in dirname):
-                brick_path = ("%s:%s/%s_brick%s" %
-                              (current_server,
-                               current_server_unused_bricks_list[0], dirname,
-                               num))
-                bricks_list.append(brick_path)
-            else:
-                brick_path = ("%s:%s/%s_brick%s" %
-                              (current_server,
-                               current_server_unused_bricks_list[0], volname,
-                               num))
-                bricks_list.append(brick_path)
-
-            # Remove the added brick from the current_server_unused_bricks_list
-            list(servers_unused_bricks_dict.values())[dict_index].pop(0)
-
-        if dict_index < len(servers_unused_bricks_dict) - 1:
-            dict_index = dict_index + 1
-        else:
-            dict_index = 0
-
-    return bricks_list
+    if allocator is None:
+        allocator = BrickAllocator(mnode, servers, servers_info)
+    return allocator.allocate(volname, number_of_bricks, dirname)
 
 
 def is_rhel6(servers):
@@ -948,8 +1087,8 @@ def add_user(servers, username, group=None):
                         added.(Default:None)
 
     Returns:
-        bool : True if user add is successful on all servers.
-            False otherwise.
+        NodeResults : Outcome on every server (see run_on_nodes). True if
+            user add is successful on all servers. False otherwise.
     """
     # Checking if group is given or not.
     if not group:
@@ -957,16 +1096,10 @@ def add_user(servers, username, group=None):
     else:
         cmd = "useradd -G %s %s" % (group, username)
 
-    if not isinstance(servers, list):
-        servers = [servers]
-
-    results = g.run_parallel(servers, cmd)
-    for server, ret_value in list(results.items()):
-        retcode, _, err = ret_value
-        if retcode != 0 and "already exists" not in err:
-            g.log.error("Unable to add user on %s", server)
-            return False
-    return True
+    results = run_on_nodes(servers, cmd, is_ok=_created_or_exists)
+    for server in results.failed_nodes:
+        g.log.error("Unable to add user on %s", server)
+    return results
 
 
 def del_user(host, uname):
@@ -997,23 +1130,16 @@ def group_add(servers, groupname):
         groupname(str): Name of the group to be created.
 
     Returns:
-        bool: True if add group is successful on all servers.
-            False otherwise.
+        NodeResults : Outcome on every server (see run_on_nodes). True if
+            add group is successful on all servers. False otherwise.
 
     """
-    if not isinstance(servers, list):
-        servers = [servers]
-
     cmd = "groupadd %s" % groupname
-    results = g.run_parallel(servers, cmd)
-
-    for server, ret_value in list(results.items()):
-        retcode, _, err = ret_value
-        if retcode != 0 and "already exists" not in err:
-            g.log.error("Unable to add group %s on server %s",
-                        groupname, server)
-            return False
-    return True
+    results = run_on_nodes(servers, cmd, is_ok=_created_or_exists)
+    for server in results.failed_nodes:
+        g.log.error("Unable to add group %s on server %s",
+                    groupname, server)
+    return results
 
 
 def group_del(servers, groupname):
@@ -1191,14 +1317,75 @@ def is_passwordless_ssh_configured(fromnode, tonode, username):
     return True
 
 
-def collect_bricks_arequal(bricks_list):
-    """Collects arequal for all bricks in list
+def upload_incremental_arequal(nodes):
+    """Uploads the incremental arequal script to the nodes missing it
+
+    Args:
+        nodes (list): Nodes on which incremental arequals are collected.
+
+    Returns:
+        bool: True if the script is present on all the nodes.
+            False otherwise.
+    """
+    # Adding here to avoid cyclic imports
+    from glustolibs.misc.misc_libs import upload_scripts
+
+    script_dir, _ = INCREMENTAL_AREQUAL_SCRIPT.rsplit('/', 1)
+    missing = [node for node in set(nodes)
+               if g.run(node, "test -e %s" % INCREMENTAL_AREQUAL_SCRIPT)[0]]
+    if missing and not upload_scripts(missing, INCREMENTAL_AREQUAL_SCRIPT,
+                                      script_dir):
+        g.log.error("Failed to upload %s to %s",
+                    INCREMENTAL_AREQUAL_SCRIPT, missing)
+        return False
+    return True
+
+
+def form_arequal_cmd(path, ignore_list=(), incremental=False):
+    """Forms the command computing the arequal-checksum of a path
+
+    Args:
+        path (str): Path whose arequal is to be calculated.
+
+    Kwargs:
+        ignore_list (list): Entries of path to leave out of the checksum.
+        incremental (bool): Use the incremental arequal script, which caches
+            the checksums of the files on the node and only reads again the
+            files changed since its previous run on the same path. It still
+            lstats every entry of the path on every run. The
+            script has to be uploaded with upload_incremental_arequal().
+            Its checksums are not comparable with arequal-checksum ones.
+
+    Returns:
+        str: The arequal command.
+    """
+    if incremental:
+        cmd = "/usr/bin/env python %s -p %s" % (INCREMENTAL_AREQUAL_SCRIPT,
+                                                path)
+    else:
+        cmd = "arequal-checksum -p %s" % path
+    for ignore in ignore_list:
+        cmd += " -i %s" % ignore
+    return cmd
+
+
+def collect_bricks_arequal(bricks_list, incremental=False, max_workers=16):
+    """Collects arequal for all bricks in list. The bricks of a node are
+    checksummed one after another, as they often share a disk, and the
+    nodes concurrently.
 
     Args:
         bricks_list (list): List of bricks.
         Example:
             bricks_list = 'gluster.blr.cluster.com:/bricks/brick1/vol'
 
+    Kwargs:
+        incremental (bool): Only read the files changed since the previous
+            incremental collection on the bricks (see form_arequal_cmd).
+            Defaults to False.
+        max_workers (int): Maximum number of nodes on which arequals are
+            collected at the same time. Defaults to 16.
+
     Returns:
         tuple(bool, list):
             On success returns (True, list of arequal-checksums of each brick)
@@ -1212,27 +1399,49 @@ def collect_bricks_arequal(bricks_list):
         >>> ret
         True
     """
+    # Adding here to keep the import cheap for the users not needing it
+    from multiprocessing.pool import ThreadPool
+
     # Converting a bricks_list to list if not.
     if not isinstance(bricks_list, list):
         bricks_list = [bricks_list]
-
-    return_code, arequal_list = True, []
-    for brick in bricks_list:
-
-        # Running arequal-checksum on the brick.
-        node, brick_path = brick.split(':')
-        cmd = ('arequal-checksum -p {} -i .glusterfs -i .landfill -i .trashcan'
-               .format(brick_path))
-        ret, arequal, _ = g.run(node, cmd)
-
-        # Generating list accordingly
-        if ret:
-            g.log.error('Failed to get arequal on brick %s', brick)
-            return_code = False
-            arequal_list.append(None)
-        else:
-            g.log.info('Successfully calculated arequal for brick %s', brick)
-            arequal_list.append(arequal)
+    if not bricks_list:
+        return (True, [])
+
+    if incremental and not upload_incremental_arequal(
+            [brick.split(':')[0] for brick in bricks_list]):
+        return (False, [None] * len(bricks_list))
+
+    # Indexes of the bricks of every node
+    node_bricks = OrderedDict()
+    for index, brick in enumerate(bricks_list):
+        node_bricks.setdefault(brick.split(':')[0], []).append(index)
+
+    arequal_list = [None] * len(bricks_list)
+
+    def _collect_node_arequals(node):
+        rcode = True
+        for index in node_bricks[node]:
+            brick = bricks_list[index]
+            cmd = form_arequal_cmd(brick.split(':')[1],
+                                   ('.glusterfs', '.landfill', '.trashcan'),
+                                   incremental)
+            ret, arequal, _ = g.run(node, cmd)
+            if ret:
+                g.log.error('Failed to get arequal on brick %s', brick)
+                rcode = False
+            else:
+                g.log.info('Successfully calculated arequal for brick %s',
+                           brick)
+                arequal_list[index] = arequal
+        return rcode
+
+    pool = ThreadPool(min(max_workers, len(node_bricks)))
+    try:
+        return_code = all(pool.map(_collect_node_arequals, node_bricks))
+    finally:
+        pool.close()
+        pool.join()
 
     return (return_code, arequal_list)
 
@@ -1257,3 +1466,283 @@ def get_usable_size_per_disk(brickpath, min_free_limit=10):
     min_free_size = size * min_free_limit // 100
     usable_size = ((size - min_free_size) // 1048576) + 1
     return usable_size
+
+
+def wait_for_condition(condition, timeout=300, interval=0.5,
+                       max_interval=10, backoff=1.5):
+    """Polls condition with an exponential backoff until it returns a truthy
+    value or until timeout.
+
+    The first check is done immediately. The interval between two checks
+    starts at 'interval' seconds and is multiplied by 'backoff' after every
+    check, without exceeding 'max_interval' or the time left till timeout.
+
+    Args:
+        condition (callable): Function without arguments which returns a
+            truthy value once the wait is over, False or None otherwise.
+
+    Kwargs:
+        timeout (int|float): Maximum number of seconds to wait.
+            Defaults to 300.
+        interval (int|float): Initial interval between two checks in
+            seconds. Defaults to 0.5.
+        max_interval (int|float): Maximum interval between two checks in
+            seconds. Defaults to 10.
+        backoff (int|float): Factor by which the interval grows after each
+            check. Defaults to 1.5.
+
+    Returns:
+        The first truthy value returned by condition. The value returned by
+        the last check (False or None) on timeout.
+
+    Example:
+        >>> wait_for_condition(lambda: is_glusterd_running(servers) == 0,
+                               timeout=80)
+        True
+    """
+    end_time = time.time() + timeout
+    while True:
+        ret = condition()
+        if ret:
+            return ret
+        time_left = end_time - time.time()
+        if time_left <= 0:
+            return ret
+        time.sleep(min(interval, max_interval, time_left))
+        interval *= backoff
+
+
+class HostResolver(object):
+    """Cache of the hostname <-> IP resolutions, for the helpers resolving
+    the same nodes over and over (e.g., the peer checks polled every
+    second), so that a slow resolver is only hit once per TTL.
+
+    Failed resolutions are not cached, a node coming up later in DNS
+    resolves on the next call.
+    """
+    def __init__(self, ttl=300):
+        """Init the cache
+
+        Kwargs:
+            ttl (int): Number of seconds for which a resolution is valid,
+                0 disables the caching. Defaults to 300.
+        """
+        self.ttl = ttl
+        self._lock = Lock()
+        self._ips = {}
+        self._hostnames = {}
+
+    def _get(self, entries, key):
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None and time.time() - entry[0] < self.ttl:
+                return entry[1]
+        return None
+
+    def _put(self, entries, key, value):
+        if self.ttl > 0:
+            with self._lock:
+                entries[key] = (time.time(), value)
+
+    def get_ip(self, host):
+        """Drop-in for socket.gethostbyname
+
+        Args:
+            host (str): hostname or IP
+
+        Returns:
+            str: the IPv4 address of the host
+
+        Raises:
+            socket.gaierror: if the host could not be resolved
+        """
+        ip = self._get(self._ips, host)
+        if ip is None:
+            ip = socket.gethostbyname(host)
+            self._put(self._ips, host, ip)
+        return ip
+
+    def get_hostname(self, ip):
+        """Drop-in for socket.gethostbyaddr(ip)[0]
+
+        Args:
+            ip (str): IP or hostname
+
+        Returns:
+            str: the primary hostname of the IP
+
+        Raises:
+            socket.herror: if the IP could not be resolved
+        """
+        hostname = self._get(self._hostnames, ip)
+        if hostname is None:
+            hostname = socket.gethostbyaddr(ip)[0]
+            self._put(self._hostnames, ip, hostname)
+        return hostname
+
+    def invalidate(self, host=None):
+        """Drop the cached resolutions of a host, or all of them
+
+        Kwargs:
+            host (str): hostname or IP. If not given, all the cached
+                resolutions are dropped.
+        """
+        with self._lock:
+            if host is None:
+                self._ips.clear()
+                self._hostnames.clear()
+            else:
+                self._ips.pop(host, None)
+                self._hostnames.pop(host, None)
+
+
+_host_resolver = HostResolver()
+
+
+def get_ip_of_host(host):
+    """Returns the IP of a host, resolved at most once per TTL of the
+    shared host resolution cache.
+
+    Args:
+        host (str): hostname or IP
+
+    Returns:
+        str: the IPv4 address of the host
+
+    Raises:
+        socket.gaierror: if the host could not be resolved
+    """
+    return _host_resolver.get_ip(host)
+
+
+def get_hostname_of_ip(ip):
+    """Returns the hostname of an IP, resolved at most once per TTL of the
+    shared host resolution cache.
+
+    Args:
+        ip (str): IP address
+
+    Returns:
+        str: the primary hostname of the IP
+
+    Raises:
+        socket.herror: if the IP could not be resolved
+    """
+    return _host_resolver.get_hostname(ip)
+
+
+def set_host_resolution_cache_ttl(ttl):
+    """Sets how long the shared host resolutions are cached, e.g. 0 for
+    tests changing /etc/hosts or DNS.
+
+    Args:
+        ttl (int): Number of seconds for which a resolution is valid,
+            0 disables the caching.
+    """
+    _host_resolver.ttl = ttl
+    _host_resolver.invalidate()
+
+
+def invalidate_host_resolution_cache(host=None):
+    """Drops the cached resolutions of a host, or all of them.
+
+    Kwargs:
+        host (str): hostname or IP. If not given, all the cached
+            resolutions are dropped.
+    """
+    _host_resolver.invalidate(host)
+
+
+class NodeResult(namedtuple('NodeResult',
+                            'ok retcode out err duration')):
+    """Outcome of a command run on one node by run_on_nodes: whether it
+    succeeded, its (retcode, out, err) and how long it took in seconds."""
+    __slots__ = ()
+
+
+class NodeResults(dict):
+    """Per node outcomes of run_on_nodes in the format {node: NodeResult}.
+
+    Evaluates to True when the command succeeded on all the nodes, so the
+    helpers returning it keep working for callers expecting a bool.
+    """
+    def __bool__(self):
+        return all(result.ok for result in self.values())
+    __nonzero__ = __bool__
+
+    @property
+    def failed_nodes(self):
+        """list: nodes on which the command failed"""
+        return [node for node, result in self.items() if not result.ok]
+
+    @property
+    def duration(self):
+        """float: wall clock time of the slowest node in seconds"""
+        return max([result.duration for result in self.values()] or [0])
+
+
+def _retcode_ok(retcode, out, err):
+    """Default success check of run_on_nodes"""
+    return retcode == 0
+
+
+def _created_or_exists(retcode, out, err):
+    """Success check of run_on_nodes for commands creating an entity"""
+    return retcode == 0 or "already exists" in err
+
+
+def run_on_nodes(nodes, cmd, is_ok=None, max_workers=16, user=None):
+    """Run a command on nodes concurrently, in a bounded pool of threads,
+    and collect the outcome and timing on every node.
+
+    Args:
+        nodes (str|list): Node(s) on which the command has to be run.
+        cmd (str|callable): Command to run, or a function returning the
+            command to run for a given node.
+
+    Kwargs:
+        is_ok (callable): Function telling from (retcode, out, err)
+            whether the command succeeded. Defaults to retcode == 0.
+        max_workers (int): Maximum number of nodes on which the command
+            runs at the same time. Defaults to 16.
+        user (str): User to run the command as. Defaults to the glusto
+            user.
+
+    Returns:
+        NodeResults: outcome of the command on every node, True if it
+            succeeded on all of them.
+
+    Example:
+        >>> results = run_on_nodes(servers, "pgrep glusterd")
+        >>> results.failed_nodes
+        ['server2.example.com']
+    """
+    # Adding here to keep the import cheap for the users not needing it
+    from multiprocessing.pool import ThreadPool
+
+    if not isinstance(nodes, list):
+        nodes = [nodes]
+    if is_ok is None:
+        is_ok = _retcode_ok
+
+    def _run(node):
+        node_cmd = cmd(node) if callable(cmd) else cmd
+        start = time.time()
+        retcode, out, err = g.run(node, node_cmd, user=user)
+        return NodeResult(bool(is_ok(retcode, out, err)), retcode, out, err,
+                          time.time() - start)
+
+    results = NodeResults()
+    if not nodes:
+        return results
+    pool = ThreadPool(min(max_workers, len(nodes)))
+    try:
+        for node, result in zip(nodes, pool.map(_run, nodes)):
+            results[node] = result
+    finally:
+        pool.close()
+        pool.join()
+    g.log.debug("Ran '%s' on %d nodes in %.2f seconds (slowest node)",
+                cmd if not callable(cmd) else cmd.__name__, len(nodes),
+                results.duration)
+    return results
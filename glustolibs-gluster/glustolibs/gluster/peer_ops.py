@@ -24,10 +24,11 @@ import re
 import socket
 from time import sleep
 from glusto.core import Glusto as g
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+from glustolibs.gluster.lib_utils import get_ip_of_host, wait_for_condition
+from glustolibs.gluster.xml_parser import (ParseError, XmlRecord,
+                                           child_texts, get_xml_records)
+
+_PEER_SCHEMA = XmlRecord(fields={'hostnames': child_texts})
 
 
 def peer_probe(mnode, server):
@@ -282,24 +283,11 @@ def get_peer_status(mnode):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        return get_xml_records(out, "peerStatus/peer", _PEER_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse the gluster peer status xml output.")
         return None
 
-    peer_status_list = []
-    for peer in root.findall("peerStatus/peer"):
-        peer_dict = {}
-        for element in peer.getchildren():
-            if element.tag == "hostnames":
-                hostnames_list = []
-                for hostname in element.getchildren():
-                    hostnames_list.append(hostname.text)
-                element.text = hostnames_list
-            peer_dict[element.tag] = element.text
-        peer_status_list.append(peer_dict)
-    return peer_status_list
-
 
 def get_pool_list(mnode):
     """Parse the output of 'gluster pool list' command.
@@ -334,28 +322,104 @@ def get_pool_list(mnode):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        pool_list_list = get_xml_records(out, "peerStatus/peer",
+                                         _PEER_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse the gluster pool list xml output.")
         return None
 
-    pool_list_list = []
-    for peer in root.findall("peerStatus/peer"):
-        peer_dict = {}
-        for element in peer.getchildren():
-            if element.tag == "hostname" and element.text == 'localhost':
-                element.text = mnode
-            if element.tag == "hostnames":
-                hostnames_list = []
-                for hostname in element.getchildren():
-                    hostnames_list.append(hostname.text)
-                element.text = hostnames_list
-            peer_dict[element.tag] = element.text
-
-        pool_list_list.append(peer_dict)
+    for peer_dict in pool_list_list:
+        if peer_dict.get('hostname') == 'localhost':
+            peer_dict['hostname'] = mnode
     return pool_list_list
 
 
+_PEER_UUID_RE = re.compile(r'([0-9a-f]{8})(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}',
+                           re.I)
+
+_PEER_CONNECTED = "Peer in Cluster, Connected"
+
+
+def _get_ip(host):
+    """IP of a host from the shared resolution cache, None if the host
+    does not resolve"""
+    try:
+        return get_ip_of_host(host)
+    except socket.gaierror as err:
+        g.log.error("Failed to get the IP of %s: %s", host, err)
+        return None
+
+
+def _match_peers_to_servers(peer_status_list, servers):
+    """Find the peer of every server in the output of get_peer_status, by
+    the names the peers are known by and, for the servers not found
+    that way, by their IPs.
+
+    Returns:
+        dict: peer status of every server, None for the servers which are
+            not in the pool.
+    """
+    peers_by_name = {}
+    for peer in peer_status_list:
+        for name in [peer['hostname']] + (peer.get('hostnames') or []):
+            peers_by_name.setdefault(name, peer)
+
+    peers_by_ip = None
+    server_peers = {}
+    for server in servers:
+        peer = peers_by_name.get(server)
+        if peer is None:
+            if peers_by_ip is None:
+                peers_by_ip = {}
+                for name, name_peer in list(peers_by_name.items()):
+                    peers_by_ip.setdefault(_get_ip(name), name_peer)
+            server_ip = _get_ip(server)
+            if server_ip is not None:
+                peer = peers_by_ip.get(server_ip)
+        server_peers[server] = peer
+    return server_peers
+
+
+def _peer_state(peer):
+    """State of a peer as checked by is_peer_connected, _PEER_CONNECTED
+    for a valid peer in cluster and connected. None if not in the pool."""
+    if peer is None:
+        return None
+    if _PEER_UUID_RE.match(peer['uuid']) is None:
+        return "Invalid UUID '%s'" % peer['uuid']
+    return "%s, %s" % (peer['stateStr'], "Connected"
+                       if peer['connected'] == '1' else "Disconnected")
+
+
+def get_peers_state(mnode, servers):
+    """Gets the state of the given servers in the pool of mnode, from one
+    'gluster peer status' run.
+
+    Args:
+        mnode (str): Node on which command has to be executed.
+        servers (str|list): A server|List of servers.
+
+    Returns:
+        dict: state of every server on success, in the format
+            "<stateStr>, Connected|Disconnected" (e.g., 'Peer in Cluster,
+            Connected'), None for the servers which are not in the pool.
+        NoneType: None if the peer status could not be fetched.
+
+    Example:
+        >>> get_peers_state("abc.com", ["def.com", "ghi.com"])
+        {'def.com': 'Peer in Cluster, Connected', 'ghi.com': None}
+    """
+    if not isinstance(servers, list):
+        servers = [servers]
+    peer_status_list = get_peer_status(mnode)
+    if peer_status_list is None:
+        g.log.error("Failed to parse the peer status of %s", mnode)
+        return None
+    server_peers = _match_peers_to_servers(peer_status_list, servers)
+    return dict((server, _peer_state(server_peers[server]))
+                for server in servers)
+
+
 def is_peer_connected(mnode, servers):
     """Checks whether specified peers are in cluster and 'Connected' state.
 
@@ -385,35 +449,21 @@ def is_peer_connected(mnode, servers):
                     "connected.")
         return False
 
-    # Convert all hostnames to ip's
-    server_ips = []
-    for server in servers:
-        server_ips.append(socket.gethostbyname(server))
-
+    server_peers = _match_peers_to_servers(peer_status_list, servers)
     is_connected = True
-    for peer_stat in peer_status_list:
-        if socket.gethostbyname(peer_stat['hostname']) in server_ips:
-            if (re.match(r'([0-9a-f]{8})(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}',
-                         peer_stat['uuid'], re.I) is None):
-                g.log.error("Invalid UUID for the node '%s'",
-                            peer_stat['hostname'])
-                is_connected = False
-            if (peer_stat['stateStr'] != "Peer in Cluster" or
-                    peer_stat['connected'] != '1'):
-                g.log.error("Peer '%s' not in connected state",
-                            peer_stat['hostname'])
-                is_connected = False
+    for server in servers:
+        state = _peer_state(server_peers[server])
+        if state is not None and state != _PEER_CONNECTED:
+            g.log.error("Peer '%s' not in connected state: %s", server,
+                        state)
+            is_connected = False
 
     if not is_connected:
         return False
 
-    peer_ips = [socket.gethostbyname(peer_stat['hostname']) for
-                peer_stat in peer_status_list]
-    if not (set(server_ips).issubset(peer_ips)):
-        servers_not_in_pool = list(set(server_ips).difference(peer_ips))
-        for index, server in enumerate(servers_not_in_pool):
-            if not (server in servers):
-                servers_not_in_pool[index] = socket.gethostbyaddr(server)[0]
+    servers_not_in_pool = [server for server in servers
+                           if server_peers[server] is None]
+    if servers_not_in_pool:
         g.log.error("Servers: '%s' not yet added to the pool.",
                     servers_not_in_pool)
         return False
@@ -426,6 +476,10 @@ def is_peer_connected(mnode, servers):
 def wait_for_peers_to_connect(mnode, servers, wait_timeout=30):
     """Checks nodes are peer connected with timeout.
 
+    Every check runs one 'gluster peer status' and logs the servers whose
+    state changed since the previous check, instead of the state of all
+    the servers every time.
+
     Args:
         mnode: node on which cmd has to be executed.
         servers (str|list): A server|List of server hosts on which peer
@@ -439,14 +493,26 @@ def wait_for_peers_to_connect(mnode, servers, wait_timeout=30):
     """
     if not isinstance(servers, list):
         servers = [servers]
+    servers = [server for server in servers if server != mnode]
+    states = {}
 
-    count = 0
-    while count <= wait_timeout:
-        ret = is_peer_connected(mnode, servers)
-        if ret:
-            g.log.info("peers in connected state: %s", servers)
-            return True
-        sleep(1)
-        count += 1
-    g.log.error("Peers are not in connected state: %s", servers)
+    def _all_connected():
+        peers_state = get_peers_state(mnode, servers)
+        if peers_state is None:
+            return False
+        for server in servers:
+            state = peers_state[server] or "Not in the pool"
+            if states.get(server) != state:
+                g.log.info("Peer %s: %s", server, state)
+                states[server] = state
+        return all(state == _PEER_CONNECTED for state in states.values())
+
+    ret = wait_for_condition(_all_connected, timeout=wait_timeout,
+                             max_interval=1)
+    if ret:
+        g.log.info("peers in connected state: %s", servers)
+        return True
+    g.log.error("Peers are not in connected state: %s",
+                dict((server, state) for server, state in states.items()
+                     if state != _PEER_CONNECTED))
     return False
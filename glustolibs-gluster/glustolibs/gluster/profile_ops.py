@@ -20,10 +20,24 @@
 """
 from glusto.core import Glusto as g
 from pprint import pformat
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+from glustolibs.gluster.xml_parser import (ParseError, XmlRecord,
+                                           find_xml_record)
+
+
+def _numbered_records(elem, prefix, start):
+    """Converts the children of an element to dicts of their children,
+    keyed by prefix followed by their position counted from start"""
+    return dict(("%s%d" % (prefix, counter), XmlRecord().convert(child))
+                for counter, child in enumerate(elem, start))
+
+
+_PROFILE_STATS_SCHEMA = XmlRecord(fields={
+    'blockStats': lambda elem: _numbered_records(elem, 'block', 1),
+    'fopStats': lambda elem: _numbered_records(elem, 'fop', 0)})
+
+_PROFILE_INFO_SCHEMA = XmlRecord(lists={'brick': XmlRecord(fields={
+    'cumulativeStats': _PROFILE_STATS_SCHEMA,
+    'intervalStats': _PROFILE_STATS_SCHEMA})})
 
 
 def profile_start(mnode, volname):
@@ -161,79 +175,21 @@ def get_profile_info(mnode, volname, options=''):
         g.log.error("Profile not running on volume.")
         return None
 
-    # Iterating through the XML and creating dict
-    root = etree.XML(out)
-    volprofileinfo = {}
-    volume = root.find("volProfile")
-    brick_counter = 0
-    for elem in volume.getchildren():
-        if elem.tag == "volname":
-            volname = elem.text
-            volprofileinfo[volname] = {}
-        elif elem.tag == "brick":
-            brick_counter += 1
-            volprofileinfo[volname][elem.tag+str(brick_counter)] = {}
-            brick_dict = volprofileinfo[volname][elem.tag+str(brick_counter)]
-            for brick_tag in elem.getchildren():
-                if 'cumulativeStats' == brick_tag.tag:
-                    brick_dict["cumulativeStats"] = {}
-                    for el in brick_tag.getchildren():
-                        if el.tag == 'duration':
-                            brick_dict["cumulativeStats"][el.tag] = el.text
-                        elif el.tag == 'totalWrite' or el.tag == 'totalRead':
-                            brick_dict["cumulativeStats"][el.tag] = el.text
-                        elif el.tag == 'blockStats':
-                            brick_dict["cumulativeStats"][el.tag] = {}
-                            block_dict = brick_dict["cumulativeStats"][el.tag]
-                            counter = 0
-                            for block in el.getchildren():
-                                counter += 1
-                                block_dict[block.tag+str(counter)] = {}
-                                elm_dict = block_dict[block.tag+str(counter)]
-                                for block_elm in block.getchildren():
-                                    elm_dict[block_elm.tag] = block_elm.text
-                        elif el.tag == 'fopStats':
-                            brick_dict["cumulativeStats"][el.tag] = {}
-                            fop_dict = brick_dict["cumulativeStats"][el.tag]
-                            fop_count = 0
-                            for fops in el.getchildren():
-                                fop_dict['fop'+str(fop_count)] = {}
-                                fop_param = fop_dict['fop'+str(fop_count)]
-                                for fop in fops.getchildren():
-                                    fop_param[fop.tag] = fop.text
-                                fop_count += 1
-                elif 'intervalStats' == brick_tag.tag:
-                    brick_dict["intervalStats"] = {}
-                    for el in brick_tag.getchildren():
-                        if el.tag == 'duration':
-                            brick_dict["intervalStats"][el.tag] = el.text
-                        elif el.tag == 'totalWrite' or el.tag == 'totalRead':
-                            brick_dict["intervalStats"][el.tag] = el.text
-                        elif el.tag == 'blockStats':
-                            brick_dict["intervalStats"][el.tag] = {}
-                            block_dict = brick_dict["intervalStats"][el.tag]
-                            counter = 0
-                            for block in el.getchildren():
-                                counter += 1
-                                block_dict[block.tag+str(counter)] = {}
-                                elm_dict = block_dict[block.tag+str(counter)]
-                                for block_elm in block.getchildren():
-                                    elm_dict[block_elm.tag] = block_elm.text
-                        elif el.tag == 'fopStats':
-                            brick_dict["intervalStats"][el.tag] = {}
-                            fop_dict = brick_dict["intervalStats"][el.tag]
-                            fop_count = 0
-                            for fops in el.getchildren():
-                                fop_dict['fop'+str(fop_count)] = {}
-                                fop_param = fop_dict['fop'+str(fop_count)]
-                                for fop in fops.getchildren():
-                                    fop_param[fop.tag] = fop.text
-                                fop_count += 1
-                else:
-                    brick_dict[brick_tag.tag] = brick_tag.text
-        else:
-            volprofileinfo[elem.tag] = elem.text
+    try:
+        volprofileinfo = find_xml_record(out, "volProfile",
+                                         _PROFILE_INFO_SCHEMA)
+    except ParseError:
+        g.log.error("Failed to parse the volume profile info xml output.")
+        return None
+    if volprofileinfo is None:
+        g.log.error("No profile info in the volume profile info output.")
+        return None
 
+    volname = volprofileinfo.pop("volname", volname)
+    bricks = volprofileinfo.pop("brick", [])
+    volprofileinfo[volname] = dict(("brick%d" % counter, brick)
+                                   for counter, brick in
+                                   enumerate(bricks, 1))
     g.log.debug("Volume profile info output: %s"
                 % pformat(volprofileinfo, indent=10))
     return volprofileinfo
@@ -18,13 +18,10 @@
 """
     Description: Library for gluster quota operations.
 """
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
-
 from glusto.core import Glusto as g
-from glustolibs.gluster.volume_ops import get_volume_options
+from glustolibs.gluster.volume_ops import (get_volume_options,
+                                           invalidate_volume_snapshot_cache)
+from glustolibs.gluster.xml_parser import ParseError, get_xml_records
 
 
 def quota_enable(mnode, volname):
@@ -50,7 +47,9 @@ def quota_enable(mnode, volname):
     """
 
     cmd = "gluster volume quota %s enable" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def quota_disable(mnode, volname):
@@ -76,7 +75,9 @@ def quota_disable(mnode, volname):
     """
 
     cmd = "gluster volume quota %s disable --mode=script" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def is_quota_enabled(mnode, volname):
@@ -213,26 +214,25 @@ def quota_fetch_list(mnode, volname, path=None):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        limits = get_xml_records(out, "volQuota/limit")
+    except ParseError:
         g.log.error("Failed to parse the gluster quota list xml output.")
         return None
 
     quotalist = {}
-    for path in root.findall("volQuota/limit"):
-        for elem in path.getchildren():
-            if elem.tag == "path":
-                path = elem.text
-                quotalist[path] = {}
-            elif elem.text == 'N/A':
-                quotalist[path][elem.tag] = elem.text
-            elif elem.tag in ("hard_limit", "soft_limit_value",
-                              "used_space", "avail_space"):
-                quotalist[path][elem.tag] = int(elem.text)
-            elif elem.tag == "soft_limit_percent":
-                quotalist[path][elem.tag] = int(elem.text[:-1])
-            elif elem.tag in ("sl_exceeded", "hl_exceeded"):
-                quotalist[path][elem.tag] = bool(elem.text == 'Yes')
+    for limit in limits:
+        path = limit.pop("path")
+        quotalist[path] = {}
+        for tag, text in limit.items():
+            if text == 'N/A':
+                quotalist[path][tag] = text
+            elif tag in ("hard_limit", "soft_limit_value",
+                         "used_space", "avail_space"):
+                quotalist[path][tag] = int(text)
+            elif tag == "soft_limit_percent":
+                quotalist[path][tag] = int(text[:-1])
+            elif tag in ("sl_exceeded", "hl_exceeded"):
+                quotalist[path][tag] = bool(text == 'Yes')
             else:
                 g.log.error("Failed to parse the gluster quota"
                             "list xml output.")
@@ -308,19 +308,14 @@ def quota_fetch_list_objects(mnode, volname, path=None):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        limits = get_xml_records(out, "volQuota/limit")
+    except ParseError:
         g.log.error("Failed to parse the gluster quota list xml output.")
         return None
 
     quotalist = {}
-    for path in root.findall("volQuota/limit"):
-        for elem in path.getchildren():
-            if elem.tag == "path":
-                path = elem.text
-                quotalist[path] = {}
-            else:
-                quotalist[path][elem.tag] = elem.text
+    for limit in limits:
+        quotalist[limit.pop("path")] = limit
     return quotalist
 
 
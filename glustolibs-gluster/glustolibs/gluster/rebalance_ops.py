@@ -21,11 +21,13 @@
 
 import time
 from glusto.core import Glusto as g
+from glustolibs.gluster.lib_utils import wait_for_condition
+from glustolibs.gluster.xml_parser import (ParseError, XmlRecord,
+                                           find_xml_record)
 
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+_REBALANCE_STATUS_SCHEMA = XmlRecord(fields={'aggregate': XmlRecord()},
+                                     lists={'node': XmlRecord()},
+                                     empty_lists=True)
 
 
 def rebalance_start(mnode, volname, fix_layout=False, force=False):
@@ -172,29 +174,14 @@ def get_rebalance_status(mnode, volname):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        rebal_status = find_xml_record(out, "volRebalance",
+                                       _REBALANCE_STATUS_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse the gluster rebalance status "
                     "xml output.")
         return None
 
-    rebal_status = {}
-    rebal_status["node"] = []
-    for info in root.findall("volRebalance"):
-        for element in info.getchildren():
-            if element.tag == "node":
-                status_info = {}
-                for elmt in element.getchildren():
-                    status_info[elmt.tag] = elmt.text
-                rebal_status[element.tag].append(status_info)
-            elif element.tag == "aggregate":
-                status_info = {}
-                for elmt in element.getchildren():
-                    status_info[elmt.tag] = elmt.text
-                rebal_status[element.tag] = status_info
-            else:
-                rebal_status[element.tag] = element.text
-    return rebal_status
+    return rebal_status or {"node": []}
 
 
 def rebalance_stop_and_get_status(mnode, volname):
@@ -239,28 +226,13 @@ def rebalance_stop_and_get_status(mnode, volname):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        rebal_status = find_xml_record(out, "volRebalance",
+                                       _REBALANCE_STATUS_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse gluster rebalance stop xml output.")
         return None
 
-    rebal_status = {}
-    rebal_status["node"] = []
-    for info in root.findall("volRebalance"):
-        for element in info.getchildren():
-            if element.tag == "node":
-                status_info = {}
-                for elmt in element.getchildren():
-                    status_info[elmt.tag] = elmt.text
-                rebal_status[element.tag].append(status_info)
-            elif element.tag == "aggregate":
-                status_info = {}
-                for elmt in element.getchildren():
-                    status_info[elmt.tag] = elmt.text
-                rebal_status[element.tag] = status_info
-            else:
-                rebal_status[element.tag] = element.text
-    return rebal_status
+    return rebal_status or {"node": []}
 
 
 def wait_for_fix_layout_to_complete(mnode, volname, timeout=300):
@@ -281,24 +253,25 @@ def wait_for_fix_layout_to_complete(mnode, volname, timeout=300):
         >>> wait_for_fix_layout_to_complete("abc.com", "testvol")
     """
 
-    count = 0
-    while count < timeout:
+    def _get_status():
         status_info = get_rebalance_status(mnode, volname)
         if status_info is None:
-            return False
-
+            return 'unknown'
         status = status_info['aggregate']['statusStr']
-        if status == 'fix-layout completed':
-            g.log.info("Fix-layout is successfully completed")
-            return True
-        if status == 'fix-layout failed':
-            g.log.error("Fix-layout failed on one or more nodes."
-                        "Check rebalance status for more details")
-            return False
+        if status in ('fix-layout completed', 'fix-layout failed'):
+            return status
+        return None
 
-        time.sleep(10)
-        count = count + 10
-    g.log.error("Fix layout has not completed. Wait timeout.")
+    status = wait_for_condition(_get_status, timeout=timeout)
+    if status == 'fix-layout completed':
+        g.log.info("Fix-layout is successfully completed")
+        return True
+    if status == 'fix-layout failed':
+        g.log.error("Fix-layout failed on one or more nodes."
+                    "Check rebalance status for more details")
+        return False
+    if status is None:
+        g.log.error("Fix layout has not completed. Wait timeout.")
     return False
 
 
@@ -320,24 +293,25 @@ def wait_for_rebalance_to_complete(mnode, volname, timeout=300):
         >>> wait_for_rebalance_to_complete("abc.com", "testvol")
     """
 
-    count = 0
-    while count < timeout:
+    def _get_status():
         status_info = get_rebalance_status(mnode, volname)
         if status_info is None:
-            return False
-
+            return 'unknown'
         status = status_info['aggregate']['statusStr']
-        if status == 'completed':
-            g.log.info("Rebalance is successfully completed")
-            return True
-        if status == 'failed':
-            g.log.error(" Rebalance failed on one or more nodes."
-                        "Check rebalance status for more details")
-            return False
+        if status in ('completed', 'failed'):
+            return status
+        return None
 
-        time.sleep(10)
-        count = count + 10
-    g.log.error("Rebalance operation has not completed. Wait timeout.")
+    status = wait_for_condition(_get_status, timeout=timeout)
+    if status == 'completed':
+        g.log.info("Rebalance is successfully completed")
+        return True
+    if status == 'failed':
+        g.log.error(" Rebalance failed on one or more nodes."
+                    "Check rebalance status for more details")
+        return False
+    if status is None:
+        g.log.error("Rebalance operation has not completed. Wait timeout.")
     return False
 
 
@@ -378,29 +352,14 @@ def get_remove_brick_status(mnode, volname, bricks_list):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        remove_brick_status = find_xml_record(out, "volRemoveBrick",
+                                              _REBALANCE_STATUS_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse the remove-brick status"
                     "xml output on volume %s", volname)
         return None
 
-    remove_brick_status = {}
-    remove_brick_status["node"] = []
-    for info in root.findall("volRemoveBrick"):
-        for element in info.getchildren():
-            if element.tag == "node":
-                status_info = {}
-                for elmt in element.getchildren():
-                    status_info[elmt.tag] = elmt.text
-                remove_brick_status[element.tag].append(status_info)
-            elif element.tag == "aggregate":
-                status_info = {}
-                for elmt in element.getchildren():
-                    status_info[elmt.tag] = elmt.text
-                remove_brick_status[element.tag] = status_info
-            else:
-                remove_brick_status[element.tag] = element.text
-    return remove_brick_status
+    return remove_brick_status or {"node": []}
 
 
 def wait_for_remove_brick_to_complete(mnode, volname, bricks_list,
@@ -0,0 +1,460 @@
+#!/usr/bin/env python
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+"""
+    Description: Module for the persistent remote agents.
+
+    An agent (scripts/glusto_agent.py) is started once per node over a
+    single ssh session and then serves batched JSON requests (run a
+    command, stat, getfattr, read a file, list a directory) over the
+    stdin/stdout of that session. Once enabled, g.run on a node with an
+    agent goes through the agent instead of opening a new ssh channel;
+    nodes without an agent, or whose agent failed, use plain g.run.
+
+    Every batch carries an id and is served in a thread of its own by the
+    agent, so concurrent g.run calls on a node run concurrently as they
+    do over ssh.
+"""
+
+import base64
+import itertools
+import json
+import logging
+import time
+from threading import Event, Lock, Thread
+
+from glusto.core import Glusto as g
+
+AGENT_SCRIPT = "/usr/share/glustolibs/scripts/glusto_agent.py"
+
+# Seconds a request waits for its response before the agent is deemed
+# stuck, unless set otherwise with enable_remote_agents
+DEFAULT_AGENT_TIMEOUT = 3600
+
+_agents = {}
+_original_run = None
+
+
+class _PendingBatch(object):
+    """Batch sent to an agent, waiting for its responses"""
+    def __init__(self):
+        self.done = Event()
+        self.responses = None
+
+
+class RemoteAgent(object):
+    """Agent running on a node, serving requests over one ssh session"""
+    def __init__(self, host, user=None, timeout=DEFAULT_AGENT_TIMEOUT):
+        """Init the remote agent class
+
+        Args:
+            host (str): hostname or ip of the node
+
+        Kwargs:
+            user (str): user the agent runs as. Defaults to the glusto
+                user.
+            timeout (int): Seconds a request waits for its response
+                before the agent is deemed stuck and stopped.
+                Defaults to DEFAULT_AGENT_TIMEOUT.
+        """
+        self.host = host
+        self.user = user
+        self.timeout = timeout
+        self._proc = None
+        self._write_lock = Lock()
+        self._pending_lock = Lock()
+        self._pending = {}
+        self._batch_ids = itertools.count()
+
+    @property
+    def is_running(self):
+        """bool: True if the agent process is alive"""
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self):
+        """Upload the agent script if needed and start the agent
+
+        Returns:
+            bool: True if the agent was started. False otherwise.
+        """
+        # Adding here to avoid cyclic imports
+        from glustolibs.gluster.glusterfile import file_exists
+        from glustolibs.misc.misc_libs import upload_scripts
+
+        if self.is_running:
+            return True
+        if not file_exists(self.host, AGENT_SCRIPT):
+            if not upload_scripts(self.host, AGENT_SCRIPT,
+                                  "/usr/share/glustolibs/scripts/",
+                                  user=self.user):
+                g.log.error("Failed to upload glusto_agent.py to %s"
+                            % self.host)
+                return False
+
+        self._proc = g.run_async(self.host, "/usr/bin/env python -u %s"
+                                 % AGENT_SCRIPT, user=self.user)
+        if self._proc.stdin is None or self._proc.stdout is None:
+            g.log.error("No pipe to the agent on %s" % self.host)
+            self.stop()
+            return False
+        reader = Thread(target=self._read_responses, args=(self._proc,))
+        reader.daemon = True
+        reader.start()
+
+        # Round trip an empty batch to make sure the agent is serving
+        if self.request([], timeout=60) != []:
+            g.log.error("Failed to start the agent on %s" % self.host)
+            self.stop()
+            return False
+        g.log.info("Started the agent on %s" % self.host)
+        return True
+
+    def stop(self):
+        """Stop the agent, it exits once its stdin is closed. An agent
+        not exiting within 10 seconds is terminated."""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.stdin is not None:
+                proc.stdin.close()
+            for _ in range(100):
+                if proc.poll() is not None:
+                    break
+                time.sleep(0.1)
+            else:
+                if hasattr(proc, 'terminate'):
+                    proc.terminate()
+        except (IOError, OSError):
+            pass
+        self._fail_pending("agent stopped")
+
+    def _fail_pending(self, reason):
+        """Wake up the requests waiting for a response, with an error"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for batch in pending.values():
+            batch.responses = reason
+            batch.done.set()
+
+    def _read_responses(self, proc):
+        """Reader thread handing the responses to the waiting requests"""
+        try:
+            for reply in iter(proc.stdout.readline, b''):
+                if isinstance(reply, bytes):
+                    reply = reply.decode('utf-8')
+                if not reply:
+                    break
+                reply = json.loads(reply)
+                with self._pending_lock:
+                    batch = self._pending.pop(reply.get('id'), None)
+                if batch is not None:
+                    batch.responses = reply['responses']
+                    batch.done.set()
+        except (IOError, OSError, ValueError, KeyError) as err:
+            g.log.error("Agent on %s failed: %s" % (self.host, err))
+        self._fail_pending("agent on %s exited" % self.host)
+
+    def request(self, requests, parallel=False, timeout=None):
+        """Send a batch of requests to the agent and wait for the
+        responses. Batches sent by several threads are served
+        concurrently by the agent.
+
+        Args:
+            requests (list): requests as documented in glusto_agent.py
+                (e.g., [{'op': 'stat', 'path': '/bricks/brick0/file1'}])
+
+        Kwargs:
+            parallel (bool): serve the requests of the batch concurrently
+                on the node. Defaults to False.
+            timeout (int): Seconds to wait for the responses. Defaults to
+                the timeout of the agent.
+
+        Returns:
+            list: the responses, in the order of the requests. If the
+                agent failed or timed out once the batch was sent, every
+                response is {'error': <reason>} and the agent is stopped.
+            None: if the batch could not be sent, the agent is not
+                running or failed.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        proc = self._proc
+        if proc is None or proc.poll() is not None:
+            return None
+
+        batch = _PendingBatch()
+        with self._pending_lock:
+            batch_id = next(self._batch_ids)
+            self._pending[batch_id] = batch
+        line = json.dumps({'id': batch_id, 'requests': requests,
+                           'parallel': parallel}) + "\n"
+        try:
+            with self._write_lock:
+                try:
+                    proc.stdin.write(line.encode('utf-8'))
+                except TypeError:
+                    # Pipe opened in text mode
+                    proc.stdin.write(line)
+                proc.stdin.flush()
+        except (IOError, OSError, ValueError) as err:
+            g.log.error("Failed to send to the agent on %s: %s"
+                        % (self.host, err))
+            with self._pending_lock:
+                self._pending.pop(batch_id, None)
+            self.stop()
+            return None
+
+        if not batch.done.wait(timeout):
+            g.log.error("No response from the agent on %s in %s seconds, "
+                        "stopping it" % (self.host, timeout))
+            self.stop()
+            batch.responses = "no response in %s seconds" % timeout
+        if not isinstance(batch.responses, list):
+            reason = batch.responses or "timed out"
+            return [{'error': "Agent failed: %s" % reason}
+                    for _ in requests]
+        return batch.responses
+
+    def _request_one(self, request):
+        """Send a single request, None if it failed"""
+        responses = self.request([request])
+        if responses is None:
+            return None
+        if 'error' in responses[0]:
+            g.log.error("Agent request %s on %s failed: %s"
+                        % (request, self.host, responses[0]['error']))
+            return None
+        return responses[0]
+
+    def run(self, command):
+        """Run a command on the node
+
+        Args:
+            command (str): command to run
+
+        Returns:
+            tuple: (retcode, stdout, stderr) as returned by g.run, with
+                retcode 1 and the reason in stderr if the agent failed
+                while running the command.
+            None: if the command could not be sent to the agent.
+        """
+        responses = self.request([{'op': 'run', 'cmd': command}])
+        if responses is None:
+            return None
+        if 'error' in responses[0]:
+            return (1, '', responses[0]['error'])
+        return (responses[0]['rc'], responses[0]['out'],
+                responses[0]['err'])
+
+    def run_batch(self, commands, parallel=False):
+        """Run several commands on the node in a single round trip
+
+        Args:
+            commands (list): commands to run
+
+        Kwargs:
+            parallel (bool): run the commands concurrently. Defaults to
+                False.
+
+        Returns:
+            list: (retcode, stdout, stderr) of every command, in order.
+            None: if the agent failed.
+        """
+        responses = self.request([{'op': 'run', 'cmd': command}
+                                  for command in commands], parallel)
+        if responses is None:
+            return None
+        return [(response['rc'], response['out'], response['err'])
+                if 'error' not in response else (1, '', response['error'])
+                for response in responses]
+
+    def stat(self, path, follow=True):
+        """Get the stat data of a file on the node
+
+        Args:
+            path (str): fully qualified path of the file
+
+        Kwargs:
+            follow (bool): follow symlinks. Defaults to True.
+
+        Returns:
+            dict: stat data (mode, ino, dev, nlink, uid, gid, size, atime,
+                mtime and ctime). None on failure.
+        """
+        response = self._request_one({'op': 'stat', 'path': path,
+                                      'follow': follow})
+        return None if response is None else response['stat']
+
+    def getfattr(self, path, name=None):
+        """Get extended attributes of a file on the node
+
+        Args:
+            path (str): fully qualified path of the file
+
+        Kwargs:
+            name (str): name of the xattr. Defaults to all the xattrs.
+
+        Returns:
+            dict: hex encoded values of the xattrs in the format
+                {name: '0x...'}. None on failure.
+        """
+        response = self._request_one({'op': 'getfattr', 'path': path,
+                                      'name': name})
+        return None if response is None else response['xattrs']
+
+    def read_file(self, path, offset=0, size=-1):
+        """Read a file on the node
+
+        Args:
+            path (str): fully qualified path of the file
+
+        Kwargs:
+            offset (int): offset to read from. Defaults to 0.
+            size (int): number of bytes to read. Defaults to all.
+
+        Returns:
+            bytes: the data read. None on failure.
+        """
+        response = self._request_one({'op': 'read', 'path': path,
+                                      'offset': offset, 'size': size})
+        if response is None:
+            return None
+        return base64.b64decode(response['data'])
+
+    def listdir(self, path):
+        """List a directory on the node
+
+        Args:
+            path (str): fully qualified path of the directory
+
+        Returns:
+            list: sorted names of the entries. None on failure.
+        """
+        response = self._request_one({'op': 'listdir', 'path': path})
+        return None if response is None else response['entries']
+
+
+def _glusto_user(user):
+    """The user a command runs as, the glusto user if user is None"""
+    return user or getattr(g, 'user', None) or 'root'
+
+
+def _discard_agent(host):
+    """Drop the agent of a host from the agents and stop it"""
+    agent = _agents.pop(host, None)
+    if agent is not None:
+        agent.stop()
+
+
+def _agent_run(host, command, user=None, log_level=None):
+    """g.run replacement going through the agent of the host if any, and
+    logging the command and its results as g.run does"""
+    agent = _agents.get(host)
+    if agent is not None and not agent.is_running:
+        _discard_agent(host)
+        agent = None
+    if agent is None or _glusto_user(user) != _glusto_user(agent.user):
+        # Commands as another user go over ssh, the agent stays
+        return _original_run(host, command, user=user, log_level=log_level)
+
+    level = logging.INFO
+    if log_level:
+        level = logging.getLevelName(log_level)
+    target = "%s@%s" % (agent.user, host) if agent.user else host
+    g.log.log(level, "%s (agent): %s" % (target, command))
+    ret = agent.run(command)
+    if ret is None:
+        g.log.warning("Agent on %s is gone, running over ssh" % host)
+        _discard_agent(host)
+        return _original_run(host, command, user=user, log_level=log_level)
+
+    rcode, rout, rerr = ret
+    g.log.log(level, "RETCODE (%s): %s" % (target, rcode))
+    if rout:
+        g.log.log(level, "STDOUT (%s)...\n%s" % (target, rout))
+    if rerr:
+        g.log.log(level, "STDERR (%s)...\n%s" % (target, rerr))
+    return ret
+
+
+def enable_remote_agents(hosts, user=None, timeout=DEFAULT_AGENT_TIMEOUT):
+    """Start an agent on each of the hosts and route g.run on them through
+    the agents. disable_remote_agents has to be called once done.
+
+    Args:
+        hosts (str|list): hostnames or ips of the nodes
+
+    Kwargs:
+        user (str): user the agents run as. Defaults to the glusto user.
+        timeout (int): Seconds a command waits for its results before the
+            agent is deemed stuck and stopped. Defaults to
+            DEFAULT_AGENT_TIMEOUT.
+
+    Returns:
+        bool: True if an agent runs on all the hosts. False otherwise,
+            the hosts without one keep using plain g.run.
+    """
+    global _original_run
+    if not isinstance(hosts, list):
+        hosts = [hosts]
+
+    if _original_run is None:
+        _original_run = g.run
+    else:
+        # Start the new agents over plain ssh
+        g.run = _original_run
+
+    _ret = True
+    for host in set(hosts):
+        if host in _agents and _agents[host].is_running:
+            continue
+        _discard_agent(host)
+        agent = RemoteAgent(host, user, timeout)
+        if agent.start():
+            _agents[host] = agent
+        else:
+            _ret = False
+
+    g.run = staticmethod(_agent_run)
+    return _ret
+
+
+def disable_remote_agents():
+    """Stop all the agents and restore plain g.run"""
+    global _original_run
+    if _original_run is not None:
+        g.run = _original_run
+        _original_run = None
+    while _agents:
+        _, agent = _agents.popitem()
+        agent.stop()
+
+
+def get_agent(host):
+    """Get the running agent of a host
+
+    Args:
+        host (str): hostname or ip of the node
+
+    Returns:
+        RemoteAgent: the agent of the host. None if there is none.
+    """
+    agent = _agents.get(host)
+    if agent is not None and agent.is_running:
+        return agent
+    return None
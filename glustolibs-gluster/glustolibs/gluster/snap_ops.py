@@ -19,13 +19,23 @@
     Description: Library for gluster snapshot operations.
 """
 
+import copy
+import re
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+from threading import Lock
 from glusto.core import Glusto as g
-from glustolibs.gluster.volume_ops import volume_start, volume_stop
+from glustolibs.gluster.volume_ops import (volume_start, volume_stop,
+                                           invalidate_volume_snapshot_cache)
+from glustolibs.gluster.xml_parser import (ParseError, XmlRecord,
+                                           find_xml_record, get_xml_records,
+                                           iter_xml_records)
 
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+_SNAP_STATUS_SCHEMA = XmlRecord(fields={'volume': XmlRecord(
+    lists={'brick': XmlRecord()}, empty_lists=True)})
+
+_SNAP_INFO_SCHEMA = XmlRecord(fields={'snapVolume': XmlRecord(
+    fields={'originVolume': XmlRecord()})})
 
 
 def snap_create(mnode, volname, snapname, timestamp=False,
@@ -129,7 +139,10 @@ def snap_restore(mnode, snapname):
     """
 
     cmd = "gluster snapshot restore %s --mode=script" % snapname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    # The bricks of the restored volume are replaced by the snapshot ones
+    invalidate_volume_snapshot_cache()
+    return ret
 
 
 def snap_restore_complete(mnode, volname, snapname):
@@ -238,36 +251,15 @@ def get_snap_status(mnode):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        return get_xml_records(out, "snapStatus/snapshots/snapshot",
+                               _SNAP_STATUS_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse the gluster snapshot "
                     "status xml output.")
         return None
 
-    snap_status_list = []
-    for snap in root.findall("snapStatus/snapshots/snapshot"):
-        snap_status = {}
-        for element in snap.getchildren():
-            if element.tag == "volume":
-                status = {}
-                status["brick"] = []
-                for elmt in element.getchildren():
-                    if elmt.tag == "brick":
-                        brick_info = {}
-                        for el in elmt.getchildren():
-                            brick_info[el.tag] = el.text
-                        status["brick"].append(brick_info)
-                    else:
-                        status[elmt.tag] = elmt.text
-
-                snap_status[element.tag] = status
-            else:
-                snap_status[element.tag] = element.text
-        snap_status_list.append(snap_status)
-    return snap_status_list
-
 
-def get_snap_status_by_snapname(mnode, snapname):
+def get_snap_status_by_snapname(mnode, snapname, catalog=None):
     """Parse the output of 'gluster snapshot status' command
         for the given snapshot.
 
@@ -275,6 +267,10 @@ def get_snap_status_by_snapname(mnode, snapname):
         mnode (str): Node on which command has to be executed.
         snapname (str): snapshot name
 
+    Kwargs:
+        catalog (SnapshotCatalog): catalog to look the snapshot up in,
+            instead of running the command.
+
     Returns:
         NoneType: None if command execution fails, parse errors.
         dict: on success.
@@ -290,18 +286,31 @@ def get_snap_status_by_snapname(mnode, snapname):
         '56a39a92-c339-47cc-a8b2-9e54bb2a6324'}
     """
 
-    snap_status_list = get_snap_status(mnode)
-    if not snap_status_list:
+    if catalog is not None:
+        snap_status = catalog.get_status(snapname)
+        if snap_status is None:
+            g.log.error("The snap %s not found" % (snapname))
+        return snap_status
+
+    ret, out, _ = g.run(mnode, "gluster snapshot status --xml")
+    if ret != 0:
+        g.log.error("Failed to execute 'snapshot status' on node %s. "
+                    "Hence failed to get the snapshot status.", mnode)
+        return None
+
+    # Stop parsing at the snapshot, without converting the ones before it
+    try:
+        snap_status = find_xml_record(out, "snapStatus/snapshots/snapshot",
+                                      _SNAP_STATUS_SCHEMA,
+                                      match={'name': snapname})
+    except ParseError:
         g.log.error("Failed to parse snap status in "
                     "get_snap_status_by_snapname()")
         return None
 
-    for snap_status in snap_status_list:
-        if "name" in snap_status:
-            if snap_status["name"] == snapname:
-                return snap_status
-    g.log.error("The snap %s not found" % (snapname))
-    return None
+    if snap_status is None:
+        g.log.error("The snap %s not found" % (snapname))
+    return snap_status
 
 
 def snap_status_by_volname(mnode, volname):
@@ -395,33 +404,15 @@ def get_snap_info(mnode):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        return get_xml_records(out, "snapInfo/snapshots/snapshot",
+                               _SNAP_INFO_SCHEMA)
+    except ParseError:
         g.log.error("Failed to parse the gluster snapshot "
                     "info xml output.")
         return None
 
-    snap_info_list = []
-    for snap in root.findall("snapInfo/snapshots/snapshot"):
-        snap_info = {}
-        for element in snap.getchildren():
-            if element.tag == "snapVolume":
-                info = {}
-                for elmt in element.getchildren():
-                    if elmt.tag == "originVolume":
-                        info["originVolume"] = {}
-                        for el in elmt.getchildren():
-                            info[elmt.tag][el.tag] = el.text
-                    else:
-                        info[elmt.tag] = elmt.text
-                snap_info[element.tag] = info
-            else:
-                snap_info[element.tag] = element.text
-        snap_info_list.append(snap_info)
-    return snap_info_list
-
 
-def get_snap_info_by_snapname(mnode, snapname):
+def get_snap_info_by_snapname(mnode, snapname, catalog=None):
     """Parse the output of 'gluster snapshot info' command
         for the given snapshot.
 
@@ -429,6 +420,10 @@ def get_snap_info_by_snapname(mnode, snapname):
         mnode (str): Node on which command has to be executed.
         snapname (str): snapshot name
 
+    Kwargs:
+        catalog (SnapshotCatalog): catalog to look the snapshot up in,
+            instead of running the command.
+
     Returns:
         NoneType: None if command execution fails, parse errors.
         dict: on success.
@@ -441,21 +436,34 @@ def get_snap_info_by_snapname(mnode, snapname):
         'df1882d3f86d48738e69f298096f3810'}
     """
 
-    snap_info_list = get_snap_info(mnode)
-    if not snap_info_list:
+    if catalog is not None:
+        snap_info = catalog.get_info(snapname)
+        if snap_info is None:
+            g.log.error("The snap %s not found" % (snapname))
+        return snap_info
+
+    ret, out, _ = g.run(mnode, "gluster snapshot info --xml")
+    if ret != 0:
+        g.log.error("Failed to execute 'snapshot info' on node %s. "
+                    "Hence failed to get the snapshot info.", mnode)
+        return None
+
+    # Stop parsing at the snapshot, without converting the ones before it
+    try:
+        snap_info = find_xml_record(out, "snapInfo/snapshots/snapshot",
+                                    _SNAP_INFO_SCHEMA,
+                                    match={'name': snapname})
+    except ParseError:
         g.log.error("Failed to parse snap info in "
                     "get_snap_info_by_snapname()")
         return None
 
-    for snap_info in snap_info_list:
-        if "name" in snap_info:
-            if snap_info["name"] == snapname:
-                return snap_info
-    g.log.error("The snap %s not found" % (snapname))
-    return None
+    if snap_info is None:
+        g.log.error("The snap %s not found" % (snapname))
+    return snap_info
 
 
-def get_snap_info_by_volname(mnode, volname):
+def get_snap_info_by_volname(mnode, volname, catalog=None):
     """Parse the output of 'gluster snapshot info' command
         for the given volume.
 
@@ -463,6 +471,10 @@ def get_snap_info_by_volname(mnode, volname):
         mnode (str): Node on which command has to be executed.
         volname (str): volume name
 
+    Kwargs:
+        catalog (SnapshotCatalog): catalog to look the snapshots up in,
+            instead of running the command.
+
     Returns:
         NoneType: None if command execution fails, parse errors.
         list: list of dicts on success.
@@ -479,6 +491,9 @@ def get_snap_info_by_volname(mnode, volname):
         '2016-04-07 12:03:11', 'name': 'next_snap1'}]}
     """
 
+    if catalog is not None:
+        return catalog.get_info_by_volname(volname)
+
     cmd = "gluster snapshot info volume %s --xml" % volname
     ret, out, _ = g.run(mnode, cmd)
     if ret != 0:
@@ -486,43 +501,18 @@ def get_snap_info_by_volname(mnode, volname):
                     "Hence failed to get the snapshot info.", mnode)
         return None
 
+    schema = XmlRecord(fields={
+        'originVolume': XmlRecord(),
+        'snapshots': XmlRecord(lists={'snapshot': _SNAP_INFO_SCHEMA})})
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        snap_vol_info = find_xml_record(out, "snapInfo", schema) or {}
+    except ParseError:
         g.log.error("Failed to parse the gluster snapshot "
                     "info xml output.")
         return None
 
-    snap_vol_info = {}
-
-    for snap in root.findall("snapInfo"):
-        for element in snap.getchildren():
-            if element.tag == "originVolume":
-                info = {}
-                for elmt in element.getchildren():
-                    info[elmt.tag] = elmt.text
-                snap_vol_info[element.tag] = info
-            else:
-                snap_vol_info[element.tag] = element.text
-
-    snap_info_list = []
-    for snap in root.findall("snapInfo/snapshots/snapshot"):
-        snap_info = {}
-        for element in snap.getchildren():
-            if element.tag == "snapVolume":
-                info = {}
-                for elmt in element.getchildren():
-                    if elmt.tag == "originVolume":
-                        info["originVolume"] = {}
-                        for el in elmt.getchildren():
-                            info[elmt.tag][el.tag] = el.text
-                    else:
-                        info[elmt.tag] = elmt.text
-                snap_info[element.tag] = info
-            else:
-                snap_info[element.tag] = element.text
-        snap_info_list.append(snap_info)
-    snap_vol_info["snapshots"] = snap_info_list
+    snap_vol_info["snapshots"] = (
+        snap_vol_info.get("snapshots", {}).get("snapshot", []))
     return snap_vol_info
 
 
@@ -580,18 +570,13 @@ def get_snap_list(mnode, volname=""):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        return [snap.text for snap in
+                iter_xml_records(out, "snapList/snapshot")]
+    except ParseError:
         g.log.error("Failed to parse the gluster snapshot "
                     "list xml output.")
         return None
 
-    snap_list = []
-    for snap in root.findall("snapList/snapshot"):
-        snap_list.append(snap.text)
-
-    return snap_list
-
 
 def snap_config(mnode, volname=None):
     """Runs 'gluster snapshot config' on specific node
@@ -655,31 +640,19 @@ def get_snap_config(mnode, volname=None):
         return None
 
     try:
-        root = etree.XML(out)
-    except etree.ParseError:
+        snap_config = find_xml_record(out, "snapConfig", XmlRecord(
+            fields={'systemConfig': XmlRecord(),
+                    'volumeConfig': XmlRecord(
+                        lists={'volume': XmlRecord()})})) or {}
+    except ParseError:
         g.log.error("Failed to parse the gluster snapshot "
                     "config xml output.")
         return None
 
-    snap_config = {}
-    for config in root.findall("snapConfig/systemConfig"):
-        sys_config = {}
-        for element in config.getchildren():
-            sys_config[element.tag] = element.text
-    snap_config["systemConfig"] = sys_config
-
-    volume_config = []
-    for config in root.findall("snapConfig/volumeConfig/volume"):
-        vol_config = {}
-        for element in config.getchildren():
-            vol_config[element.tag] = element.text
-
-        if volname is not None:
-            if volname == vol_config["name"]:
-                volume_config.append(vol_config)
-        else:
-            volume_config.append(vol_config)
-
+    volume_config = snap_config.get("volumeConfig", {}).get("volume", [])
+    if volname is not None:
+        volume_config = [vol_config for vol_config in volume_config
+                         if vol_config["name"] == volname]
     snap_config["volumeConfig"] = volume_config
     return snap_config
 
@@ -885,3 +858,403 @@ def terminate_snapd_on_node(mnode):
         return None
     cmd = "kill -9 %s" % out
     return g.run(mnode, cmd)
+
+
+class SnapshotCatalog(object):
+    """Index of the snapshots of the cluster by name, origin volume and
+    UUID, to look snapshots up without fetching and parsing the info and
+    status of all the snapshots every time.
+
+    The index is built from one 'gluster snapshot info' and one 'gluster
+    snapshot status', then updated one snapshot at a time as snapshots
+    are created, deleted or restored through the catalog. Snapshots
+    changed without going through the catalog need refresh_snap() or
+    refresh().
+
+    Example:
+        >>> catalog = SnapshotCatalog(mnode)
+        >>> catalog.bulk_create("testvol", ["snap%d" % i for i in range(8)])
+        True
+        >>> catalog.get_snapnames("testvol")
+        ['snap0', 'snap1', 'snap2', 'snap3', 'snap4', 'snap5', 'snap6',
+        'snap7']
+        >>> catalog.get_status("snap7")['volume']['brickCount']
+        '2'
+    """
+    def __init__(self, mnode):
+        """Build the index of the snapshots
+
+        Args:
+            mnode (str): Node on which the gluster commands are executed.
+        """
+        self.mnode = mnode
+        self._lock = Lock()
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the index from the current snapshots of the cluster.
+
+        Returns:
+            bool: True if the index was rebuilt. False if the snapshot info
+                or status could not be fetched, the index then has what
+                could be fetched.
+        """
+        snaps_info = get_snap_info(self.mnode)
+        snaps_status = get_snap_status(self.mnode)
+        with self._lock:
+            self._info = OrderedDict()
+            self._status = {}
+            self._uuids = {}
+            self._volumes = OrderedDict()
+            self._origin_volumes = {}
+            for info in snaps_info or []:
+                self._add(info)
+            for status in snaps_status or []:
+                if status.get('name') in self._info:
+                    self._status[status['name']] = status
+        if snaps_info is None or snaps_status is None:
+            g.log.error("Failed to fetch the snapshots of the cluster from "
+                        "%s" % self.mnode)
+            return False
+        return True
+
+    def refresh_snap(self, snapname):
+        """Update the index for one snapshot, fetching only its info and
+        status. The snapshot is dropped from the index if it no longer
+        exists.
+
+        Args:
+            snapname (str): snapshot name
+
+        Returns:
+            bool: True if the index is up to date for the snapshot, False
+                if its info or status could not be fetched.
+        """
+        cmd = "gluster snapshot info %s --xml" % snapname
+        ret, out, err = g.run(self.mnode, cmd)
+        if ret != 0:
+            if "does not exist" in (out or '') + (err or ''):
+                with self._lock:
+                    self._remove(snapname)
+                return True
+            g.log.error("Failed to get the info of snapshot %s" % snapname)
+            return False
+
+        cmd = "gluster snapshot status %s --xml" % snapname
+        ret, status_out, _ = g.run(self.mnode, cmd)
+        if ret != 0:
+            g.log.error("Failed to get the status of snapshot %s"
+                        % snapname)
+            return False
+
+        try:
+            info = find_xml_record(out, "snapInfo/snapshots/snapshot",
+                                   _SNAP_INFO_SCHEMA,
+                                   match={'name': snapname})
+            status = find_xml_record(status_out,
+                                     "snapStatus/snapshots/snapshot",
+                                     _SNAP_STATUS_SCHEMA,
+                                     match={'name': snapname})
+        except ParseError:
+            g.log.error("Failed to parse the info or status of snapshot %s"
+                        % snapname)
+            return False
+
+        with self._lock:
+            if info is None:
+                self._remove(snapname, deleted=False)
+                return True
+            if snapname in self._info:
+                self._update(info)
+            else:
+                self._add(info)
+            if status is not None:
+                self._status[snapname] = status
+            else:
+                self._status.pop(snapname, None)
+        return True
+
+    def _add(self, info):
+        """Index a snapshot by its info. Called with the lock held."""
+        snapname = info['name']
+        self._info[snapname] = info
+        self._uuids[info.get('uuid')] = snapname
+        origin = (info.get('snapVolume') or {}).get('originVolume') or {}
+        volname = origin.get('name')
+        if volname is not None:
+            self._volumes.setdefault(volname, []).append(snapname)
+            self._origin_volumes[volname] = dict(origin)
+
+    def _update(self, info):
+        """Replace the info of an indexed snapshot, keeping its place in
+        the index and in the snapshots of its volume. Called with the lock
+        held."""
+        snapname = info['name']
+        old_info = self._info[snapname]
+        self._info[snapname] = info
+        if old_info.get('uuid') != info.get('uuid'):
+            self._uuids.pop(old_info.get('uuid'), None)
+            self._uuids[info.get('uuid')] = snapname
+        origin = (info.get('snapVolume') or {}).get('originVolume') or {}
+        volname = origin.get('name')
+        if volname is None:
+            return
+        self._origin_volumes[volname] = dict(origin)
+        snapnames = self._volumes.setdefault(volname, [])
+        if snapname in snapnames:
+            return
+        # The origin volume changed, move the snapshot over
+        for other_snapnames in self._volumes.values():
+            if snapname in other_snapnames:
+                other_snapnames.remove(snapname)
+        snapnames.append(snapname)
+
+    def _remove(self, snapname, deleted=True):
+        """Drop a snapshot from the index, and from the snapshot count of
+        its volume if it was deleted. Called with the lock held."""
+        info = self._info.pop(snapname, None)
+        self._status.pop(snapname, None)
+        if info is None:
+            return
+        self._uuids.pop(info.get('uuid'), None)
+        for volname, snapnames in list(self._volumes.items()):
+            if snapname not in snapnames:
+                continue
+            snapnames.remove(snapname)
+            origin = self._origin_volumes.get(volname, {})
+            if deleted and 'snapCount' in origin:
+                origin['snapCount'] = str(int(origin['snapCount']) - 1)
+            if deleted and 'snapRemaining' in origin:
+                origin['snapRemaining'] = str(
+                    int(origin['snapRemaining']) + 1)
+
+    def __contains__(self, snapname):
+        with self._lock:
+            return snapname in self._info
+
+    def __len__(self):
+        with self._lock:
+            return len(self._info)
+
+    @property
+    def snapnames(self):
+        """list: names of all the snapshots, in the order of the index"""
+        with self._lock:
+            return list(self._info.keys())
+
+    def get_snapnames(self, volname):
+        """Get the snapshots of a volume
+
+        Args:
+            volname (str): volume name
+
+        Returns:
+            list: names of the snapshots of the volume, oldest first
+        """
+        with self._lock:
+            return list(self._volumes.get(volname, []))
+
+    def get_snapname_by_uuid(self, snap_uuid):
+        """Get the name of a snapshot from its UUID
+
+        Args:
+            snap_uuid (str): snapshot UUID
+
+        Returns:
+            str: the snapshot name. None if there is no such snapshot.
+        """
+        with self._lock:
+            return self._uuids.get(snap_uuid)
+
+    def get_info(self, snapname):
+        """Get the info of a snapshot, in the format of
+        get_snap_info_by_snapname
+
+        Args:
+            snapname (str): snapshot name
+
+        Returns:
+            dict: the snapshot info. None if there is no such snapshot.
+        """
+        with self._lock:
+            return copy.deepcopy(self._info.get(snapname))
+
+    def get_status(self, snapname):
+        """Get the status of a snapshot, in the format of
+        get_snap_status_by_snapname
+
+        Args:
+            snapname (str): snapshot name
+
+        Returns:
+            dict: the snapshot status. None if there is no such snapshot.
+        """
+        with self._lock:
+            return copy.deepcopy(self._status.get(snapname))
+
+    def get_info_by_volname(self, volname):
+        """Get the info of the snapshots of a volume, in the format of
+        get_snap_info_by_volname
+
+        Args:
+            volname (str): volume name
+
+        Returns:
+            dict: the snapshots info. The snapCount and snapRemaining of
+                the originVolume are only there if the volume had a
+                snapshot since the index was built.
+        """
+        with self._lock:
+            snapshots = []
+            for snapname in self._volumes.get(volname, []):
+                info = copy.deepcopy(self._info[snapname])
+                # Not part of the output of 'snapshot info volume'
+                info.get('snapVolume', {}).pop('originVolume', None)
+                snapshots.append(info)
+            origin = dict(self._origin_volumes.get(volname,
+                                                   {'name': volname}))
+        return {'originVolume': origin, 'count': str(len(snapshots)),
+                'snapshots': snapshots}
+
+    def create(self, volname, snapname, **kwargs):
+        """Create a snapshot and add it to the index, see snap_create for
+        the arguments.
+
+        Returns:
+            tuple: (ret, out, err) of the snapshot create command.
+        """
+        ret, out, err = snap_create(self.mnode, volname, snapname, **kwargs)
+        if ret == 0:
+            self.refresh_snap(self._created_snapname(out, snapname))
+        return ret, out, err
+
+    @staticmethod
+    def _created_snapname(out, snapname):
+        """Name of the created snapshot, which has a timestamp appended
+        unless created with no-timestamp"""
+        match = re.search(r"Snap (\S+) created successfully", out or '')
+        return match.group(1) if match else snapname
+
+    def delete(self, snapname):
+        """Delete a snapshot and drop it from the index
+
+        Args:
+            snapname (str): snapshot name
+
+        Returns:
+            tuple: (ret, out, err) of the snapshot delete command.
+        """
+        ret, out, err = snap_delete(self.mnode, snapname)
+        if ret == 0:
+            with self._lock:
+                self._remove(snapname)
+        return ret, out, err
+
+    def restore(self, snapname):
+        """Restore a snapshot and update the index, the restored snapshot
+        being deleted by gluster.
+
+        Args:
+            snapname (str): snapshot name
+
+        Returns:
+            tuple: (ret, out, err) of the snapshot restore command.
+        """
+        ret, out, err = snap_restore(self.mnode, snapname)
+        if ret == 0:
+            self.refresh_snap(snapname)
+        return ret, out, err
+
+    def _run_waves(self, func, items, parallel, description):
+        """Run func on the items in waves of up to parallel concurrent
+        calls, stopping after the first wave with a failure.
+
+        Returns:
+            bool: True if func returned True for all the items.
+        """
+        if not items:
+            return True
+        pool = ThreadPool(max(1, min(parallel, len(items))))
+        try:
+            for start in range(0, len(items), parallel):
+                wave = items[start:start + parallel]
+                results = pool.map(func, wave)
+                failed = [item for item, ok in zip(wave, results) if not ok]
+                if failed:
+                    g.log.error("Failed to %s %s, skipping the %d remaining"
+                                % (description, failed,
+                                   len(items) - start - len(wave)))
+                    return False
+        finally:
+            pool.close()
+            pool.join()
+        return True
+
+    def bulk_create(self, volname, snapnames, parallel=4, retries=10,
+                    **kwargs):
+        """Create snapshots of a volume in waves of concurrent snapshot
+        creates, indexing every created snapshot.
+
+        Args:
+            volname (str): volume name
+            snapnames (list): names of the snapshots to create
+
+        Kwargs:
+            parallel (int): Number of snapshots created at the same time.
+                As glusterd serializes the snapshots of a volume, values
+                above 4-8 mostly add lock contention. Defaults to 4.
+            retries (int): Number of retries of a snapshot create failing
+                because of glusterd lock contention. Defaults to 10.
+            **kwargs: the kwargs of snap_create.
+
+        Returns:
+            bool: True if all the snapshots were created.
+        """
+        # Adding here to avoid cyclic imports
+        from glustolibs.gluster.volume_libs import _run_with_lock_retries
+
+        def _create(snapname):
+            ret, out, err = _run_with_lock_retries(
+                snap_create, retries, self.mnode, volname, snapname,
+                **kwargs)
+            if ret != 0:
+                g.log.error("Failed to create snapshot %s of %s: %s"
+                            % (snapname, volname, err))
+                return False
+            return self.refresh_snap(self._created_snapname(out, snapname))
+
+        return self._run_waves(_create, list(snapnames), parallel,
+                               "create the snapshots")
+
+    def bulk_delete(self, snapnames, parallel=4, retries=10):
+        """Delete snapshots in waves of concurrent snapshot deletes,
+        dropping every deleted snapshot from the index.
+
+        Args:
+            snapnames (list): names of the snapshots to delete
+
+        Kwargs:
+            parallel (int): Number of snapshots deleted at the same time.
+                Defaults to 4.
+            retries (int): Number of retries of a snapshot delete failing
+                because of glusterd lock contention. Defaults to 10.
+
+        Returns:
+            bool: True if all the snapshots were deleted.
+        """
+        # Adding here to avoid cyclic imports
+        from glustolibs.gluster.volume_libs import _run_with_lock_retries
+
+        def _delete(snapname):
+            ret, _, err = _run_with_lock_retries(snap_delete, retries,
+                                                 self.mnode, snapname)
+            if ret != 0:
+                g.log.error("Failed to delete snapshot %s: %s"
+                            % (snapname, err))
+                return False
+            with self._lock:
+                self._remove(snapname)
+            return True
+
+        return self._run_waves(_delete, list(snapnames), parallel,
+                               "delete the snapshots")
@@ -20,7 +20,8 @@
 """
 
 from glusto.core import Glusto as g
-from glustolibs.gluster.volume_ops import get_volume_status
+from glustolibs.gluster.volume_ops import (get_volume_status,
+                                           invalidate_volume_snapshot_cache)
 
 
 def enable_uss(mnode, volname):
@@ -42,7 +43,9 @@ def enable_uss(mnode, volname):
             of the command execution.
     """
     cmd = "gluster volume set %s features.uss enable" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def disable_uss(mnode, volname):
@@ -64,7 +67,9 @@ def disable_uss(mnode, volname):
             of the command execution.
     """
     cmd = "gluster volume set %s features.uss disable" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def is_uss_enabled(mnode, volname):
@@ -129,7 +134,7 @@ def is_snapd_running(mnode, volname):
         Example:
             is_snapd_running("abc.com", "testvol")
             """
-    vol_status = get_volume_status(mnode, volname=volname)
+    vol_status = get_volume_status(mnode, volname=volname, use_cache=False)
 
     if vol_status is None:
         g.log.error("Failed to get volume status in is_snapd_running()")
@@ -16,17 +16,23 @@
 
 """ Description: Module for gluster volume related helper functions. """
 
+import base64
+import socket
 import time
 import random
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+from collections import OrderedDict, namedtuple
+from multiprocessing.pool import ThreadPool
 from glusto.core import Glusto as g
-from glustolibs.gluster.lib_utils import form_bricks_list
-from glustolibs.gluster.brickmux_libs import form_bricks_for_multivol
+from glustolibs.gluster.lib_utils import form_bricks_list, get_ip_of_host
+from glustolibs.gluster.brickmux_libs import (form_bricks_for_multivol,
+                                              form_bricks_for_multivols)
 from glustolibs.gluster.volume_ops import (volume_create, volume_start,
-                                           set_volume_options, get_volume_info,
+                                           _form_volume_create_cmd,
+                                           _form_volume_set_cmds,
+                                           invalidate_volume_snapshot_cache,
+                                           set_volume_options,
+                                           set_volume_options_batch,
+                                           get_volume_info,
                                            volume_stop, volume_delete,
                                            volume_info, volume_status,
                                            get_volume_options,
@@ -39,6 +45,7 @@ from glustolibs.gluster.heal_libs import (
     are_all_self_heal_daemons_are_online,
     wait_for_self_heal_daemons_to_be_online)
 from glustolibs.gluster.brick_ops import add_brick, remove_brick, replace_brick
+from glustolibs.gluster.xml_parser import ParseError, find_xml_record
 
 
 def volume_exists(mnode, volname):
@@ -63,85 +70,14 @@ def volume_exists(mnode, volname):
         return False
 
 
-def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
-                 force=False, create_only=False):
-    """Setup Volume with the configuration defined in volume_config
+def _get_volume_type_kwargs(volume_config):
+    """Get the volume create kwargs and the number of bricks of the volume
+    type defined in volume_config (see setup_volume).
 
-    Args:
-        mnode (str): Node on which commands has to be executed
-        all_servers_info (dict): Information about all servers.
-        example :
-            all_servers_info = {
-                'abc.lab.eng.xyz.com': {
-                    'host': 'abc.lab.eng.xyz.com',
-                    'brick_root': '/bricks',
-                    'devices': ['/dev/vdb', '/dev/vdc', '/dev/vdd', '/dev/vde']
-                    },
-                'def.lab.eng.xyz.com':{
-                    'host': 'def.lab.eng.xyz.com',
-                    'brick_root': '/bricks',
-                    'devices': ['/dev/vdb', '/dev/vdc', '/dev/vdd', '/dev/vde']
-                    }
-                }
-        volume_config (dict): Dict containing volume information
-        example :
-            volume_config = {
-                'name': 'testvol',
-                'servers': ['server-vm1', 'server-vm2', 'server-vm3',
-                            'server-vm4'],
-                'voltype': {'type': 'distributed',
-                            'dist_count': 4,
-                            'transport': 'tcp'},
-                'extra_servers': ['server-vm9', 'server-vm10',
-                                  'server-vm11', 'server-vm12'],
-                'quota': {'limit_usage': {'path': '/', 'percent': None,
-                                          'size': '100GB'},
-                          'enable': False},
-                'uss': {'enable': False},
-                'options': {'performance.readdir-ahead': True}
-                }
-    Kwargs:
-        multi_vol (bool): True, If bricks need to created for multiple
-                          volumes(more than 5)
-                          False, Otherwise. By default, value is set to False.
-        force (bool): If this option is set to True, then volume creation
-                      command is executed with force option.
-                      False, without force option.
-                      By default, value is set to False.
-        create_only(bool): True, if only volume creation is needed.
-                           False, will do volume create, start, set operation
-                           if any provided in the volume_config.
-                           By default, value is set to False.
     Returns:
-        bool : True on successful setup. False Otherwise
-
+        tuple: (kwargs, number_of_bricks). (None, None) if the volume type
+            is not defined properly in volume_config.
     """
-    # Get volume name
-    if 'name' in volume_config:
-        volname = volume_config['name']
-    else:
-        g.log.error("Unable to get the volume name from config")
-        return False
-
-    # Check if the volume already exists
-    vollist = get_volume_list(mnode=mnode)
-    if vollist is not None and volname in vollist:
-        g.log.info("volume %s already exists. Returning...", volname)
-        return True
-
-    # Get servers
-    if 'servers' in volume_config:
-        servers = volume_config['servers']
-    else:
-        g.log.error("Unable to get the volume servers from config")
-        return False
-
-    # Get the volume type and values
-    if not ('voltype' in volume_config and 'type' in volume_config['voltype']):
-        g.log.error("Voltype not defined in config for the volume %s",
-                    volname)
-        return False
-
     volume_type = volume_config['voltype']['type']
     kwargs = {}
     number_of_bricks = 1
@@ -150,7 +86,7 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
             kwargs['dist_count'] = (volume_config['voltype']['dist_count'])
         else:
             g.log.error("Distribute count not specified in the volume config")
-            return False
+            return None, None
 
         number_of_bricks = kwargs['dist_count']
 
@@ -160,7 +96,7 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
                                        ['replica_count'])
         else:
             g.log.error("Replica count not specified in the volume config")
-            return False
+            return None, None
 
         if 'arbiter_count' in volume_config['voltype']:
             kwargs['arbiter_count'] = (volume_config['voltype']
@@ -173,14 +109,14 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
             kwargs['dist_count'] = (volume_config['voltype']['dist_count'])
         else:
             g.log.error("Distribute count not specified in the volume config")
-            return False
+            return None, None
 
         if 'replica_count' in volume_config['voltype']:
             kwargs['replica_count'] = (volume_config['voltype']
                                        ['replica_count'])
         else:
             g.log.error("Replica count not specified in the volume config")
-            return False
+            return None, None
 
         if 'arbiter_count' in volume_config['voltype']:
             kwargs['arbiter_count'] = (volume_config['voltype']
@@ -194,14 +130,14 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
                                         ['disperse_count'])
         else:
             g.log.error("Disperse Count not specified in the volume config")
-            return False
+            return None, None
 
         if 'redundancy_count' in volume_config['voltype']:
             kwargs['redundancy_count'] = (volume_config['voltype']
                                           ['redundancy_count'])
         else:
             g.log.error("Redunduncy Count not specified in the volume config")
-            return False
+            return None, None
 
         number_of_bricks = kwargs['disperse_count']
 
@@ -210,21 +146,21 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
             kwargs['dist_count'] = (volume_config['voltype']['dist_count'])
         else:
             g.log.error("Distribute Count not specified in the volume config")
-            return False
+            return None, None
 
         if 'disperse_count' in volume_config['voltype']:
             kwargs['disperse_count'] = (volume_config['voltype']
                                         ['disperse_count'])
         else:
             g.log.error("Disperse Count not specified in the volume config")
-            return False
+            return None, None
 
         if 'redundancy_count' in volume_config['voltype']:
             kwargs['redundancy_count'] = (volume_config['voltype']
                                           ['redundancy_count'])
         else:
             g.log.error("Redunduncy Count not specified in the volume config")
-            return False
+            return None, None
 
         number_of_bricks = (kwargs['dist_count'] * kwargs['disperse_count'])
 
@@ -234,36 +170,130 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
                                        ['replica_count'])
         else:
             g.log.error("Replica count not specified in the volume config")
-            return False
+            return None, None
         if 'arbiter_count' in volume_config.get('voltype'):
             kwargs['arbiter_count'] = (volume_config['voltype']
                                        ['arbiter_count'])
         else:
             g.log.error("Arbiter count not specified in the volume config")
-            return False
+            return None, None
         number_of_bricks = kwargs['replica_count']
     elif volume_type == 'distributed-arbiter':
         if 'dist_count' in volume_config.get('voltype'):
             kwargs['dist_count'] = (volume_config['voltype']['dist_count'])
         else:
             g.log.error("Distribute Count not specified in the volume config")
-            return False
+            return None, None
         if 'replica_count' in volume_config.get('voltype'):
             kwargs['replica_count'] = (volume_config['voltype']
                                        ['replica_count'])
         else:
             g.log.error("Replica count not specified in the volume config")
-            return False
+            return None, None
         if 'arbiter_count' in volume_config.get('voltype'):
             kwargs['arbiter_count'] = (volume_config['voltype']
                                        ['arbiter_count'])
         else:
             g.log.error("Arbiter count not specified in the volume config")
-            return False
+            return None, None
         number_of_bricks = (kwargs['dist_count'] * kwargs['replica_count'])
 
     else:
         g.log.error("Invalid volume type defined in config")
+        return None, None
+
+    return kwargs, number_of_bricks
+
+
+def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
+                 force=False, create_only=False, pipelined=False):
+    """Setup Volume with the configuration defined in volume_config
+
+    Args:
+        mnode (str): Node on which commands has to be executed
+        all_servers_info (dict): Information about all servers.
+        example :
+            all_servers_info = {
+                'abc.lab.eng.xyz.com': {
+                    'host': 'abc.lab.eng.xyz.com',
+                    'brick_root': '/bricks',
+                    'devices': ['/dev/vdb', '/dev/vdc', '/dev/vdd', '/dev/vde']
+                    },
+                'def.lab.eng.xyz.com':{
+                    'host': 'def.lab.eng.xyz.com',
+                    'brick_root': '/bricks',
+                    'devices': ['/dev/vdb', '/dev/vdc', '/dev/vdd', '/dev/vde']
+                    }
+                }
+        volume_config (dict): Dict containing volume information
+        example :
+            volume_config = {
+                'name': 'testvol',
+                'servers': ['server-vm1', 'server-vm2', 'server-vm3',
+                            'server-vm4'],
+                'voltype': {'type': 'distributed',
+                            'dist_count': 4,
+                            'transport': 'tcp'},
+                'extra_servers': ['server-vm9', 'server-vm10',
+                                  'server-vm11', 'server-vm12'],
+                'quota': {'limit_usage': {'path': '/', 'percent': None,
+                                          'size': '100GB'},
+                          'enable': False},
+                'uss': {'enable': False},
+                'options': {'performance.readdir-ahead': True}
+                }
+    Kwargs:
+        multi_vol (bool): True, If bricks need to created for multiple
+                          volumes(more than 5)
+                          False, Otherwise. By default, value is set to False.
+        force (bool): If this option is set to True, then volume creation
+                      command is executed with force option.
+                      False, without force option.
+                      By default, value is set to False.
+        create_only(bool): True, if only volume creation is needed.
+                           False, will do volume create, start, set operation
+                           if any provided in the volume_config.
+                           By default, value is set to False.
+        pipelined (bool): True, to run the whole setup as one script on
+                          mnode, see setup_volume_pipelined.
+                          By default, value is set to False.
+    Returns:
+        bool : True on successful setup. False Otherwise
+
+    """
+    if pipelined:
+        return bool(setup_volume_pipelined(mnode, all_servers_info,
+                                           volume_config, multi_vol, force,
+                                           create_only))
+
+    # Get volume name
+    if 'name' in volume_config:
+        volname = volume_config['name']
+    else:
+        g.log.error("Unable to get the volume name from config")
+        return False
+
+    # Check if the volume already exists
+    vollist = get_volume_list(mnode=mnode)
+    if vollist is not None and volname in vollist:
+        g.log.info("volume %s already exists. Returning...", volname)
+        return True
+
+    # Get servers
+    if 'servers' in volume_config:
+        servers = volume_config['servers']
+    else:
+        g.log.error("Unable to get the volume servers from config")
+        return False
+
+    # Get the volume type and values
+    if not ('voltype' in volume_config and 'type' in volume_config['voltype']):
+        g.log.error("Voltype not defined in config for the volume %s",
+                    volname)
+        return False
+
+    kwargs, number_of_bricks = _get_volume_type_kwargs(volume_config)
+    if kwargs is None:
         return False
 
     # get bricks_list
@@ -303,15 +333,15 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
         if 'options' in volume_config:
             volume_options = volume_config['options']
             ret = set_volume_options(mnode=mnode, volname=volname,
-                                     options=volume_options)
+                                     options=volume_options, batch=True)
             if not ret:
                 g.log.error("Unable to set few volume options")
                 return False
 
     # Start Volume
     time.sleep(2)
-    ret = volume_start(mnode, volname)
-    if not ret:
+    ret, _, _ = volume_start(mnode, volname)
+    if ret != 0:
         g.log.error("volume start %s failed", volname)
         return False
 
@@ -323,20 +353,7 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
             g.log.error("Unable to set quota on the volume %s", volname)
             return False
 
-        # Check if 'limit_usage' is defined
-        if 'limit_usage' in volume_config['quota']:
-            if 'path' in volume_config['quota']['limit_usage']:
-                path = volume_config['quota']['limit_usage']['path']
-            else:
-                path = "/"
-
-            if 'size' in volume_config['quota']['limit_usage']:
-                size = volume_config['quota']['limit_usage']['size']
-            else:
-                size = "100GB"
-        else:
-            path = "/"
-            size = "100GB"
+        path, size = _get_quota_limit_usage(volume_config)
 
         # Set quota_limit_usage
         ret, _, _ = quota_limit_usage(mnode=mnode, volname=volname,
@@ -369,7 +386,7 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
         if 'options' in volume_config:
             volume_options = volume_config['options']
             ret = set_volume_options(mnode=mnode, volname=volname,
-                                     options=volume_options)
+                                     options=volume_options, batch=True)
             if not ret:
                 g.log.error("Unable to set few volume options")
                 return False
@@ -377,9 +394,413 @@ def setup_volume(mnode, all_servers_info, volume_config, multi_vol=False,
     return True
 
 
+class SetupStepResult(namedtuple('SetupStepResult',
+                                 'ok retcode out err duration')):
+    """Outcome of one step of setup_volume_pipelined: whether it succeeded,
+    its (retcode, out, err) and how long it took in seconds."""
+    __slots__ = ()
+
+
+class VolumeSetupResult(OrderedDict):
+    """Outcomes of the steps of setup_volume_pipelined, in the order they
+    ran, in the format {step: SetupStepResult}.
+
+    Evaluates to True when all the steps ran and succeeded, so it can be
+    used where the bool returned by setup_volume is expected.
+    """
+    def __init__(self, *args, **kwargs):
+        super(VolumeSetupResult, self).__init__(*args, **kwargs)
+        self.complete = False
+
+    def __bool__(self):
+        return self.complete and all(step.ok for step in self.values())
+    __nonzero__ = __bool__
+
+    @property
+    def failed_step(self):
+        """str: name of the step that failed, None if none did"""
+        for name, step in self.items():
+            if not step.ok:
+                return name
+        return None
+
+    @property
+    def duration(self):
+        """float: time taken by all the steps in seconds"""
+        return sum(step.duration for step in self.values())
+
+    def add_step(self, name, ok, retcode=0, out='', err='', duration=0.0):
+        """Record the outcome of a step"""
+        self[name] = SetupStepResult(bool(ok), retcode, out, err, duration)
+
+
+_SETUP_STEP_MARKER = "GLUSTO_SETUP_STEP"
+
+# Runs the _step_<name> function defined for a step and prints its return
+# code, start and end times, and base64 encoded stdout and stderr
+_SETUP_STEP_RUNNER = """_d=$(mktemp -d)
+trap 'rm -rf $_d' EXIT
+_step() {
+    local _start _rc
+    _start=$(date +%%s.%%N)
+    _step_$1 >$_d/out 2>$_d/err
+    _rc=$?
+    echo "%s $1 $_rc $_start $(date +%%s.%%N)" \\
+         "$(base64 -w0 <$_d/out). $(base64 -w0 <$_d/err)."
+    return $_rc
+}
+""" % _SETUP_STEP_MARKER
+
+
+def _get_quota_limit_usage(volume_config):
+    """Get the (path, size) of the quota limit usage of volume_config,
+    '/' and '100GB' when not set."""
+    limit_usage = volume_config['quota'].get('limit_usage', {})
+    return limit_usage.get('path', "/"), limit_usage.get('size', "100GB")
+
+
+def _form_volume_setup_script(volname, bricks_list, volume_config, kwargs,
+                              force, create_only):
+    """Forms the script of setup_volume_pipelined, running the steps one
+    after the other until one fails.
+
+    Returns:
+        str: the script
+    """
+    steps = []
+
+    def _add_step(name, body):
+        steps.append((name, body))
+
+    def _set_options_body():
+        cmds = [cmd for _, cmd in _form_volume_set_cmds(
+            volname, volume_config['options'])]
+        return "local _rc=0\n" + "".join(
+            "%s || _rc=1\n" % cmd for cmd in cmds) + "return $_rc"
+
+    _add_step('create', _form_volume_create_cmd(volname, bricks_list, force,
+                                                **kwargs))
+    is_ganesha = bool(volume_config.get('nfs_ganesha', {}).get('enable'))
+    if not create_only:
+        if not is_ganesha and volume_config.get('options'):
+            _add_step('set_options', _set_options_body())
+
+        # Wait for the created volume to be committed instead of sleeping,
+        # then start it, retrying while glusterd is busy with another
+        # transaction
+        _add_step('wait_for_volume', (
+            "local _i\n"
+            "for _i in $(seq 1 100); do\n"
+            "    gluster volume info %s --xml 2>/dev/null | "
+            "grep -q '<statusStr>Created</statusStr>' && return 0\n"
+            "    sleep 0.2\n"
+            "done\n"
+            "echo 'Volume %s not ready to be started' >&2\n"
+            "return 1" % (volname, volname)))
+        _add_step('start', (
+            "local _i\n"
+            "for _i in $(seq 1 30); do\n"
+            "    gluster volume start %s --mode=script >$_d/try 2>&1 && "
+            "{ cat $_d/try; return 0; }\n"
+            "    egrep -q '%s' $_d/try || break\n"
+            "    sleep 1\n"
+            "done\n"
+            "cat $_d/try >&2\n"
+            "return 1" % (volname, "|".join(LOCK_CONTENTION_ERRORS))))
+
+        if volume_config.get('quota', {}).get('enable'):
+            path, size = _get_quota_limit_usage(volume_config)
+            _add_step('quota_enable',
+                      "gluster volume quota %s enable" % volname)
+            _add_step('quota_limit_usage',
+                      "gluster volume quota %s limit-usage %s %s "
+                      "--mode=script" % (volname, path, size))
+            _add_step('quota_check', (
+                "gluster volume get %s features.quota | "
+                "awk '$1 == \"features.quota\" {print $2}' | grep -qx on"
+                % volname))
+
+        if volume_config.get('uss', {}).get('enable'):
+            _add_step('uss_enable',
+                      "gluster volume set %s features.uss enable" % volname)
+            _add_step('uss_check', (
+                "gluster volume get %s features.uss | "
+                "awk '$1 == \"features.uss\" {print $2}' | grep -qx enable"
+                % volname))
+
+        if is_ganesha and volume_config.get('options'):
+            _add_step('set_options', _set_options_body())
+
+    script = _SETUP_STEP_RUNNER
+    for name, body in steps:
+        script += "_step_%s() {\n%s\n}\n" % (name, body)
+    script += " && ".join("_step %s" % name for name, _ in steps) + "\n"
+    return script
+
+
+def setup_volume_pipelined(mnode, all_servers_info, volume_config,
+                           multi_vol=False, force=False, create_only=False):
+    """Setup Volume with the configuration defined in volume_config, like
+    setup_volume, running the whole sequence of create, set options,
+    start, quota and uss commands as one script on mnode.
+
+    The script runs the steps one after the other and stops at the first
+    one failing. Instead of sleeping before starting the volume, it waits
+    for the volume to be committed and retries the start while glusterd is
+    busy with another transaction.
+
+    Args:
+        mnode (str): Node on which commands has to be executed
+        all_servers_info (dict): Information about all servers.
+        volume_config (dict): Dict containing volume information, see
+            setup_volume.
+
+    Kwargs:
+        multi_vol (bool): True, If bricks need to created for multiple
+            volumes(more than 5). Defaults to False.
+        force (bool): If this option is set to True, then volume creation
+            command is executed with force option. Defaults to False.
+        create_only(bool): True, if only volume creation is needed.
+            Defaults to False.
+
+    Returns:
+        VolumeSetupResult: outcome and timing of every step that ran, True
+            if the volume was setup successfully. False otherwise.
+
+    Example:
+        >>> result = setup_volume_pipelined(mnode, servers_info, volume)
+        >>> result.failed_step
+        'quota_enable'
+    """
+    # Adding here to avoid cyclic imports
+    from glustolibs.gluster.lib_utils import BrickAllocator
+
+    result = VolumeSetupResult()
+    volname = volume_config.get('name')
+    servers = volume_config.get('servers')
+    if not volname or not servers:
+        g.log.error("Unable to get the volume name or servers from config")
+        return result
+    if 'type' not in volume_config.get('voltype', {}):
+        g.log.error("Voltype not defined in config for the volume %s",
+                    volname)
+        return result
+    kwargs, number_of_bricks = _get_volume_type_kwargs(volume_config)
+    if kwargs is None:
+        return result
+
+    # Check if the volume already exists and form the bricks_list from the
+    # same volume info
+    start = time.time()
+    if multi_vol:
+        vollist = get_volume_list(mnode)
+        exists = vollist is not None and volname in vollist
+        if not exists:
+            bricks_list = form_bricks_for_multivol(
+                mnode=mnode, volname=volname,
+                number_of_bricks=number_of_bricks, servers=servers,
+                servers_info=all_servers_info)
+    else:
+        allocator = BrickAllocator(mnode, servers, all_servers_info)
+        exists = volname in allocator.volnames
+        if not exists:
+            bricks_list = allocator.allocate(volname, number_of_bricks)
+    if exists:
+        g.log.info("volume %s already exists. Returning...", volname)
+        result.add_step('exists', True, duration=time.time() - start)
+        result.complete = True
+        return result
+    result.add_step('form_bricks', bricks_list, duration=time.time() - start)
+    if not bricks_list:
+        g.log.error("Number_of_bricks is greater than the unused bricks on "
+                    "servers")
+        return result
+
+    script = _form_volume_setup_script(volname, bricks_list, volume_config,
+                                       kwargs, force, create_only)
+    ret, out, err = g.run(mnode, script)
+    invalidate_volume_snapshot_cache(volname)
+
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) != 7 or fields[0] != _SETUP_STEP_MARKER:
+            continue
+        name, retcode, step_start, step_end = fields[1:5]
+        step_out, step_err = [
+            base64.b64decode(field[:-1]).decode('utf-8', 'replace')
+            for field in fields[5:]]
+        result.add_step(name, retcode == '0', int(retcode), step_out,
+                        step_err, float(step_end) - float(step_start))
+    result.complete = ret == 0
+
+    g.log.info("Setup of volume %s: %s", volname, ", ".join(
+        "%s %.2fs" % (name, step.duration) for name, step in result.items()))
+    if not result:
+        failed_step = result.failed_step
+        if failed_step is None:
+            g.log.error("Failed to run the setup of volume %s: %s",
+                        volname, err)
+        else:
+            g.log.error("Setup of volume %s failed at %s: %s", volname,
+                        failed_step, result[failed_step].err or
+                        result[failed_step].out)
+    return result
+
+
+# Errors of gluster commands failing only because glusterd was busy with
+# another transaction on the same or another volume
+LOCK_CONTENTION_ERRORS = ("Another transaction is in progress",
+                          "Locking failed on")
+
+
+def _run_with_lock_retries(func, retries, *args, **kwargs):
+    """Run a gluster command helper returning (ret, out, err) and run it
+    again, after a randomized backoff, while it fails because of glusterd
+    lock contention.
+
+    Args:
+        func (callable): the helper (e.g., volume_create)
+        retries (int): maximum number of retries
+
+    Returns:
+        tuple: (ret, out, err) of the last run.
+    """
+    interval = 1
+    for attempt in range(retries + 1):
+        ret, out, err = func(*args, **kwargs)
+        if ret == 0 or not any(msg in out or msg in err
+                               for msg in LOCK_CONTENTION_ERRORS):
+            break
+        if attempt < retries:
+            g.log.info("glusterd busy, retrying %s in %.1f seconds",
+                       func.__name__, interval)
+            time.sleep(interval * random.uniform(0.5, 1.5))
+            interval = min(interval * 2, 16)
+    return ret, out, err
+
+
+def _set_volume_options_with_lock_retries(mnode, volname, options,
+                                          retries):
+    """Set the volume options in batch, setting them all again while some
+    failed because of glusterd lock contention.
+
+    Returns:
+        tuple: (ret, out, err) in the format of the gluster command helpers,
+            ret is 0 when all the options are set.
+    """
+    def _set_options():
+        results = set_volume_options_batch(mnode, volname, options)
+        if results is None:
+            return 1, '', "Failed to set options on %s" % volname
+        failed = dict((option, result) for option, result in results.items()
+                      if result[0] != 0)
+        return (1 if failed else 0, '\n'.join(
+            "%s: %s" % (option, result[1])
+            for option, result in failed.items()), '')
+    _set_options.__name__ = 'set_volume_options_batch'
+
+    return _run_with_lock_retries(_set_options, retries)
+
+
+def _bulk_volume_creation_pipelined(mnode, number_of_volumes,
+                                    servers_info, volume_config,
+                                    vol_prefix, is_force, is_create_only,
+                                    parallel, retries):
+    """Pipelined mode of bulk_volume_creation, see there"""
+    start_time = time.time()
+    kwargs, number_of_bricks = _get_volume_type_kwargs(volume_config)
+    if kwargs is None:
+        return False
+    vollist = get_volume_list(mnode)
+    if vollist is None:
+        g.log.error("Unable to get the volumes of the cluster")
+        return False
+
+    # Form the brick lists of all the volumes up front, the bricks of a
+    # volume follow the ones of the previous volume
+    volnames = []
+    for volume in range(number_of_volumes):
+        volname = vol_prefix + volume_config['name'] + str(volume)
+        if volname in vollist:
+            g.log.info("volume %s already exists. Skipping...", volname)
+        else:
+            volnames.append(volname)
+    bricks_lists = form_bricks_for_multivols(
+        mnode=mnode, volnames=volnames, number_of_bricks=number_of_bricks,
+        servers=volume_config['servers'], servers_info=servers_info)
+    if bricks_lists is None:
+        g.log.error("Number_of_bricks is greater than the unused bricks on "
+                    "servers")
+        return False
+    volumes = [(volname, bricks_lists[volname]) for volname in volnames]
+
+    def _provision(volume):
+        """Creates a volume, then sets its options and starts it unless
+        is_create_only. Returns the last step done: 'started', 'created' or
+        None if the volume could not be created."""
+        volname, bricks_list = volume
+        ret, _, err = _run_with_lock_retries(
+            volume_create, retries, mnode=mnode, volname=volname,
+            bricks_list=bricks_list, force=is_force, **kwargs)
+        if ret != 0:
+            g.log.error("Unable to create volume %s: %s", volname, err)
+            return None
+        if is_create_only:
+            return 'created'
+
+        if volume_config.get('options'):
+            ret, out, err = _set_volume_options_with_lock_retries(
+                mnode, volname, volume_config['options'], retries)
+            if ret != 0:
+                g.log.error("Unable to set volume options on %s: %s %s",
+                            volname, out, err)
+                return 'created'
+        ret, _, err = _run_with_lock_retries(volume_start, retries, mnode,
+                                             volname)
+        if ret != 0:
+            g.log.error("volume start %s failed: %s", volname, err)
+            return 'created'
+        return 'started'
+
+    # Provision the volumes in waves of 'parallel', each volume going
+    # through all its steps, and stop at the first wave with a failure so
+    # that at most one wave is left half provisioned
+    expected = 'created' if is_create_only else 'started'
+    pool = ThreadPool(parallel)
+    try:
+        for index in range(0, len(volumes), parallel):
+            wave = volumes[index:index + parallel]
+            wave_start = time.time()
+            results = pool.map(_provision, wave)
+            g.log.info("bulk_volume_creation: wave of %d volumes took %.1f "
+                       "seconds", len(wave), time.time() - wave_start)
+            failed = [volname for (volname, _), ret in zip(wave, results)
+                      if ret != expected]
+            if failed:
+                g.log.error("bulk_volume_creation: failed to provision "
+                            "volumes %s, not provisioning the %d volumes "
+                            "left", failed, len(volumes) - index - len(wave))
+                not_started = [volname for (volname, _), ret
+                               in zip(wave, results) if ret == 'created']
+                if not is_create_only and not_started:
+                    g.log.error("bulk_volume_creation: volumes %s are left "
+                                "created but not started", not_started)
+                return False
+    finally:
+        pool.close()
+        pool.join()
+
+    duration = time.time() - start_time
+    g.log.info("bulk_volume_creation: %d volumes in %.1f seconds, %.1f "
+               "volumes/minute with %d in parallel", len(volumes), duration,
+               len(volumes) * 60.0 / max(duration, 0.001), parallel)
+    return True
+
+
 def bulk_volume_creation(mnode, number_of_volumes, servers_info,
                          volume_config, vol_prefix="mult_vol_",
-                         is_force=False, is_create_only=False):
+                         is_force=False, is_create_only=False, parallel=1,
+                         retries=10):
     """
     Creates the number of volumes user has specified
 
@@ -398,6 +819,19 @@ def bulk_volume_creation(mnode, number_of_volumes, servers_info,
                            False, will do volume create, start, set operation
                            if any provided in the volume_config.
                            By default, value is set to False.
+        parallel (int): Number of volumes provisioned at the same time.
+                        With more than 1, the brick lists of all the volumes
+                        are formed up front and the volumes are provisioned
+                        in waves of 'parallel': every volume of a wave is
+                        created, has its options set and is started, and
+                        the creation stops after the first wave with a
+                        failure. As glusterd serializes the transactions,
+                        values above 4-8 mostly add lock contention.
+                        Volumes with quota, uss or nfs_ganesha enabled are
+                        always set up one after the other. Defaults to 1.
+        retries (int): Number of retries of a command failing in parallel
+                       mode because glusterd is busy with another
+                       transaction. Defaults to 10.
     Returns:
         bool: True on successful bulk volume creation, False Otherwise.
 
@@ -423,6 +857,13 @@ def bulk_volume_creation(mnode, number_of_volumes, servers_info,
         g.log.error("Provide number of volume greater than 1")
         return False
 
+    needs_full_setup = any(volume_config.get(feature, {}).get('enable')
+                           for feature in ('quota', 'uss', 'nfs_ganesha'))
+    if parallel > 1 and not (needs_full_setup and not is_create_only):
+        return _bulk_volume_creation_pipelined(
+            mnode, number_of_volumes, servers_info, volume_config,
+            vol_prefix, is_force, is_create_only, parallel, retries)
+
     volume_name = volume_config['name']
     for volume in range(number_of_volumes):
         volume_config['name'] = vol_prefix + volume_name + str(volume)
@@ -1251,17 +1692,12 @@ def shrink_volume(mnode, volname, subvol_num=None, replica_num=None,
             return False
 
         try:
-            root = etree.XML(out)
-        except etree.ParseError:
+            remove_brick_aggregate_status = find_xml_record(
+                out, "volRemoveBrick/aggregate") or {}
+        except ParseError:
             g.log.error("Failed to parse the gluster remove-brick status "
                         "xml output.")
             return False
-        remove_brick_aggregate_status = {}
-        for info in root.findall("volRemoveBrick"):
-            for element in info.getchildren():
-                if element.tag == "aggregate":
-                    for elmt in element.getchildren():
-                        remove_brick_aggregate_status[elmt.tag] = elmt.text
         if "completed" in remove_brick_aggregate_status['statusStr']:
             _rc = True
             break
@@ -1683,31 +2119,42 @@ def get_volume_type(brickdir_path):
         volume type(str): The volume type in str.
         NoneType : None on failure
     """
-    # Adding import here to avoid cyclic imports
-    from glustolibs.gluster.brick_libs import get_all_bricks
     (host, brick_path_info) = brickdir_path.split(':')
     path_info = (brick_path_info[:-2] if brick_path_info.endswith("//")
                  else brick_path_info[:-1])
-    for volume in get_volume_list(host):
-        brick_paths = [brick.split(':')[1] for brick in get_all_bricks(host,
-                                                                       volume)]
-        if path_info in brick_paths:
-            ret = get_volume_info(host, volume)
-            if ret is None:
-                g.log.error("Failed to get volume type for %s", volume)
-                return None
+    volinfo = get_volume_info(host)
+    if volinfo is None:
+        g.log.error("Failed to get the volume info from %s", host)
+        return None
+
+    def _get_ip(node):
+        # The bricks may be listed by IP while the path has the hostname,
+        # or the other way around
+        try:
+            return get_ip_of_host(node)
+        except socket.gaierror:
+            return node
+
+    for volume, info in list(volinfo.items()):
+        bricks = info.get('bricks', {}).get('brick', [])
+        for brick in bricks:
+            brick_host, brick_path = brick['name'].split(':', 1)
+            if brick_path != path_info:
+                continue
+            if brick_host != host and _get_ip(brick_host) != _get_ip(host):
+                continue
             list_of_replica = ('Replicate', 'Distributed-Replicate')
-            if (ret[volume].get('typeStr') in list_of_replica and
-                    int(ret[volume]['arbiterCount']) == 1):
-                if int(ret[volume]['distCount']) >= 2:
+            if (info.get('typeStr') in list_of_replica and
+                    int(info['arbiterCount']) == 1):
+                if int(info['distCount']) >= 2:
                     return 'Distributed-Arbiter'
                 else:
                     return 'Arbiter'
             else:
-                return ret[volume].get('typeStr')
-        else:
-            g.log.info("Failed to find brick-path %s for volume %s",
-                       brickdir_path, volume)
+                return info.get('typeStr')
+    g.log.info("Failed to find brick-path %s in the volumes of %s",
+               brickdir_path, host)
+    return None
 
 
 def parse_vol_file(mnode, vol_file):
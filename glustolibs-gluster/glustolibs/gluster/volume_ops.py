@@ -18,6 +18,8 @@
 
 import re
 import copy
+import time
+from threading import Lock
 from glusto.core import Glusto as g
 from pprint import pformat
 import io
@@ -25,10 +27,9 @@ try:
     import ConfigParser as configparser  # Python 2
 except ImportError:
     import configparser as configparser  # Python 3
-try:
-    import xml.etree.cElementTree as etree
-except ImportError:
-    import xml.etree.ElementTree as etree
+from glustolibs.gluster.xml_parser import (ParseError, XmlRecord,
+                                           get_xml_records,
+                                           iter_xml_records)
 
 """
     This file contains the gluster volume operations like create volume,
@@ -36,49 +37,103 @@ except ImportError:
 """
 
 
-def volume_create(mnode, volname, bricks_list, force=False, **kwargs):
-    """Create the gluster volume with specified configuration
+class VolumeSnapshotCache(object):
+    """Cache of the parsed 'volume info' and 'volume status' outputs.
+
+    Entries are stored per (mnode, volname) along with the other arguments
+    of the query, and are valid for 'ttl' seconds. Entries of a volume
+    (and of 'all' volumes) are dropped whenever a volume operation which
+    changes the volume is executed through glustolibs. Caching is disabled
+    while ttl is 0, which is the default.
+    """
+
+    def __init__(self, ttl=0):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, key):
+        """Returns a copy of the cached value for key, if it is still valid.
+
+        Args:
+            key (tuple): (kind, mnode, volname, ...) identifying the query.
+
+        Returns:
+            The cached value, or None if caching is disabled, the key is
+            not cached or the entry has expired.
+        """
+        if not self.ttl:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > self.ttl:
+                del self._entries[key]
+                return None
+        g.log.debug("Using cached %s of volume %s from %s", key[0], key[2],
+                    key[1])
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, value):
+        """Caches value for key, if caching is enabled."""
+        if not self.ttl:
+            return
+        with self._lock:
+            self._entries[key] = (time.time(), copy.deepcopy(value))
+
+    def invalidate(self, volname=None):
+        """Drops the cached entries of volname and of 'all' volumes.
+
+        Kwargs:
+            volname (str): volume name. If None or 'all', the whole cache
+                is dropped.
+        """
+        with self._lock:
+            if volname is None or volname == 'all':
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[2] in (volname, 'all'):
+                    del self._entries[key]
+
+
+_volume_snapshot_cache = VolumeSnapshotCache()
+
+
+def enable_volume_snapshot_cache(ttl=10):
+    """Enables caching of get_volume_info and get_volume_status results.
 
-    Args:
-        mnode(str): server on which command has to be executed
-        volname(str): volume name that has to be created
-        bricks_list (list): List of bricks to use for creating volume.
-            Example:
-                from glustolibs.gluster.lib_utils import form_bricks_list
-                bricks_list = form_bricks_list(mnode, volname, num_of_bricks,
-                                               servers, servers_info)
     Kwargs:
-        force (bool): If this option is set to True, then create volume
-            will get executed with force option. If it is set to False,
-            then create volume will get executed without force option
+        ttl (int): Number of seconds for which a cached result is valid.
+            Defaults to 10.
+    """
+    _volume_snapshot_cache.invalidate()
+    _volume_snapshot_cache.ttl = ttl
 
-        **kwargs
-            The keys, values in kwargs are:
-                - replica_count : (int)|None
-                - arbiter_count : (int)|None
-                - stripe_count : (int)|None
-                - disperse_count : (int)|None
-                - disperse_data_count : (int)|None
-                - redundancy_count : (int)|None
-                - transport_type : tcp|rdma|tcp,rdma|None
-                - ...
 
-    Returns:
-        tuple: Tuple containing three elements (ret, out, err).
-            The first element 'ret' is of type 'int' and is the return value
-            of command execution.
+def disable_volume_snapshot_cache():
+    """Disables caching of get_volume_info and get_volume_status results."""
+    _volume_snapshot_cache.ttl = 0
+    _volume_snapshot_cache.invalidate()
 
-            The second element 'out' is of type 'str' and is the stdout value
-            of the command execution.
 
-            The third element 'err' is of type 'str' and is the stderr value
-            of the command execution.
+def invalidate_volume_snapshot_cache(volname=None):
+    """Drops the cached volume info and status of the given volume.
 
-           (-1, '', ''): If not enough bricks are available to create volume.
-           (ret, out, err): As returned by volume create command execution.
+    Kwargs:
+        volname (str): volume name. If not given, all the cached entries
+            are dropped.
+    """
+    _volume_snapshot_cache.invalidate(volname)
 
-    Example:
-        volume_create(mnode, volname, bricks_list)
+
+def _form_volume_create_cmd(volname, bricks_list, force=False, **kwargs):
+    """Helper for volume_create. Forms the 'gluster volume create' command,
+    see volume_create for the arguments.
+
+    Returns:
+        str: the command
     """
     replica_count = arbiter_count = stripe_count = None
     disperse_count = disperse_data_count = redundancy_count = None
@@ -136,7 +191,57 @@ def volume_create(mnode, volname, bricks_list, force=False, **kwargs):
     if force:
         cmd = cmd + " force"
 
-    return g.run(mnode, cmd)
+    return cmd
+
+
+def volume_create(mnode, volname, bricks_list, force=False, **kwargs):
+    """Create the gluster volume with specified configuration
+
+    Args:
+        mnode(str): server on which command has to be executed
+        volname(str): volume name that has to be created
+        bricks_list (list): List of bricks to use for creating volume.
+            Example:
+                from glustolibs.gluster.lib_utils import form_bricks_list
+                bricks_list = form_bricks_list(mnode, volname, num_of_bricks,
+                                               servers, servers_info)
+    Kwargs:
+        force (bool): If this option is set to True, then create volume
+            will get executed with force option. If it is set to False,
+            then create volume will get executed without force option
+
+        **kwargs
+            The keys, values in kwargs are:
+                - replica_count : (int)|None
+                - arbiter_count : (int)|None
+                - stripe_count : (int)|None
+                - disperse_count : (int)|None
+                - disperse_data_count : (int)|None
+                - redundancy_count : (int)|None
+                - transport_type : tcp|rdma|tcp,rdma|None
+                - ...
+
+    Returns:
+        tuple: Tuple containing three elements (ret, out, err).
+            The first element 'ret' is of type 'int' and is the return value
+            of command execution.
+
+            The second element 'out' is of type 'str' and is the stdout value
+            of the command execution.
+
+            The third element 'err' is of type 'str' and is the stderr value
+            of the command execution.
+
+           (-1, '', ''): If not enough bricks are available to create volume.
+           (ret, out, err): As returned by volume create command execution.
+
+    Example:
+        volume_create(mnode, volname, bricks_list)
+    """
+    cmd = _form_volume_create_cmd(volname, bricks_list, force, **kwargs)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def volume_start(mnode, volname, force=False):
@@ -169,7 +274,9 @@ def volume_start(mnode, volname, force=False):
         cmd = "gluster volume start %s force --mode=script" % volname
     else:
         cmd = "gluster volume start %s --mode=script" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def volume_stop(mnode, volname, force=False):
@@ -202,7 +309,9 @@ def volume_stop(mnode, volname, force=False):
         cmd = "gluster volume stop %s force --mode=script" % volname
     else:
         cmd = "gluster volume stop %s --mode=script" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def volume_delete(mnode, volname, xfail=False):
@@ -242,6 +351,7 @@ def volume_delete(mnode, volname, xfail=False):
               "name" in x]
     ret, out, err = g.run(mnode, "gluster volume delete {} --mode=script"
                           .format(volname))
+    invalidate_volume_snapshot_cache(volname)
     if ret != 0:
         if xfail:
             g.log.info(
@@ -300,7 +410,9 @@ def volume_reset(mnode, volname, force=False):
         cmd = "gluster volume reset %s force --mode=script" % volname
     else:
         cmd = "gluster volume reset %s --mode=script" % volname
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def volume_status(mnode, volname='all', service='', options=''):
@@ -336,18 +448,62 @@ def volume_status(mnode, volname='all', service='', options=''):
     return g.run(mnode, cmd)
 
 
-def _parse_volume_status_xml(root_xml):
+def _parse_volume_status(volume, mnode, options, vol_status):
     """
-    Helper module for get_volume_status. It takes root xml object as input,
-    parses and returns the 'volume' tag xml object.
+    Helper module for get_volume_status. It parses the 'volume' element
+    of the volume status xml output into vol_status.
     """
+    tmp_dict1 = {}
+    tmp_dict2 = {}
+    vol_name = [vol.text for vol in volume if vol.tag == "volName"]
+
+    # parsing volume status xml output
+    if options == 'tasks':
+        tasks = volume.findall("tasks")
+        for each_task in tasks:
+            tmp_dict3 = parse_xml(each_task)
+            node_name = 'task_status'
+            if 'task' in tmp_dict3.keys():
+                if node_name in tmp_dict2.keys():
+                    tmp_dict2[node_name].append(tmp_dict3['task'])
+                else:
+                    tmp_dict2[node_name] = [tmp_dict3['task']]
+            else:
+                tmp_dict2[node_name] = [tmp_dict3]
+    else:
+        nodes = volume.findall("node")
 
-    for element in root_xml:
-        if element.findall("volume"):
-            return element.findall("volume")
-        root_vol = _parse_volume_status_xml(element)
-        if root_vol is not None:
-            return root_vol
+        for each_node in nodes:
+            if each_node.find('path').text.startswith('/'):
+                node_name = each_node.find('hostname').text
+            elif each_node.find('path').text == 'localhost':
+                node_name = mnode
+            else:
+                node_name = each_node.find('path').text
+            node_dict = parse_xml(each_node)
+            tmp_dict3 = {}
+            if "hostname" in node_dict.keys():
+                if node_dict['path'].startswith('/'):
+                    node_dict["bricktype"] = 'None'
+                    tmp = node_dict["path"]
+                    tmp_dict3[node_dict["path"]] = node_dict
+                else:
+                    tmp_dict3[node_dict["hostname"]] = node_dict
+                    tmp = node_dict["hostname"]
+                del tmp_dict3[tmp]["path"]
+                del tmp_dict3[tmp]["hostname"]
+            if node_name in tmp_dict1.keys():
+                tmp_dict1[node_name].append(tmp_dict3)
+            else:
+                tmp_dict1[node_name] = [tmp_dict3]
+
+            tmp_dict4 = {}
+            for item in tmp_dict1[node_name]:
+                for key, val in item.items():
+                    tmp_dict4[key] = val
+            tmp_dict2[node_name] = tmp_dict4
+
+    vol_status[vol_name[0]] = tmp_dict2
 
 
 def parse_xml(tag_obj):
@@ -366,8 +522,11 @@ def parse_xml(tag_obj):
     return node_dict
 
 
-def get_volume_status(mnode, volname='all', service='', options=''):
-    """This module gets the status of all or specified volume(s)/brick
+def get_volume_status(mnode, volname='all', service='', options='',
+                      use_cache=True):
+    """This module gets the status of all or specified volume(s)/brick.
+    The result is served from the volume snapshot cache, if it is enabled
+    and use_cache is True.
 
     Args:
         mnode (str): Node on which cmd has to be executed.
@@ -380,6 +539,9 @@ def get_volume_status(mnode, volname='all', service='', options=''):
         options (str): options can be,
             [detail|clients|mem|inode|fd|callpool|tasks]. If not given,
             the function returns the output of gluster volume status
+        use_cache (bool): If False, always query glusterd. The fresh
+            result still replaces the cached one. Callers polling for a
+            state change should pass False. Defaults to True.
     Returns:
         dict: volume status in dict of dictionary format, on success
         NoneType: on failure
@@ -415,6 +577,12 @@ def get_volume_status(mnode, volname='all', service='', options=''):
         'tcp': '49160'}}}}}
     """
 
+    cache_key = ('status', mnode, volname, service, options)
+    if use_cache:
+        vol_status = _volume_snapshot_cache.get(cache_key)
+        if vol_status is not None:
+            return vol_status
+
     cmd = "gluster vol status %s %s %s --xml" % (volname, service, options)
 
     ret, out, _ = g.run(mnode, cmd, log_level='DEBUG')
@@ -422,71 +590,22 @@ def get_volume_status(mnode, volname='all', service='', options=''):
         g.log.error("Failed to execute gluster volume status command")
         return None
 
-    root = etree.XML(out)
-    volume_list = _parse_volume_status_xml(root)
-    if volume_list is None:
+    vol_status = {}
+    found_volume = False
+    try:
+        for volume in iter_xml_records(out, "volStatus/volumes/volume"):
+            found_volume = True
+            _parse_volume_status(volume, mnode, options, vol_status)
+    except ParseError:
+        found_volume = False
+    if not found_volume:
         g.log.error("Failed to parse the XML output of volume status for "
                     "volume %s" % volname)
         return None
 
-    vol_status = {}
-    for volume in volume_list:
-        tmp_dict1 = {}
-        tmp_dict2 = {}
-        vol_name = [vol.text for vol in volume if vol.tag == "volName"]
-
-        # parsing volume status xml output
-        if options == 'tasks':
-            tasks = volume.findall("tasks")
-            for each_task in tasks:
-                tmp_dict3 = parse_xml(each_task)
-                node_name = 'task_status'
-                if 'task' in tmp_dict3.keys():
-                    if node_name in tmp_dict2.keys():
-                        tmp_dict2[node_name].append(tmp_dict3['task'])
-                    else:
-                        tmp_dict2[node_name] = [tmp_dict3['task']]
-                else:
-                    tmp_dict2[node_name] = [tmp_dict3]
-        else:
-            elem_tag = []
-            for elem in volume.getchildren():
-                elem_tag.append(elem.tag)
-            nodes = volume.findall("node")
-
-            for each_node in nodes:
-                if each_node.find('path').text.startswith('/'):
-                    node_name = each_node.find('hostname').text
-                elif each_node.find('path').text == 'localhost':
-                    node_name = mnode
-                else:
-                    node_name = each_node.find('path').text
-                node_dict = parse_xml(each_node)
-                tmp_dict3 = {}
-                if "hostname" in node_dict.keys():
-                    if node_dict['path'].startswith('/'):
-                        node_dict["bricktype"] = 'None'
-                        tmp = node_dict["path"]
-                        tmp_dict3[node_dict["path"]] = node_dict
-                    else:
-                        tmp_dict3[node_dict["hostname"]] = node_dict
-                        tmp = node_dict["hostname"]
-                    del tmp_dict3[tmp]["path"]
-                    del tmp_dict3[tmp]["hostname"]
-                if node_name in tmp_dict1.keys():
-                    tmp_dict1[node_name].append(tmp_dict3)
-                else:
-                    tmp_dict1[node_name] = [tmp_dict3]
-
-                tmp_dict4 = {}
-                for item in tmp_dict1[node_name]:
-                    for key, val in item.items():
-                        tmp_dict4[key] = val
-                tmp_dict2[node_name] = tmp_dict4
-
-        vol_status[vol_name[0]] = tmp_dict2
     g.log.debug("Volume status output: %s"
                 % pformat(vol_status, indent=10))
+    _volume_snapshot_cache.put(cache_key, vol_status)
     return vol_status
 
 
@@ -531,7 +650,86 @@ def get_volume_options(mnode, volname, option='all'):
     return volume_option
 
 
-def set_volume_options(mnode, volname, options):
+def _form_volume_set_cmds(volname, options):
+    """Helper for set_volume_options. Forms the list of 'gluster volume set'
+    commands for the given options, group options first.
+
+    Returns:
+        list: List of tuples (option, cmd), where option is the option name
+            ('group <name>' for group options) and cmd is the command.
+    """
+    volume_options = copy.deepcopy(options)
+    cmds = []
+    # Check if group options are specified.
+    if 'group' in volume_options:
+        group_options = volume_options.pop('group')
+        if not isinstance(group_options, list):
+            group_options = [group_options]
+        for group_option in group_options:
+            cmd = ("gluster volume set %s group %s --mode=script" %
+                   (volname, group_option))
+            cmds.append(("group %s" % group_option, cmd))
+
+    for option in volume_options:
+        cmd = ("gluster volume set %s %s %s --mode=script"
+               % (volname, option, volume_options[option]))
+        cmds.append((option, cmd))
+    return cmds
+
+
+def set_volume_options_batch(mnode, volname, options):
+    """Sets all the given options for the volume in a single remote shell
+    session on mnode, instead of one ssh round trip per option.
+
+    The 'gluster volume set' commands are still executed one after the other
+    on mnode, and the return code and output of each of them is collected.
+
+    Args:
+        mnode (str): Node on which cmd has to be executed.
+        volname (str): volume name
+        options (dict): volume options in key
+            value format
+
+    Returns:
+        dict: Per option result in the format {option: (ret, out)}, on
+            success. Group options are reported as 'group <name>'. An
+            option for which no result could be collected has ret -1.
+        NoneType: If the remote shell session itself failed.
+
+    Example:
+        options = {"user.cifs":"enable","user.smb":"enable"}
+        set_volume_options_batch("abc.com", "testvol", options)
+        >>>{'user.cifs': (0, 'volume set: success'),
+            'user.smb': (0, 'volume set: success')}
+    """
+    cmds = _form_volume_set_cmds(volname, options)
+    if not cmds:
+        return {}
+
+    marker = "GLUSTO_VOLUME_SET_RC"
+    script = "; ".join("%s 2>&1; echo \"%s %d $?\"" % (cmd, marker, index)
+                       for index, (_, cmd) in enumerate(cmds))
+    ret, out, err = g.run(mnode, script)
+    invalidate_volume_snapshot_cache(volname)
+    if ret != 0:
+        g.log.error("Failed to set options on volume %s in batch: %s",
+                    volname, err)
+        return None
+
+    results = dict((option, (-1, '')) for option, _ in cmds)
+    lines = []
+    for line in out.splitlines():
+        match = re.match(r'^%s (\d+) (\d+)$' % marker, line.strip())
+        if match is None:
+            lines.append(line)
+            continue
+        option = cmds[int(match.group(1))][0]
+        results[option] = (int(match.group(2)), "\n".join(lines))
+        lines = []
+    return results
+
+
+def set_volume_options(mnode, volname, options, batch=False):
     """Sets the option values for the given volume.
 
     Args:
@@ -540,6 +738,12 @@ def set_volume_options(mnode, volname, options):
         options (dict): volume options in key
             value format
 
+    Kwargs:
+        batch (bool): If this option is set to True, then all the options
+            are set in a single remote shell session on mnode. If it is set
+            to False, then one command is executed per option.
+            Defaults to False.
+
     Returns:
         bool: True, if the volume option is set
               False, on failure
@@ -548,30 +752,23 @@ def set_volume_options(mnode, volname, options):
         options = {"user.cifs":"enable","user.smb":"enable"}
         set_volume_option("abc.com", "testvol", options)
     """
-    _rc = True
-
-    volume_options = copy.deepcopy(options)
-    # Check if group options are specified.
-    if 'group' in volume_options:
-        group_options = volume_options.pop('group')
-        if not isinstance(group_options, list):
-            group_options = [group_options]
-        for group_option in group_options:
-            cmd = ("gluster volume set %s group %s --mode=script" %
-                   (volname, group_option))
-            ret, _, _ = g.run(mnode, cmd)
-            if ret != 0:
-                g.log.error("Unable to set group option: %s", group_option)
-                _rc = False
+    if batch:
+        results = set_volume_options_batch(mnode, volname, options)
+        if results is None:
+            return False
+        failed = [option for option in results if results[option][0] != 0]
+        for option in failed:
+            g.log.error("Unable to set option %s: %s", option,
+                        results[option][1])
+        return not failed
 
-    for option in volume_options:
-        cmd = ("gluster volume set %s %s %s --mode=script"
-               % (volname, option, volume_options[option]))
+    _rc = True
+    for option, cmd in _form_volume_set_cmds(volname, options):
         ret, _, _ = g.run(mnode, cmd)
         if ret != 0:
-            g.log.error("Unable to set value %s for option %s"
-                        % (volume_options[option], option))
+            g.log.error("Unable to set option %s", option)
             _rc = False
+    invalidate_volume_snapshot_cache(volname)
     return _rc
 
 
@@ -607,7 +804,9 @@ def reset_volume_option(mnode, volname, option, force=False):
                % (volname, option))
     else:
         cmd = "gluster volume reset %s %s --mode=script" % (volname, option)
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def volume_info(mnode, volname='all'):
@@ -638,9 +837,23 @@ def volume_info(mnode, volname='all'):
     return g.run(mnode, cmd)
 
 
+def _volume_options(elem):
+    """Converts the 'options' element of the volume info xml output to a
+    dict in the format {option: value}"""
+    return dict((option.findtext("name"), option.findtext("value"))
+                for option in elem.findall("option"))
+
+
+_VOLUME_INFO_SCHEMA = XmlRecord(fields={
+    'bricks': XmlRecord(lists={'brick': XmlRecord()}),
+    'options': _volume_options})
+
+
 def get_volume_info(mnode, volname='all', xfail=False):
     """Fetches the volume information as displayed in the volume info.
-        Uses xml output of volume info and parses the into to a dict
+        Uses xml output of volume info and parses the into to a dict.
+        The result is served from the volume snapshot cache, if it is
+        enabled.
 
     Args:
         mnode (str): Node on which cmd has to be executed.
@@ -692,6 +905,11 @@ def get_volume_info(mnode, volname='all', xfail=False):
         'optCount': '5'}}
     """
 
+    cache_key = ('info', mnode, volname)
+    volinfo = _volume_snapshot_cache.get(cache_key)
+    if volinfo is not None:
+        return volinfo
+
     cmd = "gluster volume info %s --xml" % volname
     ret, out, err = g.run(mnode, cmd, log_level='DEBUG')
     if ret != 0:
@@ -701,40 +919,20 @@ def get_volume_info(mnode, volname='all', xfail=False):
                 .format(volname, out, err)
             )
         return None
-    root = etree.XML(out)
+    try:
+        volumes = get_xml_records(out, "volInfo/volumes/volume",
+                                  _VOLUME_INFO_SCHEMA)
+    except ParseError:
+        g.log.error("Failed to parse the volume info xml output.")
+        return None
     volinfo = {}
-    for volume in root.findall("volInfo/volumes/volume"):
-        for elem in volume.getchildren():
-            if elem.tag == "name":
-                volname = elem.text
-                volinfo[volname] = {}
-            elif elem.tag == "bricks":
-                volinfo[volname]["bricks"] = {}
-                tag_list = [x.tag for x in elem.getchildren() if x]
-                if 'brick' in tag_list:
-                    volinfo[volname]["bricks"]["brick"] = []
-                for el in elem.getchildren():
-                    if el.tag == 'brick':
-                        brick_info_dict = {}
-                        for elmt in el.getchildren():
-                            brick_info_dict[elmt.tag] = elmt.text
-                        (volinfo[volname]["bricks"]["brick"].
-                         append(brick_info_dict))
-
-            elif elem.tag == "options":
-                volinfo[volname]["options"] = {}
-                for option in elem.findall("option"):
-                    for el in option.getchildren():
-                        if el.tag == "name":
-                            opt = el.text
-                        if el.tag == "value":
-                            volinfo[volname]["options"][opt] = el.text
-            else:
-                volinfo[volname][elem.tag] = elem.text
+    for volume in volumes:
+        volinfo[volume.pop("name")] = volume
 
     g.log.debug("Volume info output: %s"
                 % pformat(volinfo, indent=10))
 
+    _volume_snapshot_cache.put(cache_key, volinfo)
     return volinfo
 
 
@@ -764,7 +962,9 @@ def volume_sync(mnode, hostname, volname="all"):
     """
 
     cmd = "gluster volume sync %s %s --mode=script" % (hostname, volname)
-    return g.run(mnode, cmd)
+    ret = g.run(mnode, cmd)
+    invalidate_volume_snapshot_cache(volname)
+    return ret
 
 
 def volume_list(mnode):
@@ -814,12 +1014,12 @@ def get_volume_list(mnode):
         g.log.error("volume list returned error")
         return None
 
-    root = etree.XML(out)
-    vol_list = []
-    for volume in root.findall("volList"):
-        for elem in volume.getchildren():
-            if elem.tag == "volume":
-                vol_list.append(elem.text)
+    try:
+        vol_list = [volume.text for volume in
+                    iter_xml_records(out, "volList/volume")]
+    except ParseError:
+        g.log.error("Failed to parse the volume list xml output.")
+        return None
 
     return vol_list
 
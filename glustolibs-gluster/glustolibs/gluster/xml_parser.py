@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+"""
+    Description: Module for parsing the XML outputs of the gluster CLI.
+
+    The records of an output (e.g., the snapshots of 'gluster snapshot
+    status --xml') are described by an XmlRecord schema and converted to
+    dicts. The lookups and iterations parse the output with iterparse:
+    every record is handled as soon as its end tag is parsed and then
+    cleared, and the lookups stop parsing at the first match.
+
+    Example:
+        >>> snap_schema = XmlRecord(fields={'snapVolume': XmlRecord()})
+        >>> find_xml_record(out, "snapInfo/snapshots/snapshot",
+        ...                 snap_schema, match={'name': 'snap1'})
+        {'name': 'snap1', 'uuid': '...', 'snapVolume': {...}, ...}
+"""
+
+import io
+try:
+    import xml.etree.cElementTree as etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+ParseError = etree.ParseError
+
+
+class XmlRecord(object):
+    """Schema of an element converted to a dict of its children, keyed by
+    their tags. The children are converted to their text, unless their tag
+    is in fields or lists.
+    """
+    def __init__(self, fields=None, lists=None, empty_lists=False):
+        """Init the schema
+
+        Kwargs:
+            fields (dict): schema of the children converted otherwise than
+                to their text, in the format {tag: schema}. The schema is
+                an XmlRecord for a nested dict, or a function converting
+                the child element.
+            lists (dict): schema of the children which may repeat, gathered
+                in a list under their tag, in the format {tag: schema}. The
+                schema is an XmlRecord, a function converting the child
+                element, or None for the text of the child.
+            empty_lists (bool): True to have the lists without any child
+                as []. By default, they are left out.
+        """
+        self.fields = fields or {}
+        self.lists = lists or {}
+        self.empty_lists = empty_lists
+        self._fields = dict((tag, _converter(schema))
+                            for tag, schema in self.fields.items())
+        self._lists = dict((tag, _converter(schema))
+                           for tag, schema in self.lists.items())
+
+    def convert(self, elem):
+        """Convert an element to a dict
+
+        Args:
+            elem (Element): element to convert
+
+        Returns:
+            dict: the converted element
+        """
+        record = {}
+        if self.empty_lists:
+            for tag in self._lists:
+                record[tag] = []
+        if not self._fields and not self._lists:
+            for child in elem:
+                record[child.tag] = child.text
+            return record
+        for child in elem:
+            tag = child.tag
+            if tag in self._lists:
+                if tag in record:
+                    record[tag].append(self._lists[tag](child))
+                else:
+                    record[tag] = [self._lists[tag](child)]
+            elif tag in self._fields:
+                record[tag] = self._fields[tag](child)
+            else:
+                record[tag] = child.text
+        return record
+
+
+def _text(elem):
+    """Converter of the elements converted to their text"""
+    return elem.text
+
+
+def _converter(schema):
+    """Get the function converting an element as per the schema of a field
+    or list item"""
+    if schema is None:
+        return _text
+    if isinstance(schema, XmlRecord):
+        return schema.convert
+    return schema
+
+
+def child_texts(elem):
+    """Field converter returning the texts of the children of an element,
+    e.g. for <hostnames><hostname>a</hostname></hostnames> -> ['a']"""
+    return [child.text for child in elem]
+
+
+def iter_xml_records(xml, path, schema=None, match=None):
+    """Parse an XML output incrementally and yield its records
+
+    Args:
+        xml (str|bytes): XML output of a gluster command
+        path (str): path of the record elements from the root element,
+            e.g. 'snapStatus/snapshots/snapshot'
+
+    Kwargs:
+        schema (XmlRecord|callable): schema of the records, or a function
+            converting a record element. If not given, the elements
+            themselves are yielded, each being cleared once the next one
+            is requested.
+        match (dict): yield only the records having children with the
+            given texts, in the format {tag: text}. Checked before the
+            records are converted.
+
+    Yields:
+        dict: the converted records (or the elements if no schema).
+
+    Raises:
+        ParseError: if the output is not valid XML. The records before the
+            error are yielded.
+    """
+    if not isinstance(xml, bytes):
+        xml = xml.encode('utf-8')
+    convert = None if schema is None else _converter(schema)
+    tags = path.split('/')
+    stack = []
+    root = record = None
+    for event, elem in etree.iterparse(io.BytesIO(xml),
+                                       events=('start', 'end')):
+        if record is not None:
+            # Inside a record, only its end matters
+            if elem is not record:
+                continue
+            if match is None or all(elem.findtext(tag) == text
+                                    for tag, text in match.items()):
+                yield elem if convert is None else convert(elem)
+            elem.clear()
+            record = None
+            stack.pop()
+        elif event == 'start':
+            if root is None:
+                root = elem
+                continue
+            stack.append(elem.tag)
+            if stack == tags:
+                record = elem
+        elif elem is root:
+            break
+        else:
+            stack.pop()
+
+
+def get_xml_records(xml, path, schema=None, match=None):
+    """Parse an XML output and get all its records
+
+    See iter_xml_records for the arguments.
+
+    Returns:
+        list: the converted records
+
+    Raises:
+        ParseError: if the output is not valid XML.
+    """
+    if schema is None:
+        schema = XmlRecord()
+    if match is not None:
+        return list(iter_xml_records(xml, path, schema, match))
+
+    # All the records are needed, building the tree in one go is faster
+    # than handling the parse events
+    convert = _converter(schema)
+    return [convert(elem) for elem in etree.XML(xml).iterfind(path)]
+
+
+def find_xml_record(xml, path, schema=None, match=None):
+    """Parse an XML output up to its first record, or its first record
+    matching the given texts
+
+    See iter_xml_records for the arguments.
+
+    Returns:
+        dict: the converted record. None if there is no such record.
+
+    Raises:
+        ParseError: if the output up to the record is not valid XML.
+    """
+    if schema is None:
+        schema = XmlRecord()
+    records = iter_xml_records(xml, path, schema, match)
+    try:
+        return next(records, None)
+    finally:
+        records.close()
@@ -0,0 +1,183 @@
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+Computes an arequal-checksum like checksum of a directory tree: the entry
+counts and a total checksum of the names, types, permissions, ownership and
+data of all the entries below the directory.
+
+The data checksums of the regular files are cached per directory, keyed by
+the inode, size, mtime and ctime of the files. On the next run of the same
+tree only the files changed since are read again. Every entry of the tree
+is still lstat'ed on every run: the walk itself is not skipped, only the
+data reads of the unchanged files.
+
+Example:
+    python arequal_incremental.py -p /bricks/brick0/testvol -i .glusterfs
+    Entry counts
+    Regular files   : 100
+    Directories     : 10
+    Symbolic links  : 0
+    Other           : 0
+    Total           : 110
+
+    Checksums
+    Total           : 5c1e3a3e9b0ab0fd3fcb0b0ee2b2a6a4
+"""
+
+from __future__ import print_function
+import argparse
+import hashlib
+import json
+import os
+import stat
+import sys
+
+
+def to_bytes(text):
+    """Returns text as bytes, keeping undecodable file names intact"""
+    if isinstance(text, bytes):
+        return text
+    return text.encode('utf-8', 'surrogateescape')
+
+
+def stat_key(st):
+    """Returns the stat data that changes whenever the file data does"""
+    return [st.st_ino, st.st_size,
+            getattr(st, 'st_mtime_ns', st.st_mtime),
+            getattr(st, 'st_ctime_ns', st.st_ctime)]
+
+
+def data_checksum(path):
+    """Returns the md5sum of the data of the file"""
+    md5 = hashlib.md5()
+    with open(path, 'rb') as fd:
+        for chunk in iter(lambda: fd.read(1 << 20), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+class TreeChecksum(object):
+    """Checksum of a directory tree using a cache of file data checksums"""
+    def __init__(self, rootdir, ignore, cache):
+        self.rootdir = rootdir
+        self.ignore = ignore
+        self.old_cache = cache
+        self.cache = {}
+        self.counts = {'f': 0, 'd': 0, 'l': 0, 'o': 0}
+        self.files_read = 0
+
+    def dir_checksum(self, relpath):
+        """Returns the checksum of the directory relpath and its entries"""
+        dirpath = os.path.join(self.rootdir, relpath)
+        old_files = self.old_cache.get(relpath, {})
+        files = {}
+        lines = []
+        for name in sorted(os.listdir(dirpath)):
+            if not relpath and name in self.ignore:
+                continue
+            path = os.path.join(dirpath, name)
+            st = os.lstat(path)
+            if stat.S_ISDIR(st.st_mode):
+                ftype = 'd'
+                data = self.dir_checksum(os.path.join(relpath, name))
+            elif stat.S_ISREG(st.st_mode):
+                ftype = 'f'
+                key = stat_key(st)
+                cached = old_files.get(name)
+                if cached is not None and cached[:-1] == key:
+                    data = cached[-1]
+                else:
+                    data = data_checksum(path)
+                    self.files_read += 1
+                files[name] = key + [data]
+            elif stat.S_ISLNK(st.st_mode):
+                ftype = 'l'
+                data = os.readlink(path)
+            else:
+                ftype = 'o'
+                data = str(st.st_rdev)
+            self.counts[ftype] += 1
+            lines.append(b' '.join([
+                to_bytes(name), to_bytes(ftype),
+                to_bytes('%o %d %d' % (stat.S_IMODE(st.st_mode), st.st_uid,
+                                       st.st_gid)),
+                to_bytes(data)]))
+        if files:
+            self.cache[relpath] = files
+        return hashlib.md5(b'\n'.join(lines)).hexdigest()
+
+
+def cache_file_path(cache_dir, rootdir, ignore):
+    """Returns the path of the cache file of the tree"""
+    key = hashlib.md5(to_bytes(' '.join([rootdir] + sorted(ignore))))
+    return os.path.join(cache_dir, key.hexdigest() + '.json')
+
+
+def load_cache(path):
+    """Returns the cache stored in path, empty if it is missing or bad"""
+    try:
+        with open(path) as fd:
+            return json.load(fd)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def save_cache(path, cache):
+    """Atomically replaces the cache stored in path"""
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    tmp_path = '%s.%d' % (path, os.getpid())
+    with open(tmp_path, 'w') as fd:
+        json.dump(cache, fd)
+    os.rename(tmp_path, path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute an incremental checksum of a directory tree")
+    parser.add_argument('-p', '--path', required=True, dest='rootdir',
+                        help="Directory tree to checksum")
+    parser.add_argument('-i', '--ignore', action='append', default=[],
+                        help="Entry of the top directory to ignore")
+    parser.add_argument('--cache-dir', default='/var/tmp/arequal_cache',
+                        help="Directory where the checksums are cached")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Read all the files and do not save a cache")
+    args = parser.parse_args()
+
+    rootdir = os.path.abspath(args.rootdir)
+    cache_path = cache_file_path(args.cache_dir, rootdir, args.ignore)
+    tree = TreeChecksum(rootdir, args.ignore,
+                        {} if args.no_cache else load_cache(cache_path))
+    try:
+        total = tree.dir_checksum('')
+    except (IOError, OSError) as err:
+        print("Failed to checksum %s: %s" % (rootdir, err), file=sys.stderr)
+        sys.exit(1)
+    if not args.no_cache:
+        save_cache(cache_path, tree.cache)
+
+    print("Entry counts")
+    print("Regular files   : %d" % tree.counts['f'])
+    print("Directories     : %d" % tree.counts['d'])
+    print("Symbolic links  : %d" % tree.counts['l'])
+    print("Other           : %d" % tree.counts['o'])
+    print("Total           : %d" % sum(tree.counts.values()))
+    print("")
+    print("Checksums")
+    print("Total           : %s" % total)
+    print("Files read: %d" % tree.files_read, file=sys.stderr)
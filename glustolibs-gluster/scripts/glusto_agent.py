@@ -0,0 +1,214 @@
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+Long lived agent serving batched requests on a node, started once over
+ssh by glustolibs.gluster.remote_agent.
+
+Reads one JSON object per line on stdin, {"requests": [request, ...]},
+and answers each with one JSON line on stdout, {"responses": [...]},
+the responses being in the order of the requests. Exits on EOF.
+
+A batch with an "id" is served in a thread of its own, so that a long
+request does not hold up the other batches, and its answer carries the
+same "id": {"id": 3, "responses": [...]}. The answers of such batches
+come in the order they complete.
+
+Requests:
+    {"op": "run", "cmd": "gluster volume info"}
+        -> {"rc": 0, "out": "...", "err": ""}
+    {"op": "stat", "path": "/bricks/brick0/file1"}
+        -> {"stat": {"mode": 33188, "size": 1024, ...}}
+    {"op": "getfattr", "path": "/bricks/brick0/file1",
+     "name": "trusted.gfid"}
+        -> {"xattrs": {"trusted.gfid": "0x..."}}  (all xattrs w/o "name")
+    {"op": "read", "path": "/var/log/glusterfs/glusterd.log"}
+        -> {"data": "<base64 data>"}
+    {"op": "listdir", "path": "/bricks/brick0"}
+        -> {"entries": ["file1", "dir1"]}
+A failed request gets {"error": "<message>"}. With "parallel": true in
+the batch, the requests of the batch are served concurrently.
+"""
+
+from __future__ import print_function
+import base64
+import binascii
+import ctypes
+import json
+import os
+import subprocess
+import sys
+import threading
+
+STAT_FIELDS = ('st_mode', 'st_ino', 'st_dev', 'st_nlink', 'st_uid',
+               'st_gid', 'st_size', 'st_atime', 'st_mtime', 'st_ctime')
+
+_libc = None
+
+
+def _xattr_call(func_name, *args):
+    """Calls the libc xattr function, for Python 2 lacking os.*xattr"""
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(None, use_errno=True)
+    # ctypes passes unicode as wchar_t *, the paths and names are char *
+    args = [arg.encode('utf-8') if isinstance(arg, type(u'')) else arg
+            for arg in args]
+    ret = getattr(_libc, func_name)(*args)
+    if ret < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return ret
+
+
+def _getxattr(path, name):
+    if hasattr(os, 'getxattr'):
+        return os.getxattr(path, name)
+    size = _xattr_call('getxattr', path, name, None, 0)
+    buf = ctypes.create_string_buffer(size)
+    size = _xattr_call('getxattr', path, name, buf, size)
+    return buf.raw[:size]
+
+
+def _listxattr(path):
+    if hasattr(os, 'listxattr'):
+        return os.listxattr(path)
+    size = _xattr_call('listxattr', path, None, 0)
+    buf = ctypes.create_string_buffer(size)
+    size = _xattr_call('listxattr', path, buf, size)
+    return [name for name in buf.raw[:size].split(b'\0') if name]
+
+
+def op_run(request):
+    proc = subprocess.Popen(request['cmd'], shell=True,
+                            executable='/bin/bash',
+                            stdin=open(os.devnull),
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = proc.communicate()
+    return {'rc': proc.returncode,
+            'out': out.decode('utf-8', 'replace'),
+            'err': err.decode('utf-8', 'replace')}
+
+
+def op_stat(request):
+    if request.get('follow', True):
+        st = os.stat(request['path'])
+    else:
+        st = os.lstat(request['path'])
+    return {'stat': dict((field[3:], getattr(st, field))
+                         for field in STAT_FIELDS)}
+
+
+def op_getfattr(request):
+    path = request['path']
+    if request.get('name'):
+        names = [request['name']]
+    else:
+        names = _listxattr(path)
+    xattrs = {}
+    for name in names:
+        value = _getxattr(path, name)
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', 'replace')
+        xattrs[name] = "0x" + binascii.hexlify(value).decode('ascii')
+    return {'xattrs': xattrs}
+
+
+def op_read(request):
+    with open(request['path'], 'rb') as fd:
+        fd.seek(request.get('offset', 0))
+        data = fd.read(request.get('size', -1))
+    return {'data': base64.b64encode(data).decode('ascii')}
+
+
+def op_listdir(request):
+    return {'entries': sorted(os.listdir(request['path']))}
+
+
+OPS = {
+    'run': op_run,
+    'stat': op_stat,
+    'getfattr': op_getfattr,
+    'read': op_read,
+    'listdir': op_listdir,
+}
+
+
+def serve(request):
+    """Returns the response to a request"""
+    try:
+        return OPS[request['op']](request)
+    except KeyError as err:
+        return {'error': "Bad request, missing %s" % err}
+    except (IOError, OSError) as err:
+        return {'error': str(err)}
+
+
+def serve_batch(batch):
+    """Returns the responses to the requests of a batch"""
+    requests = batch.get('requests', [])
+    if not batch.get('parallel') or len(requests) < 2:
+        return [serve(request) for request in requests]
+
+    responses = [None] * len(requests)
+
+    def _serve(index):
+        responses[index] = serve(requests[index])
+
+    threads = [threading.Thread(target=_serve, args=(index,))
+               for index in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return responses
+
+
+_stdout_lock = threading.Lock()
+
+
+def answer(batch_id, responses):
+    """Writes the answer to a batch on stdout"""
+    reply = {'responses': responses}
+    if batch_id is not None:
+        reply['id'] = batch_id
+    with _stdout_lock:
+        sys.stdout.write(json.dumps(reply) + "\n")
+        sys.stdout.flush()
+
+
+def serve_and_answer(batch):
+    answer(batch['id'], serve_batch(batch))
+
+
+if __name__ == "__main__":
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        try:
+            batch = json.loads(line)
+        except ValueError as err:
+            answer(None, [{'error': "Bad batch: %s" % err}])
+            continue
+        if batch.get('id') is None:
+            answer(None, serve_batch(batch))
+            continue
+        thread = threading.Thread(target=serve_and_answer, args=(batch,))
+        thread.daemon = True
+        thread.start()
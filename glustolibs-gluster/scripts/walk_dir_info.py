@@ -0,0 +1,129 @@
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+Walks one or more directory trees once and prints one JSON object per
+entry (the roots included) with its type, stat data and the requested
+extended attributes in hex.
+
+Example:
+    python walk_dir_info.py /mnt/glusterfs \
+        --dir-xattr trusted.glusterfs.pathinfo
+    {"path": "/mnt/glusterfs", "type": "d", "stat": {...},
+     "xattrs": {"trusted.glusterfs.pathinfo": "0x3c..."}}
+"""
+
+from __future__ import print_function
+import argparse
+import binascii
+import ctypes
+import json
+import os
+import stat
+import sys
+
+STAT_FIELDS = ('st_mode', 'st_ino', 'st_nlink', 'st_uid', 'st_gid',
+               'st_size', 'st_atime', 'st_mtime', 'st_ctime')
+
+_libc = None
+
+
+def get_xattr(path, name):
+    """Returns the value of the xattr 'name' of path (without following
+    symlinks) in hex, None if it is not set."""
+    global _libc
+    try:
+        if hasattr(os, 'getxattr'):
+            value = os.getxattr(path, name, follow_symlinks=False)
+        else:
+            # Python 2 has no os.getxattr
+            if _libc is None:
+                _libc = ctypes.CDLL(None, use_errno=True)
+            size = _libc.lgetxattr(path, name, None, 0)
+            if size < 0:
+                return None
+            buf = ctypes.create_string_buffer(size)
+            size = _libc.lgetxattr(path, name, buf, size)
+            if size < 0:
+                return None
+            value = buf.raw[:size]
+    except (IOError, OSError):
+        return None
+    return "0x" + binascii.hexlify(value).decode('ascii')
+
+
+def entry_info(path, dir_xattrs, file_xattrs):
+    """Returns the dict describing path, None if it vanished."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    if stat.S_ISDIR(st.st_mode):
+        ftype, xattr_names = 'd', dir_xattrs
+    elif stat.S_ISLNK(st.st_mode):
+        ftype, xattr_names = 'l', file_xattrs
+    else:
+        ftype, xattr_names = 'f', file_xattrs
+
+    xattrs = {}
+    for name in xattr_names:
+        value = get_xattr(path, name)
+        if value is not None:
+            xattrs[name] = value
+    return {'path': path, 'type': ftype,
+            'stat': dict((field[3:], getattr(st, field))
+                         for field in STAT_FIELDS),
+            'xattrs': xattrs}
+
+
+def walk(rootdir, dir_xattrs, file_xattrs, exclude):
+    """Prints the info of rootdir and of every entry below it."""
+    rootdir = os.path.normpath(rootdir)
+    info = entry_info(rootdir, dir_xattrs, file_xattrs)
+    if info is None:
+        return 1
+    print(json.dumps(info))
+    for dirpath, dirnames, filenames in os.walk(rootdir):
+        dirnames[:] = [name for name in dirnames if name not in exclude]
+        for name in dirnames + filenames:
+            info = entry_info(os.path.join(dirpath, name), dir_xattrs,
+                              file_xattrs)
+            if info is not None:
+                print(json.dumps(info))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Walk directory trees and print entry info as JSON "
+                    "lines")
+    parser.add_argument('rootdirs', metavar='ROOTDIR', nargs='+',
+                        help="Directory trees to walk")
+    parser.add_argument('--dir-xattr', action='append', default=[],
+                        dest='dir_xattrs',
+                        help="Extended attribute to read on directories")
+    parser.add_argument('--file-xattr', action='append', default=[],
+                        dest='file_xattrs',
+                        help="Extended attribute to read on other entries")
+    parser.add_argument('--exclude', action='append',
+                        default=['.glusterfs', '.trashcan'],
+                        help="Directory names not to descend into")
+    args = parser.parse_args()
+
+    rc = 0
+    for rootdir in args.rootdirs:
+        rc |= walk(rootdir, args.dir_xattrs, args.file_xattrs, args.exclude)
+    sys.exit(rc)
@@ -20,6 +20,9 @@ from glustolibs.gluster.volume_ops import get_volume_status
 from glustolibs.gluster.glusterfile import file_exists
 from glustolibs.misc.misc_libs import upload_scripts, kill_process
 
+from io import BytesIO
+import re
+
 import numpy as np
 import pandas as pd
 from statistics import mean, median
@@ -53,7 +56,7 @@ def _start_logging_processes(process, servers, test_name, interval, count):
     Args:
      servers(list): Servers on which CPU and memory usage has to be logged
      test_name(str): Name of testcase for which logs are to be collected
-     interval(int): Time interval after which logs are to be collected
+     interval(int|float): Time interval after which logs are to be collected
      count(int): Number of samples to be captured
 
     Returns:
@@ -61,8 +64,9 @@ def _start_logging_processes(process, servers, test_name, interval, count):
     """
     cmd = ("/usr/bin/env python "
            "/usr/share/glustolibs/io/scripts/memory_and_cpu_logger.py"
-           " -p %s -t %s -i %d -c %d" % (process, test_name,
+           " -p %s -t %s -i %s -c %d" % (process, test_name,
                                          interval, count))
+    invalidate_csv_dataframes(test_name)
     logging_process = []
     for server in servers:
         proc = g.run_async(server, cmd)
@@ -79,7 +83,7 @@ def log_memory_and_cpu_usage_on_servers(servers, test_name, interval=60,
      test_name(str): Name of the testcase for which logs are to be collected
 
     Kwargs:
-     interval(int): Time interval after which logs are to be collected
+     interval(int|float): Time interval after which logs are to be collected
                     (Default:60)
      count(int): Number of samples to be captured (Default:100)
 
@@ -103,7 +107,7 @@ def log_memory_and_cpu_usage_on_clients(servers, test_name, interval=60,
      test_name(str): Name of testcase for which logs are to be collected
 
     Kwargs:
-     interval(int): Time interval after which logs are to be collected
+     interval(int|float): Time interval after which logs are to be collected
                     (Defaults:60)
      count(int): Number of samples to be captured (Default:100)
 
@@ -127,7 +131,7 @@ def log_memory_and_cpu_usage_on_cluster(servers, clients, test_name,
      test_name(str): Name of testcase for which logs are to be collected
 
     Kwargs:
-     interval(int): Time interval after which logs are to be collected
+     interval(int|float): Time interval after which logs are to be collected
                     (Default:60)
      count(int): Number of samples to be captured (Default:100)
 
@@ -221,6 +225,117 @@ def kill_all_logging_processes(proc_dict, nodes, cluster=False):
     return False
 
 
+# Dataframes of the CSV files generated by memory_and_cpu_logger.py, in the
+# format {test_name: {(node, proc_name): dataframe}}
+_csv_dataframes = {}
+
+_CSV_MARKER = "GLUSTO_CSV"
+
+
+def _dataframe_from_csv_data(raw_data, test_name):
+    """Creates a dataframe from the rows logged for a testcase in the
+    contents of a CSV file.
+
+    Args:
+     raw_data(str): Contents of the CSV file
+     test_name(str): Name of the testcase
+
+    Returns:
+     dataframe: Pandas dataframe of the last run of the testcase, empty
+                if the testcase isn't in the CSV
+    """
+    columns = ['Time stamp', 'Process ID', 'CPU Usage', 'Memory Usage']
+    lines = raw_data.split("\r\n")
+
+    # Rows of the last run of the testcase, up to the next testcase
+    start = None
+    for index, line in enumerate(lines):
+        if line.split(',')[0] == test_name:
+            start = index + 1
+    if start is None:
+        return pd.DataFrame(columns=columns)
+    end = start + 1
+    while end < len(lines) and not lines[end].endswith(',,,'):
+        end += 1
+
+    section = [line for line in lines[start:end] if line]
+    if not section:
+        return pd.DataFrame(columns=columns)
+    dataframe = pd.read_csv(BytesIO("\r\n".join(section).encode('utf-8')))
+
+    # Drop the incomplete entries and set the type for columns
+    dataframe = dataframe.dropna()
+    conversion_dict = {'Process ID': int,
+                       'CPU Usage': float,
+                       'Memory Usage': float}
+    dataframe = dataframe.astype(conversion_dict)
+    return dataframe
+
+
+def fetch_dataframes_from_csv(nodes, test_name,
+                              proc_names=('glusterd', 'glusterfs',
+                                          'glusterfsd')):
+    """Fetches the CSV files of the given processes from all the nodes at
+    once, with a single command per node, and caches their dataframes for
+    the testcase.
+
+    Args:
+     nodes(list): Nodes from which CSVs are to be picked
+     test_name(str): Name of the testcase
+
+    Kwargs:
+     proc_names(tuple): Names of the processes for which CSVs are to be
+                        picked
+
+    Returns:
+     dict: Dataframe of every node and process in the format
+           {(node, proc_name): dataframe}, None for a missing CSV
+
+    NOTE:
+     The dataframes are cached until logging is started again, this has
+     to be called after the logging processes are stopped.
+    """
+    cache = _csv_dataframes.setdefault(test_name, {})
+    procs = {}
+    for node in nodes:
+        missing = [proc_name for proc_name in proc_names
+                   if (node, proc_name) not in cache]
+        if not missing:
+            continue
+        # Read the csv files generated by memory_and_cpu_logger.py
+        cmd = "; ".join(
+            "echo {0} {1}; cat /root/{1}.csv || echo {0}_MISSING".format(
+                _CSV_MARKER, proc_name) for proc_name in missing)
+        procs[node] = (missing, g.run_async(node, cmd))
+
+    for node, (missing, proc) in procs.items():
+        _, out, _ = proc.async_communicate()
+        for proc_name in missing:
+            cache[(node, proc_name)] = None
+        sections = re.split(r"^%s (\S+)\n" % _CSV_MARKER, out,
+                            flags=re.MULTILINE)
+        for proc_name, raw_data in zip(sections[1::2], sections[2::2]):
+            if raw_data.startswith("%s_MISSING" % _CSV_MARKER):
+                continue
+            cache[(node, proc_name)] = _dataframe_from_csv_data(raw_data,
+                                                                test_name)
+
+    return dict(((node, proc_name), cache[(node, proc_name)])
+                for node in nodes for proc_name in proc_names)
+
+
+def invalidate_csv_dataframes(test_name=None):
+    """Drops the cached dataframes of the CSV files
+
+    Kwargs:
+     test_name(str): Name of the testcase, all the testcases if not given
+    """
+    if test_name is None:
+        _csv_dataframes.clear()
+    else:
+        _csv_dataframes.pop(test_name, None)
+
+
 def create_dataframe_from_csv(node, proc_name, test_name):
     """Creates a dataframe from a given process.
 
@@ -232,35 +347,8 @@ def create_dataframe_from_csv(node, proc_name, test_name):
     Returns:
      dataframe: Pandas dataframe if CSV file exits else None
     """
-    # Read the csv file generated by memory_and_cpu_logger.py
-    ret, raw_data, _ = g.run(node, "cat /root/{}.csv"
-                             .format(proc_name))
-    if ret:
-        return None
-
-    # Split the complete dump to individual lines
-    data = raw_data.split("\r\n")
-    rows, flag = [], False
-    for line in data:
-        values = line.split(',')
-        if test_name == values[0]:
-            # Reset rows if it's the second instance
-            if flag:
-                rows = []
-            flag = True
-            continue
-
-        # Pick and append values which have complete entry
-        if flag and len(values) == 4:
-            rows.append(values)
-
-    # Create a panda dataframe and set the type for columns
-    dataframe = pd.DataFrame(rows[1:], columns=rows[0])
-    conversion_dict = {'Process ID': int,
-                       'CPU Usage': float,
-                       'Memory Usage': float}
-    dataframe = dataframe.astype(conversion_dict)
-    return dataframe
+    return fetch_dataframes_from_csv(
+        [node], test_name, (proc_name,))[(node, proc_name)]
 
 
 def _get_min_max_mean_median(entrylist):
@@ -355,6 +443,8 @@ def compute_data_usage_stats_on_servers(nodes, test_name):
      This function has to be always run before cleanup.
     """
     data_dict = {}
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         volume_status = get_volume_status(node)
@@ -421,6 +511,8 @@ def compute_data_usage_stats_on_clients(nodes, test_name):
      dict: dict of min, max, mean and median for a given process
     """
     data_dict = {}
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         data_dict[node] = {}
         dataframe = create_dataframe_from_csv(node, 'glusterfs', test_name)
@@ -527,6 +619,8 @@ def check_for_memory_leaks_in_glusterd(nodes, test_name, gain=30.0):
       bool: True if memory leak was obsevred else False
     """
     is_there_a_leak = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         dataframe = create_dataframe_from_csv(node, 'glusterd', test_name)
         if dataframe.empty:
@@ -561,6 +655,8 @@ def check_for_memory_leaks_in_glusterfs(nodes, test_name, gain=30.0):
      This function should be executed with the volumes present on the cluster
     """
     is_there_a_leak = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         volume_status = get_volume_status(node)
@@ -604,6 +700,8 @@ def check_for_memory_leaks_in_glusterfsd(nodes, test_name, gain=30.0):
      This function should be executed with the volumes present on the cluster.
     """
     is_there_a_leak = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         volume_status = get_volume_status(node)
@@ -648,6 +746,8 @@ def check_for_memory_leaks_in_glusterfs_fuse(nodes, test_name, gain=30.0):
      This function should be executed when the volume is still mounted.
     """
     is_there_a_leak = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         dataframe = create_dataframe_from_csv(node, 'glusterfs', test_name)
@@ -743,7 +843,8 @@ def _check_for_cpu_usage_spikes(dataframe, node, process, threshold,
      dataframe(panda dataframe): Panda dataframe of a given process
      node(str): Node on which cpu spikes has to be checked
      process(str): Name of process for which check has to be done
-     threshold(int): Accepted amount of 100% CPU usage instances
+     threshold(int): Accepted amount of samples with a CPU usage of
+                     100% or more
 
     kwargs:
      volume_status(dict): Volume status output on the give name
@@ -758,9 +859,11 @@ def _check_for_cpu_usage_spikes(dataframe, node, process, threshold,
         pid = int(volume_status[volume][node][vol_name]['pid'])
         dataframe = dataframe[dataframe['Process ID'] == pid]
 
-    # Check if usage is more than accepted amount of leak
+    # The samples are the CPU usage over each interval, which goes above
+    # 100 for multi-threaded processes, so every sample at 100 or more is
+    # a spike
     cpu_spike_decision_array = np.where(
-        dataframe['CPU Usage'].dropna() == 100.0, True, False)
+        dataframe['CPU Usage'].dropna() >= 100.0, True, False)
     instances_of_spikes = np.where(cpu_spike_decision_array)[0]
 
     return bool(len(instances_of_spikes) > threshold)
@@ -774,13 +877,15 @@ def check_for_cpu_usage_spikes_on_glusterd(nodes, test_name, threshold=3):
      test_name(str): Name of testcase for which memory leaks has to be checked
 
     Kwargs:
-     threshold(int): Accepted amount of instances of 100% CPU usage
-                    (Default:3)
+     threshold(int): Accepted amount of instances of 100% or more CPU
+                    usage (Default:3)
 
     Returns:
       bool: True if CPU spikes are more than threshold else False
     """
     is_there_a_spike = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         dataframe = create_dataframe_from_csv(node, 'glusterd', test_name)
         if dataframe.empty:
@@ -806,8 +911,8 @@ def check_for_cpu_usage_spikes_on_glusterfs(nodes, test_name, threshold=3):
      test_name(str): Name of testcase for which memory leaks has to be checked
 
     Kwargs:
-     threshold(int): Accepted amount of instances of 100% CPU usage
-                    (Default:3)
+     threshold(int): Accepted amount of instances of 100% or more CPU
+                    usage (Default:3)
 
     Returns:
       bool: True if CPU spikes are more than threshold else False
@@ -816,6 +921,8 @@ def check_for_cpu_usage_spikes_on_glusterfs(nodes, test_name, threshold=3):
      This function should be exuected with the volumes present on the cluster.
     """
     is_there_a_spike = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         volume_status = get_volume_status(node)
@@ -850,8 +957,8 @@ def check_for_cpu_usage_spikes_on_glusterfsd(nodes, test_name, threshold=3):
      test_name(str): Name of testcase for which memory leaks has to be checked
 
     Kwargs:
-     threshold(int): Accepted amount of instances of 100% CPU usage
-                    (Default:3)
+     threshold(int): Accepted amount of instances of 100% or more CPU
+                    usage (Default:3)
 
     Returns:
       bool: True if CPU spikes are more than threshold else False
@@ -860,6 +967,8 @@ def check_for_cpu_usage_spikes_on_glusterfsd(nodes, test_name, threshold=3):
      This function should be exuected with the volumes present on the cluster.
     """
     is_there_a_spike = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         volume_status = get_volume_status(node)
@@ -896,8 +1005,8 @@ def check_for_cpu_usage_spikes_on_glusterfs_fuse(nodes, test_name,
      test_name(str): Name of testcase for which memory leaks has to be checked
 
     Kwargs:
-     threshold(int): Accepted amount of instances of 100% CPU usage
-                    (Default:3)
+     threshold(int): Accepted amount of instances of 100% or more CPU
+                    usage (Default:3)
 
     Returns:
       bool: True if CPU spikes are more than threshold else False
@@ -906,6 +1015,8 @@ def check_for_cpu_usage_spikes_on_glusterfs_fuse(nodes, test_name,
      This function should be executed when the volume is still mounted.
     """
     is_there_a_spike = []
+    # Fetch the CSVs of all the nodes at once
+    fetch_dataframes_from_csv(nodes, test_name)
     for node in nodes:
         # Get the volume status on the node
         dataframe = create_dataframe_from_csv(node, 'glusterfs', test_name)
@@ -23,12 +23,15 @@ import subprocess
 
 from glusto.core import Glusto as g
 from glustolibs.gluster.glusterfile import file_exists
+from glustolibs.gluster.lib_utils import (collect_bricks_arequal,
+                                          form_arequal_cmd,
+                                          upload_incremental_arequal)
 from glustolibs.gluster.mount_ops import GlusterMount
 from glustolibs.gluster.volume_libs import get_subvols
 from glustolibs.misc.misc_libs import upload_scripts
 
 
-def collect_mounts_arequal(mounts, path=''):
+def collect_mounts_arequal(mounts, path='', incremental=False):
     """Collects arequal from all the mounts
 
     Args:
@@ -37,6 +40,9 @@ def collect_mounts_arequal(mounts, path=''):
     Kwargs:
         path (str): Path whose arequal is to be calculated.
                     Defaults to root of mountpoint
+        incremental (bool): Only read the files changed since the previous
+                    incremental collection on the mounts (see
+                    lib_utils.form_arequal_cmd). Defaults to False.
     Returns:
         tuple(bool, list):
             On success returns (True, list of arequal-checksums of each mount)
@@ -47,6 +53,10 @@ def collect_mounts_arequal(mounts, path=''):
     if isinstance(mounts, GlusterMount):
         mounts = [mounts]
 
+    if incremental and not upload_incremental_arequal(
+            [mount_obj.client_system for mount_obj in mounts]):
+        return (False, [None] * len(mounts))
+
     # Collect arequal-checksum from all mounts
     g.log.info("Start collecting arequal-checksum from all mounts")
     all_mounts_procs = []
@@ -54,7 +64,7 @@ def collect_mounts_arequal(mounts, path=''):
         total_path = os.path.join(mount_obj.mountpoint, path)
         g.log.info("arequal-checksum of mount %s:%s", mount_obj.client_system,
                    total_path)
-        cmd = "arequal-checksum -p %s -i .trashcan" % total_path
+        cmd = form_arequal_cmd(total_path, ('.trashcan',), incremental)
         proc = g.run_async(mount_obj.client_system, cmd, user=mount_obj.user)
         all_mounts_procs.append(proc)
     all_mounts_arequal_checksums = []
@@ -74,7 +84,8 @@ def collect_mounts_arequal(mounts, path=''):
 
 
 def log_mounts_info(mounts):
-    """Log mount information like df, stat, ls
+    """Log mount information like df, stat, ls, collected on all the mounts
+    at once.
 
     Args:
         mounts (list): List of all GlusterMount objs.
@@ -83,28 +94,21 @@ def log_mounts_info(mounts):
         mounts = [mounts]
 
     g.log.info("Start logging mounts information:")
+    procs = []
     for mount_obj in mounts:
-        g.log.info("Information of mount %s:%s", mount_obj.client_system,
-                   mount_obj.mountpoint)
-        # Mount Info
-        g.log.info("Look For Mountpoint:\n")
-        cmd = "mount | grep %s" % mount_obj.mountpoint
-        g.run(mount_obj.client_system, cmd)
-
-        # Disk Space Usage
-        g.log.info("Disk Space Usage Of Mountpoint:\n")
-        cmd = "df -h %s" % mount_obj.mountpoint
-        g.run(mount_obj.client_system, cmd)
-
-        # Long list the mountpoint
-        g.log.info("List Mountpoint Entries:\n")
-        cmd = "ls -ld %s" % mount_obj.mountpoint
-        g.run(mount_obj.client_system, cmd)
+        # Mount info, disk space usage, long list and stat of the
+        # mountpoint with a single command
+        cmd = ("echo 'Look For Mountpoint:'; mount | grep {0}; "
+               "echo 'Disk Space Usage Of Mountpoint:'; df -h {0}; "
+               "echo 'List Mountpoint Entries:'; ls -ld {0}; "
+               "echo 'Mountpoint Status:'; stat {0}"
+               .format(mount_obj.mountpoint))
+        procs.append(g.run_async(mount_obj.client_system, cmd))
 
-        # Stat mountpoint
-        g.log.info("Mountpoint Status:\n")
-        cmd = "stat %s" % mount_obj.mountpoint
-        g.run(mount_obj.client_system, cmd)
+    for mount_obj, proc in zip(mounts, procs):
+        _, out, err = proc.async_communicate()
+        g.log.info("Information of mount %s:%s\n%s%s",
+                   mount_obj.client_system, mount_obj.mountpoint, out, err)
 
 
 def get_mounts_stat(mounts):
@@ -757,27 +761,25 @@ def check_arequal_bricks_replicated(mnode, volname):
     num_subvols = len(subvols_dict['volume_subvols'])
     g.log.info("Number of subvolumes in volume %s:", num_subvols)
 
-    # Get arequals and compare
-    for i in range(0, num_subvols):
+    # Get arequals of all the bricks at once and compare
+    subvols = subvols_dict['volume_subvols']
+    _, arequals = collect_bricks_arequal(
+        [brick for subvol in subvols for brick in subvol])
+    for i, subvol_brick_list in enumerate(subvols):
+        subvol_arequals = arequals[:len(subvol_brick_list)]
+        arequals = arequals[len(subvol_brick_list):]
+
         # Get arequal for first brick
-        subvol_brick_list = subvols_dict['volume_subvols'][i]
-        node, brick_path = subvol_brick_list[0].split(':')
-        command = ('arequal-checksum -p %s '
-                   '-i .glusterfs -i .landfill -i .trashcan' % brick_path)
-        ret, arequal, _ = g.run(node, command)
-        if ret != 0:
+        if subvol_arequals[0] is None:
             g.log.error("Failed to calculate arequal for first brick"
                         "of subvol %s of volume %s", i, volname)
             return False
-        first_brick_total = arequal.splitlines()[-1].split(':')[-1]
-
-        # Get arequal for every brick and compare with first brick
-        for brick in subvol_brick_list[1:]:
-            node, brick_path = brick.split(':')
-            command = ('arequal-checksum -p %s '
-                       '-i .glusterfs -i .landfill -i .trashcan' % brick_path)
-            ret, brick_arequal, _ = g.run(node, command)
-            if ret != 0:
+        first_brick_total = subvol_arequals[0].splitlines()[-1].split(':')[-1]
+
+        # Compare arequal of every brick with first brick
+        for brick, brick_arequal in zip(subvol_brick_list[1:],
+                                        subvol_arequals[1:]):
+            if brick_arequal is None:
                 g.log.error('Failed to get arequal on brick %s' % brick)
                 return False
             g.log.info('Getting arequal for %s is successful', brick)
@@ -18,7 +18,6 @@
 from __future__ import print_function
 import argparse
 import datetime
-from multiprocessing import Process
 import os
 import random
 import string
@@ -166,6 +165,9 @@ def fd_writes(args):
             size_expanded = size_numeric_value * file_sizes_dict[size_postfix]
             file_sizes_expanded_list.append(size_expanded)
 
+    # Imported here to keep the startup of the script (e.g. --help) fast
+    from multiprocessing import Process
+
     process_list = []
     for dirName, subdirList, fileList in os.walk(dir_path, topdown=False):
         all_files_list = []
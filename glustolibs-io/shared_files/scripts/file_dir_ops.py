@@ -21,21 +21,23 @@
 
 from __future__ import print_function
 import argparse
+from collections import OrderedDict
 import contextlib
 import datetime
-from multiprocessing import Process
-from multiprocessing.pool import ThreadPool
 import os
 import platform
 import random
 import shutil
+import stat
 import string
 import subprocess
 import sys
-
-from docx import Document
-import numpy as np
-from sh import rsync as sh_rsync
+import threading
+import time
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
 
 if platform.system() == "Windows":
     path_sep = "\\"
@@ -183,6 +185,10 @@ def create_deep_dirs(args):
     if os.path.exists("/tmp/file_dir_ops_create_dirs_rc"):
         os.remove("/tmp/file_dir_ops_create_dirs_rc")
 
+    # Heavy modules are imported by the sub commands using them, to keep
+    # the startup of the others fast
+    from multiprocessing import Process
+
     process_list = []
     for i in range(dirname_start_num, (dirname_start_num + dir_length)):
         num_of_dirs = random.choice(range(1, max_num_of_dirs + 1))
@@ -234,31 +240,41 @@ def create_deep_dirs_with_files(args):
     if rc != 0:
         return rc
 
-    # Remove the file which saves the rc if already exists
-    if os.path.exists("/tmp/file_dir_ops_create_dirs_rc"):
-        os.remove("/tmp/file_dir_ops_create_dirs_rc")
+    if (fixed_file_size is not None and
+            fixed_file_size not in file_sizes_dict):
+        print("File sizes can be [1k, 10k, 512k, 1M]")
+        return 1
 
-    process_list = []
+    # As many workers as top level dirs unless told otherwise
+    builder = TreeBuilder(args.workers or dir_length, args.report_interval)
     for i in range(dirname_start_num, (dirname_start_num + dir_length)):
         num_of_dirs = random.choice(range(1, max_num_of_dirs + 1))
-        process_dir_path = os.path.join(dir_path, "user%d" % i)
-        process_list.append(Process(
-            target=create_dirs,
-            args=(process_dir_path, dir_depth, num_of_dirs, num_of_files,
-                  fixed_file_size, base_file_name, file_types)
-        ))
-    for each_process in process_list:
-        each_process.start()
+        builder.add_dir(os.path.join(dir_path, "user%d" % i), dir_depth,
+                        num_of_dirs, num_of_files, fixed_file_size,
+                        base_file_name, file_types)
+    return builder.run()
 
-    for each_process in process_list:
-        each_process.join()
-    rc = 0
-    if os.path.exists("/tmp/file_dir_ops_create_dirs_rc"):
-        fd = open("/tmp/file_dir_ops_create_dirs_rc", "r")
-        rc = fd.read()
-        fd.close()
-        os.remove("/tmp/file_dir_ops_create_dirs_rc")
-    return int(rc)
+
+def get_random_data(size, chars=string.printable):
+    """Generate random data made of the given characters
+
+    The characters are drawn as indexes in a uint8 array mapped onto the
+    character table, so no Python object is created per character.
+
+    Args:
+        size (int): Size of the data in bytes
+
+    Kwargs:
+        chars (str): Characters to draw from. Defaults to string.printable
+
+    Returns:
+        bytes: the random data
+    """
+    import numpy as np
+
+    table = np.frombuffer(chars.encode('ascii'), dtype=np.uint8)
+    return table[np.random.randint(0, len(table), size,
+                                   dtype=np.uint8)].tobytes()
 
 
 def _create_file(file_abs_path, file_type, file_size):
@@ -267,10 +283,9 @@ def _create_file(file_abs_path, file_type, file_size):
     if file_type == 'txt':
         file_abs_path += ".txt"
 
-        with open(file_abs_path, "w+") as new_file:
+        with open(file_abs_path, "wb+") as new_file:
             try:
-                new_file.write(''.join(
-                    np.random.choice(list(string.printable), file_size)))
+                new_file.write(get_random_data(file_size))
                 new_file.flush()
                 new_file.close()
             except IOError as err:
@@ -279,11 +294,13 @@ def _create_file(file_abs_path, file_type, file_size):
                 rc = 1
 
     elif file_type == 'docx':
+        from docx import Document
+
         file_abs_path += ".docx"
         try:
             document = Document()
-            str_to_write = list(string.ascii_letters + string.digits)
-            file_str = ''.join(np.random.choice(str_to_write, file_size))
+            file_str = get_random_data(
+                file_size, string.ascii_letters + string.digits).decode()
             document.add_paragraph(file_str)
             document.save(file_abs_path)
         except Exception as err:
@@ -303,47 +320,170 @@ def _create_file(file_abs_path, file_type, file_size):
     return rc
 
 
-def _create_files(dir_path, num_of_files, fixed_file_size=None,
-                  base_file_name='testfile', file_types='txt'):
-    rc = 0
+file_sizes_dict = {
+    '1k': 1024,
+    '10k': 10240,
+    '512k': 524288,
+    '1M': 1048576,
+}
+
+
+def _get_file_tuples(dir_path, num_of_files, fixed_file_size=None,
+                     base_file_name='testfile', file_types='txt'):
+    """Get the (file name, file type, file size) tuples of the files to
+        create in dir_path. None if fixed_file_size is not a known size.
+    """
     file_types_list = file_types.split()
-    file_sizes_dict = {
-        '1k': 1024,
-        '10k': 10240,
-        '512k': 524288,
-        '1M': 1048576,
-    }
+    fname_abs_path = os.path.join(dir_path, base_file_name)
+    if fixed_file_size is None:
+        return [(fname_abs_path + str(num),
+                 random.choice(file_types_list),
+                 random.choice(list(file_sizes_dict.values())))
+                for num in range(num_of_files)]
+    if fixed_file_size not in file_sizes_dict:
+        print("File sizes can be [1k, 10k, 512k, 1M]")
+        return None
+    return [(fname_abs_path + str(num),
+             random.choice(file_types_list),
+             file_sizes_dict[fixed_file_size])
+            for num in range(num_of_files)]
+
+
+class TreeBuilder(object):
+    """Creates directory trees and files with a pool of worker threads.
+
+    Directories and files are jobs of a FIFO work queue consumed by the
+    workers. Creating a directory queues its files and its sub-dirs, so the
+    trees are built breadth first and every level is spread over all the
+    workers.
+    """
+    def __init__(self, workers=1, report_interval=0):
+        """
+        Kwargs:
+            workers (int): Number of worker threads. Defaults to 1.
+            report_interval (int): Print the progress counters and the
+                ops/sec every report_interval seconds. Defaults to 0 (no
+                reporting).
+        """
+        self._queue = Queue()
+        self._lock = threading.Lock()
+        self._workers = max(workers, 1)
+        self._report_interval = report_interval
+        self.dirs = 0
+        self.files = 0
+        self.errors = 0
+
+    def add_dir(self, dir_path, depth, num_of_dirs, num_of_files=0,
+                fixed_file_size=None, base_file_name='testfile',
+                file_types='txt'):
+        """Queue the creation of dir_path, with num_of_files files in it,
+            and of num_of_dirs sub-dirs down to depth levels below it.
+        """
+        self._queue.put((self._create_dir,
+                         (dir_path, depth, num_of_dirs, num_of_files,
+                          fixed_file_size, base_file_name, file_types)))
+
+    def add_files(self, file_tuples):
+        """Queue the creation of (file name, file type, file size) files"""
+        for file_tuple in file_tuples:
+            self._queue.put((self._create_file, file_tuple))
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _create_dir(self, dir_path, depth, num_of_dirs, num_of_files,
+                    fixed_file_size, base_file_name, file_types):
+        try:
+            os.makedirs(dir_path)
+            self._count('dirs')
+            if num_of_files != 0:
+                self.add_files(_get_file_tuples(
+                    dir_path, num_of_files, fixed_file_size,
+                    base_file_name, file_types))
+        except (OSError, IOError) as e:
+            if 'File exists' not in e.strerror:
+                print("Unable to create dir '%s' : %s" % (
+                    dir_path, e.strerror))
+                self._count('errors')
+        if depth == 0:
+            return
+        for i in range(num_of_dirs):
+            self.add_dir(os.path.join(dir_path, "dir%d" % i), depth - 1,
+                         num_of_dirs, num_of_files, fixed_file_size,
+                         base_file_name, file_types)
+
+    def _create_file(self, file_abs_path, file_type, file_size):
+        if _create_file(file_abs_path, file_type, file_size):
+            self._count('errors')
+        else:
+            self._count('files')
 
+    def _work(self):
+        while True:
+            func, job_args = self._queue.get()
+            try:
+                func(*job_args)
+            except Exception as e:
+                print("Unable to process %s : %s" % (job_args[0], e))
+                self._count('errors')
+            finally:
+                self._queue.task_done()
+
+    def _report(self, start_time):
+        elapsed = max(time.time() - start_time, 1e-6)
+        print("Created %d dirs, %d files (%d errors, %d queued) in %.1fs: "
+              "%.1f ops/sec" % (self.dirs, self.files, self.errors,
+                                self._queue.qsize(), elapsed,
+                                (self.dirs + self.files) / elapsed))
+        sys.stdout.flush()
+
+    def run(self):
+        """Process the queued jobs with the workers until none is left
+
+        Returns:
+            0 if all the dirs/files were created, 1 otherwise.
+        """
+        start_time = time.time()
+        for _ in range(self._workers):
+            worker = threading.Thread(target=self._work)
+            worker.daemon = True
+            worker.start()
+
+        done = threading.Event()
+        if self._report_interval > 0:
+            def _reporter():
+                while not done.wait(self._report_interval):
+                    self._report(start_time)
+            reporter = threading.Thread(target=_reporter)
+            reporter.daemon = True
+            reporter.start()
+
+        self._queue.join()
+        done.set()
+        if self._report_interval > 0:
+            self._report(start_time)
+        return 1 if self.errors else 0
+
+
+def _create_files(dir_path, num_of_files, fixed_file_size=None,
+                  base_file_name='testfile', file_types='txt',
+                  workers=None, report_interval=0):
     # Create dir_path
     rc = create_dir(dir_path)
     if rc != 0:
         return rc
 
-    fname_abs_path = os.path.join(dir_path, base_file_name)
-    if fixed_file_size is None:
-        # this generator yields file tuples: (file name, file type, file size)
-        files = ((fname_abs_path + str(num),
-                  random.choice(file_types_list),
-                  random.choice(list(file_sizes_dict.values())))
-                 for num in range(num_of_files))
-    else:
-        try:
-            files = ((fname_abs_path + str(num),
-                      random.choice(file_types_list),
-                      file_sizes_dict[fixed_file_size])
-                     for num in range(num_of_files))
-        except KeyError:
-            print("File sizes can be [1k, 10k, 512k, 1M]")
-            return 1
-
-    # Thread per filetype (for now)
-    pool = ThreadPool(len(file_types_list))
-    ret = pool.map(lambda file_tuple: _create_file(*file_tuple), files)
-    pool.close()
-    pool.join()
-    rc = 1 if any(ret) else 0
+    file_tuples = _get_file_tuples(dir_path, num_of_files, fixed_file_size,
+                                   base_file_name, file_types)
+    if file_tuples is None:
+        return 1
 
-    return rc
+    # Thread per filetype unless told otherwise
+    builder = TreeBuilder(workers or len(file_types.split()),
+                          report_interval)
+    builder.add_files(file_tuples)
+    return builder.run()
 
 
 def create_files(args):
@@ -368,13 +508,16 @@ def create_files(args):
     if rc != 0:
         return rc
 
-    rc = 0
+    builder = TreeBuilder(args.workers or len(file_types.split()),
+                          args.report_interval)
     for dirName, subdirList, fileList in os.walk(dir_path, topdown=False):
-        _rc = _create_files(dirName, num_of_files, fixed_file_size,
-                            base_file_name, file_types)
-        if _rc != 0:
-            rc = 1
-    return rc
+        file_tuples = _get_file_tuples(dirName, num_of_files,
+                                       fixed_file_size, base_file_name,
+                                       file_types)
+        if file_tuples is None:
+            return 1
+        builder.add_files(file_tuples)
+    return builder.run()
 
 
 def rename(args):
@@ -444,38 +587,82 @@ def ls(args):
     return 0
 
 
+def _run_jobs(func, items, workers=1):
+    """Run func on every item, in a pool of 'workers' threads if more than
+        one worker is asked for.
+
+    Returns:
+        list: the results of func for every item
+    """
+    if workers <= 1:
+        return [func(item) for item in items]
+
+    from multiprocessing.pool import ThreadPool
+
+    pool = ThreadPool(workers)
+    try:
+        return pool.map(func, items)
+    finally:
+        pool.close()
+        pool.join()
+
+
+def _filemode(mode):
+    """Get the 'ls -l' like string of a file mode (e.g. -rw-r--r--)"""
+    if hasattr(stat, 'filemode'):
+        return stat.filemode(mode)
+
+    # Python 2: no special bits
+    filemode = 'd' if stat.S_ISDIR(mode) else (
+        'l' if stat.S_ISLNK(mode) else '-')
+    for who in ('USR', 'GRP', 'OTH'):
+        for what in ('R', 'W', 'X'):
+            if mode & getattr(stat, 'S_I%s%s' % (what, who)):
+                filemode += what.lower()
+            else:
+                filemode += '-'
+    return filemode
+
+
+_user_names = {}
+_group_names = {}
+
+
+def _get_name(names, get_entry, uid):
+    """Get the user/group name of an id, caching the lookups"""
+    if uid not in names:
+        try:
+            names[uid] = get_entry(uid)[0]
+        except KeyError:
+            names[uid] = 'UNKNOWN'
+    return names[uid]
+
+
 def _get_path_stats(path):
     """Get the stat of a specified path."""
-    rc = 0
-    path = os.path.abspath(args.path)
+    import grp
+    import pwd
+
+    rc, err = 0, None
+    path = os.path.abspath(path)
     file_stats = {}
 
-    if platform.system() == "Linux":
-        cmd = "stat -c " + "'%A %U %G' " + path
-        subp = subprocess.Popen(cmd,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                shell=True)
-        out, err = subp.communicate()
-        if subp.returncode != 0:
-            rc = 1
-        else:
-            if out:
-                out = out.decode()
-                out = out.split(" ")
-                file_stats['mode'] = out[0].strip()
-                file_stats['user'] = out[1].strip()
-                file_stats['group'] = out[2].strip()
-            else:
-                rc = 1
     try:
-        stat = os.stat(path)
+        # mode, user and group of the path itself, as 'stat -c' reports
+        lstat = os.lstat(path)
+        file_stats['mode'] = _filemode(lstat.st_mode)
+        file_stats['user'] = _get_name(_user_names, pwd.getpwuid,
+                                       lstat.st_uid)
+        file_stats['group'] = _get_name(_group_names, grp.getgrgid,
+                                        lstat.st_gid)
+
+        path_stat = os.stat(path)
         file_stats.update({
-            'atime': stat.st_atime,
-            'mtime': stat.st_mtime,
-            'ctime': stat.st_ctime,
-            'inode': stat.st_ino,
-            'stat': stat,
+            'atime': path_stat.st_atime,
+            'mtime': path_stat.st_mtime,
+            'ctime': path_stat.st_ctime,
+            'inode': path_stat.st_ino,
+            'stat': path_stat,
         })
     except Exception:
         rc = 1
@@ -495,22 +682,17 @@ def get_path_stats(args):
         print("PATH '%s' does not exist" % path)
         return 1
 
-    file_stats = {}
-
-    if os.path.isfile(path):
-        file_stats[path] = _get_path_stats(path)
-
-    if os.path.isdir(path):
-        if recursive:
-            for dirName, subdirList, fileList in os.walk(path, topdown=False):
-                file_stats[dirName] = _get_path_stats(dirName)
+    paths = []
+    if os.path.isdir(path) and recursive:
+        for dirName, subdirList, fileList in os.walk(path, topdown=False):
+            paths.append(dirName)
+            for fname in fileList:
+                paths.append(os.path.join(dirName, fname))
+    else:
+        paths.append(path)
 
-                for fname in fileList:
-                    fname_abs_path = os.path.join(dirName, fname)
-                    file_stats[fname_abs_path] = _get_path_stats(
-                        fname_abs_path)
-        else:
-            file_stats[path] = _get_path_stats(path)
+    file_stats = OrderedDict(zip(paths, _run_jobs(_get_path_stats, paths,
+                                                  args.workers)))
 
     rc = 0
 
@@ -699,20 +881,36 @@ def read(args):
     """
     dir_path = os.path.abspath(args.dir)
     log_file = args.log_file
-    rc = 0
+    workers = args.workers
+    lock = threading.Lock()
+
+    files = []
     for dir_name, subdir_list, file_list in os.walk(dir_path, topdown=False):
         for fname in file_list:
-            new_fname, ext = os.path.splitext(fname)
+            files.append(os.path.join(dir_name, fname))
+
+    with open(log_file, "ab") as log_fh:
+
+        def _read_file(path):
             try:
-                if platform.system() == "Windows":
-                    cmd = "type " + os.path.join(dir_name, fname)
-                elif platform.system() == "Linux":
-                    cmd = "cat " + os.path.join(dir_name, fname)
-                fh = open(log_file, "a")
-                subprocess.call(cmd, shell=True, stdout=fh)
-                fh.close()
-            except OSError:
-                rc = 1
+                if workers <= 1:
+                    with open(path, 'rb') as fh:
+                        shutil.copyfileobj(fh, log_fh, 1 << 20)
+                else:
+                    # Read in parallel, log one file at a time. Files
+                    # larger than a chunk are streamed under the lock so
+                    # that a worker never holds more than a chunk.
+                    with open(path, 'rb') as fh:
+                        data = fh.read(1 << 20)
+                        with lock:
+                            log_fh.write(data)
+                            shutil.copyfileobj(fh, log_fh, 1 << 20)
+            except (IOError, OSError) as e:
+                print("Unable to read file '%s' : %s" % (path, e.strerror))
+                return 1
+            return 0
+
+        rc = 1 if any(_run_jobs(_read_file, files, workers)) else 0
     return rc
 
 
@@ -735,24 +933,34 @@ def copy(args):
     if rc != 0:
         return 1
 
-    rc = 0
+    # Files are copied to dest_dir and sub-dirs are copied as a whole
+    files, dirs = OrderedDict(), []
     for dir_name, subdir_list, file_list in os.walk(src_dir, topdown=False):
         for fname in file_list:
-            try:
-                src = os.path.join(dir_name, fname)
-                dst = dest_dir
-                shutil.copy(src, dst)
-            except OSError:
-                rc = 1
+            # Only the last file of a name is left in dest_dir, do not
+            # copy the others to not have workers writing the same file
+            dst = os.path.join(dest_dir, fname)
+            files.pop(dst, None)
+            files[dst] = os.path.join(dir_name, fname)
 
         if dir_name != src_dir:
-            try:
-                src = dir_name
-                dst = (dest_dir + path_sep
-                       + os.path.basename(os.path.normpath(src)))
-                shutil.copytree(src, dst)
-            except OSError:
-                rc = 1
+            dirs.append(dir_name)
+
+    def _copy_file(dst):
+        try:
+            shutil.copy(files[dst], dst)
+        except (IOError, OSError):
+            return 1
+        return 0
+
+    rc = 1 if any(_run_jobs(_copy_file, list(files), args.workers)) else 0
+    for dir_name in dirs:
+        try:
+            shutil.copytree(dir_name,
+                            (dest_dir + path_sep
+                             + os.path.basename(os.path.normpath(dir_name))))
+        except (OSError, shutil.Error):
+            rc = 1
     return rc
 
 
@@ -769,19 +977,24 @@ def delete(args):
         print("Directory '%s' does not exist" % dir_path)
         return 1
 
-    rc = 0
+    files, dirs = [], []
     for dir_name, subdir_list, file_list in os.walk(dir_path, topdown=False):
         for fname in file_list:
-            try:
-                os.remove(os.path.join(dir_name, fname))
-            except OSError:
-                rc = 1
-
+            files.append(os.path.join(dir_name, fname))
         if dir_name != dir_path:
-            try:
-                os.rmdir(dir_name)
-            except OSError:
-                rc = 1
+            dirs.append(dir_name)
+
+    def _delete(path, remove=os.remove):
+        try:
+            remove(path)
+        except OSError:
+            return 1
+        return 0
+
+    # All the files first, then the dirs, deepest first
+    rc = 1 if any(_run_jobs(_delete, files, args.workers)) else 0
+    for dir_name in dirs:
+        rc |= _delete(dir_name, os.rmdir)
     return rc
 
 
@@ -809,10 +1022,9 @@ def append(args):
                 random.choice(list(sizes_dict.keys()))]
             try:
                 file = os.path.join(dir_name, fname)
-                with open(file, "a") as fd:
+                with open(file, "ab") as fd:
                     try:
-                        fd.write(''.join(random.choice(string.printable)
-                                         for x in range(append_size)))
+                        fd.write(get_random_data(append_size))
                         fd.flush()
                     except IOError as e:
                         print("Unable to append to file '%s' : %s" %
@@ -840,10 +1052,9 @@ def overwrite(args):
                 random.choice(list(sizes_dict.keys()))]
             try:
                 file = os.path.join(dir_name, fname)
-                with open(file, "w+") as fd:
+                with open(file, "w+b") as fd:
                     try:
-                        fd.write(''.join(random.choice(string.printable)
-                                         for x in range(new_size)))
+                        fd.write(get_random_data(new_size))
                         fd.flush()
                     except IOError as e:
                         print("Unable to write to file '%s' : %s" %
@@ -905,6 +1116,7 @@ def rsync(args):
         return rc
     rc = 0
 
+    from sh import rsync as sh_rsync
     try:
         sh_rsync("-r", remote_dir, src_dir)
 
@@ -998,6 +1210,17 @@ if __name__ == "__main__":
         help="Start the directory naming from 'dirname-start-num'",
         metavar=('dirname_start_num'), dest='dirname_start_num', default=1,
         type=int)
+    create_deep_dir_with_files_parser.add_argument(
+        '--workers',
+        help=("Number of worker threads creating the dirs/files. "
+              "Defaults to the top level directory length"),
+        metavar=('workers'), dest='workers', default=None, type=int)
+    create_deep_dir_with_files_parser.add_argument(
+        '--report-interval',
+        help=("Print the created dirs/files counts and ops/sec every "
+              "'report_interval' seconds. 0 disables the reports"),
+        metavar=('report_interval'), dest='report_interval', default=0,
+        type=int)
     create_deep_dir_with_files_parser.add_argument(
         'dir', metavar='DIR', type=str,
         help="Directory on which operations has to be performed")
@@ -1027,6 +1250,17 @@ if __name__ == "__main__":
                               " separated with space"),
         metavar=('file_types'), dest='file_types', type=str,
         default="txt")
+    create_files_parser.add_argument(
+        '--workers',
+        help=("Number of worker threads creating the dirs/files. "
+              "Defaults to the number of file types"),
+        metavar=('workers'), dest='workers', default=None, type=int)
+    create_files_parser.add_argument(
+        '--report-interval',
+        help=("Print the created dirs/files counts and ops/sec every "
+              "'report_interval' seconds. 0 disables the reports"),
+        metavar=('report_interval'), dest='report_interval', default=0,
+        type=int)
     create_files_parser.add_argument(
         'dir', metavar='DIR', type=str,
         help="Directory on which operations has to be performed")
@@ -1074,6 +1308,10 @@ if __name__ == "__main__":
         '-l', '--log-file',
         help="Redirect the output to specified log file name",
         dest='log_file_name', default=None)
+    stat_parser.add_argument(
+        '--workers',
+        help="Number of worker threads. 1 runs the operations serially",
+        metavar=('workers'), dest='workers', default=1, type=int)
     stat_parser.add_argument(
         'path', metavar='PATH', type=str,
         help="File/Directory for which stat has to be performed")
@@ -1154,6 +1392,10 @@ if __name__ == "__main__":
                            "contents of file",
         metavar=('log_file'), dest='log_file',
         type=str, default=default_log_file)
+    read_parser.add_argument(
+        '--workers',
+        help="Number of worker threads. 1 runs the operations serially",
+        metavar=('workers'), dest='workers', default=1, type=int)
     read_parser.add_argument(
         'dir', metavar='DIR', type=str,
         help="Directory on which operations has to be performed")
@@ -1227,6 +1469,10 @@ if __name__ == "__main__":
         '--dest-dir', help="Output directory to copy files/dirs",
         metavar=('dest_dir'), dest='dest_dir',
         type=str)
+    copy_parser.add_argument(
+        '--workers',
+        help="Number of worker threads. 1 runs the operations serially",
+        metavar=('workers'), dest='workers', default=1, type=int)
     copy_parser.add_argument(
         'src_dir', metavar='src_dir', type=str,
         help="Directory on which operations has to be performed")
@@ -1237,6 +1483,10 @@ if __name__ == "__main__":
         'delete',
         help=("Delete all the files/dirs under 'dir'"),
         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    delete_parser.add_argument(
+        '--workers',
+        help="Number of worker threads. 1 runs the operations serially",
+        metavar=('workers'), dest='workers', default=1, type=int)
     delete_parser.add_argument(
         'dir', metavar='DIR', type=str,
         help="Directory on which operations has to be performed")
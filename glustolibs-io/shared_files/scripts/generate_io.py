@@ -22,7 +22,6 @@ Script for generating IO on client
 from __future__ import print_function
 import argparse
 import datetime
-import multiprocessing
 import os
 import re
 import shutil
@@ -31,7 +30,6 @@ import subprocess
 import sys
 import tempfile
 import time
-import yaml
 
 ONE_GB_BYTES = float(1024 ** 3)
 
@@ -242,6 +240,10 @@ def start_populate_data(mount_point, io_dict, percent_to_fill, timeout):
         bool: returns True, if IO succeeds. False, otherwise
     """
 
+    # Heavy modules are imported by the functions using them, to keep the
+    # startup of the other operations fast
+    import multiprocessing
+
     dirname = mount_point
     m = multiprocessing.Manager()
     event = m.Event()
@@ -331,6 +333,8 @@ def call_start_populate_data(args):
     timeout = args.t
     log_file = args.l
 
+    import yaml
+
     # Collects config data from multiple config files
     config_data = {}
     for config_file in config_file_list:
@@ -17,43 +17,101 @@
 
 """
 A tool to monitor and log memory consumption processes.
+
+The processes are sampled from /proc: one tick reads the stat, statm and fd
+directory of all the processes of the given names, the CPU usage is the
+share of a CPU used since the previous tick.
 """
 from __future__ import print_function
 
 import argparse
 import csv
-from time import sleep
-import subprocess
+import os
+import time
+
+CSV_HEADER = ['Time stamp', 'Process ID', 'CPU Usage', 'Memory Usage',
+              'Virtual Memory', 'Threads', 'FDs']
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE_MB = os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0)
+
+
+def get_pids(proc_names):
+    """
+    Get the PIDs of the processes whose executable has one of the names,
+    in the format {proc_name: [pid, ...]}
+    """
+    pids = dict((proc_name, []) for proc_name in proc_names)
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/%s/cmdline' % entry, 'rb') as cmdline:
+                argv0 = cmdline.read().split(b'\0')[0]
+        except (IOError, OSError):
+            continue
+        name = os.path.basename(argv0.decode('utf-8', 'replace'))
+        if name in pids:
+            pids[name].append(int(entry))
+    return pids
 
 
-def run_command(cmd):
+def read_process(pid):
     """
-    Run command using Popen and return output
+    Get the CPU time in clock ticks, RSS and VSZ in MB, number of threads
+    and number of open fds of a process, None if it has exited.
     """
-    ret = subprocess.Popen(cmd, stdout=subprocess.PIPE,
-                           stderr=subprocess.PIPE, shell=True)
-    output = ret.stdout.read().decode('utf8').split('\n')[:-1]
-    return output
+    try:
+        with open('/proc/%d/stat' % pid) as stat_file:
+            # The fields after the command name, which may have spaces
+            fields = stat_file.read().rsplit(')', 1)[1].split()
+        with open('/proc/%d/statm' % pid) as statm_file:
+            statm = statm_file.read().split()
+        fds = len(os.listdir('/proc/%d/fd' % pid))
+    except (IOError, OSError):
+        return None
+    return {'cpu_ticks': int(fields[11]) + int(fields[12]),
+            'rss': int(statm[1]) * PAGE_SIZE_MB,
+            'vsz': int(statm[0]) * PAGE_SIZE_MB,
+            'threads': int(fields[17]),
+            'fds': fds}
 
 
-def get_memory_and_cpu_consumption(proc_name):
+def get_memory_and_cpu_consumption(proc_names, previous, elapsed):
     """
-    Get the memory and cpu consumed by a given process
+    Sample all the processes of the given names once
+
+    Args:
+        proc_names (list): Names of the processes
+        previous (dict): CPU ticks of every pid at the previous tick,
+            updated with the ones of this tick
+        elapsed (float): Seconds since the previous tick
+
+    Returns:
+        dict: Rows to log for every process name, in the format
+            {proc_name: [[pid, cpu %, rss, vsz, threads, fds], ...]}
     """
-    # The command gives an output as shown below:
-    # [2020-08-07 09:34:48] 16422 0.0 9.99609
-    #
-    # Where,
-    # [2020-08-07 09:34:48] is UTC timestamp.
-    # 16422 is the process ID.
-    # 0.0 is the CPU usage.
-    # 9.99609 is memory consumption in MB.
-    cmd = ("ps u -p `pgrep " + proc_name + "` | "
-           "awk 'NR>1 && $11~/" + proc_name + "$/{print "
-           "strftime(\"[%Y-%d-%m %H:%M:%S]\", "
-           "systime(), 1), $2,$3,$6/1024}'")
-    memory_and_cpu_consumed = run_command(cmd)
-    return memory_and_cpu_consumed
+    rows = dict((proc_name, []) for proc_name in proc_names)
+    current = {}
+    for proc_name, pids in get_pids(proc_names).items():
+        for pid in pids:
+            info = read_process(pid)
+            if info is None:
+                continue
+            current[pid] = info['cpu_ticks']
+            if pid in previous and elapsed > 0:
+                cpu_usage = ((info['cpu_ticks'] - previous[pid]) * 100.0 /
+                             (CLOCK_TICKS * elapsed))
+            else:
+                # First time the process is seen, no usage to compute yet
+                cpu_usage = 0.0
+            rows[proc_name].append([pid, round(cpu_usage, 1),
+                                    round(info['rss'], 5),
+                                    round(info['vsz'], 5), info['threads'],
+                                    info['fds']])
+    previous.clear()
+    previous.update(current)
+    return rows
 
 
 def main():
@@ -65,10 +123,12 @@ def main():
         description="A tool to log memory usage of a given process"
         )
     parser.add_argument(
-        "-p", "--process_name", type=str, dest="process_name", required=True,
-        help="Name of process for which cpu and memory is to be logged")
+        "-p", "--process_name", type=str, dest="process_names", nargs='+',
+        required=True,
+        help="Names of processes for which cpu and memory is to be logged, "
+             "each to its own <process_name>.csv")
     parser.add_argument(
-        "-i", "--interval", type=int, dest="interval", default=60,
+        "-i", "--interval", type=float, dest="interval", default=60,
         help="Time interval to wait between consecutive logs(Default:60)")
     parser.add_argument(
         "-c", "--count", type=int, dest="count", default=10,
@@ -78,30 +138,41 @@ def main():
         help="Test name for which memory is logged")
     args = parser.parse_args()
 
-    # Declare all three parameters
-    process_name = args.process_name
-    count = args.count
-    interval = args.interval
-
-    # Generating CSV file header
-    with open('{}.csv'.format(process_name), 'a') as file:
-        csv_writer_obj = csv.writer(file)
-        csv_writer_obj.writerow([args.testname, '', '', ''])
-        csv_writer_obj.writerow([
-            'Time stamp', 'Process ID', 'CPU Usage', 'Memory Usage'])
-
-        # Taking memory output for a given
-        # number of times
-        for counter in range(0, count):
+    # Generating CSV file headers
+    files, csv_writers = [], {}
+    for process_name in args.process_names:
+        csv_file = open('{}.csv'.format(process_name), 'a')
+        files.append(csv_file)
+        csv_writers[process_name] = csv.writer(csv_file)
+        csv_writers[process_name].writerow(
+            [args.testname] + [''] * (len(CSV_HEADER) - 1))
+        csv_writers[process_name].writerow(CSV_HEADER)
+
+    # Baseline of the CPU time of the processes
+    previous = {}
+    last_tick = time.time()
+    get_memory_and_cpu_consumption(args.process_names, previous, 0)
+
+    # Taking memory output for a given number of times
+    try:
+        for counter in range(0, args.count):
+            time.sleep(max(0, last_tick + args.interval - time.time()))
+            now = time.time()
+            rows = get_memory_and_cpu_consumption(
+                args.process_names, previous, now - last_tick)
+            last_tick = now
             print("Iteration: {}".format(counter))
-            data = get_memory_and_cpu_consumption(process_name)
-
-            # Logging information to csv file
-            for line in data:
-                info = line.split(" ")
-                csv_writer_obj.writerow([" ".join(info[:2]), info[2],
-                                         info[3], info[4]])
-                sleep(interval)
+
+            # Logging information to csv files
+            timestamp = time.strftime("[%Y-%d-%m %H:%M:%S]", time.gmtime())
+            for process_name, process_rows in rows.items():
+                for row in process_rows:
+                    csv_writers[process_name].writerow([timestamp] + row)
+            for csv_file in files:
+                csv_file.flush()
+    finally:
+        for csv_file in files:
+            csv_file.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+    Description: Benchmark of the text file creation of file_dir_ops.py.
+
+    Creates files with the per-character content generation used before
+    (np.random.choice over a list of characters joined in a str) and with
+    file_dir_ops.get_random_data, and prints the files/sec of both.
+
+    Example:
+        python bench_file_content.py --dir /dev/shm/bench -n 2000 -s 10k
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import shutil
+import string
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                os.pardir, os.pardir, 'scripts'))
+import file_dir_ops  # noqa: E402
+
+
+def legacy_random_data(size, chars=string.printable):
+    """Content generation of file_dir_ops.py before get_random_data"""
+    return ''.join(np.random.choice(list(chars), size)).encode()
+
+
+def run(dir_path, num_of_files, file_size):
+    """Create the files in a fresh dir_path and return the files/sec"""
+    if os.path.exists(dir_path):
+        shutil.rmtree(dir_path)
+    start = time.time()
+    rc = file_dir_ops._create_files(dir_path, num_of_files,
+                                    fixed_file_size=file_size,
+                                    file_types='txt')
+    elapsed = time.time() - start
+    shutil.rmtree(dir_path)
+    if rc:
+        sys.exit("Failed to create the files under %s" % dir_path)
+    return num_of_files / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the file content generation of "
+                    "file_dir_ops.py")
+    parser.add_argument('--dir', default='/dev/shm/bench_file_content',
+                        help="Dir to create the files in (preferably on a "
+                             "tmpfs). Removed after each run.")
+    parser.add_argument('-n', '--num-of-files', type=int, default=2000,
+                        help="Number of files to create per run")
+    parser.add_argument('-s', '--file-size', default='10k',
+                        choices=['1k', '10k', '512k', '1M'],
+                        help="Size of the files")
+    args = parser.parse_args()
+
+    new_random_data = file_dir_ops.get_random_data
+    file_dir_ops.get_random_data = legacy_random_data
+    before = run(args.dir, args.num_of_files, args.file_size)
+    file_dir_ops.get_random_data = new_random_data
+    after = run(args.dir, args.num_of_files, args.file_size)
+
+    print("%d files of %s" % (args.num_of_files, args.file_size))
+    print("before: %10.1f files/sec" % before)
+    print("after:  %10.1f files/sec" % after)
+    print("speedup: %.1fx" % (after / before))
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+    Description: Benchmark of the startup time of the io scripts.
+
+    Runs '<script> <sub command> --help' for every sub command of
+    file_dir_ops.py and '<script> --help' for generate_io.py and
+    fd_writes.py, which loads the script and parses its arguments without
+    doing any operation, and prints the median time of the runs.
+
+    With --baseline-dir, the scripts of that dir (e.g. an older version)
+    are timed as well for comparison.
+
+    Example:
+        python bench_script_startup.py --baseline-dir /tmp/old_scripts
+"""
+
+from __future__ import print_function
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+SCRIPTS = ('file_dir_ops.py', 'generate_io.py', 'fd_writes.py')
+
+
+def get_sub_commands(script_path):
+    """Get the sub commands listed by the --help of the script"""
+    out = subprocess.check_output([sys.executable, script_path, '--help'],
+                                  universal_newlines=True)
+    match = re.search(r'{([^}]*)}', out)
+    if match is None:
+        return [None]
+    return match.group(1).split(',')
+
+
+def time_startup(script_path, sub_command, runs):
+    """Median time in msec of running the script with --help"""
+    cmd = [sys.executable, script_path, '--help']
+    if sub_command is not None:
+        cmd.insert(2, sub_command)
+    timings = []
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(runs):
+            start = time.time()
+            subprocess.check_call(cmd, stdout=devnull, stderr=devnull)
+            timings.append((time.time() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the startup time of the io scripts")
+    parser.add_argument('--scripts-dir',
+                        default=os.path.join(
+                            os.path.dirname(os.path.abspath(__file__)),
+                            os.pardir, os.pardir, 'scripts'),
+                        help="Dir of the scripts to benchmark")
+    parser.add_argument('--baseline-dir',
+                        help="Dir of the scripts to compare with")
+    parser.add_argument('-n', '--runs', type=int, default=10,
+                        help="Number of runs per sub command")
+    args = parser.parse_args()
+
+    header = "%-45s %10s" % ("sub command", "msec")
+    if args.baseline_dir:
+        header += " %10s" % "baseline"
+    print(header)
+    for script in SCRIPTS:
+        script_path = os.path.join(args.scripts_dir, script)
+        for sub_command in get_sub_commands(script_path):
+            line = "%-45s %10.1f" % (
+                "%s %s" % (script, sub_command or ''),
+                time_startup(script_path, sub_command, args.runs))
+            if args.baseline_dir:
+                line += " %10.1f" % time_startup(
+                    os.path.join(args.baseline_dir, script), sub_command,
+                    args.runs)
+            print(line)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+#  Copyright (C) 2020 Red Hat, Inc. <http://www.redhat.com>
+#
+#  This program is free software; you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation; either version 2 of the License, or
+#  any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along
+#  with this program; if not, write to the Free Software Foundation, Inc.,
+#  51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+"""
+    Description: Benchmark of the parsing of the gluster CLI XML outputs.
+
+    Parses synthetic outputs of 'gluster snapshot status --xml',
+    'gluster volume info --xml' and 'gluster volume heal <vol> info --xml'
+    with the nested loops over etree.XML used before and with
+    glustolibs.gluster.xml_parser, for the whole output and for the lookup
+    of one record, and prints the best time of the runs, as the timeit
+    module does. The runs of the two parsers alternate, and the garbage
+    is collected before every run, so that neither gets a warmer or
+    emptier heap than the other.
+
+    Needs glustolibs-gluster installed.
+
+    Example:
+        python bench_xml_parsing.py --snapshots 1000 --volumes 500 \\
+            --heal-entries 100000
+"""
+
+from __future__ import print_function
+import argparse
+import gc
+import time
+import uuid
+try:
+    import xml.etree.cElementTree as etree
+except ImportError:
+    import xml.etree.ElementTree as etree
+
+from glustolibs.gluster.xml_parser import find_xml_record, get_xml_records
+from glustolibs.gluster.heal_ops import _heal_info_brick
+from glustolibs.gluster.snap_ops import _SNAP_STATUS_SCHEMA
+from glustolibs.gluster.volume_ops import _VOLUME_INFO_SCHEMA
+
+
+def _cli_output(body):
+    """Wrap body in the common part of the gluster CLI XML outputs"""
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<cliOutput>\n  <opRet>0</opRet>\n  <opErrno>0</opErrno>\n'
+            '  <opErrstr/>\n%s</cliOutput>\n' % body)
+
+
+def snapshot_status_xml(num_of_snaps, bricks_per_snap=3):
+    """Output of 'gluster snapshot status --xml'"""
+    snaps = []
+    for num in range(num_of_snaps):
+        bricks = "".join(
+            "          <brick>\n"
+            "            <path>server%d:/run/gluster/snaps/%s/brick%d</path>\n"
+            "            <volumeGroup>RHS_vg%d</volumeGroup>\n"
+            "            <pid>%d</pid>\n"
+            "            <lvSize>9.95g</lvSize>\n"
+            "            <lvUsage>3.52</lvUsage>\n"
+            "          </brick>\n"
+            % (brick, uuid.uuid4().hex, brick, brick, 1000 + num)
+            for brick in range(bricks_per_snap))
+        snaps.append(
+            "      <snapshot>\n"
+            "        <name>snap%d</name>\n"
+            "        <uuid>%s</uuid>\n"
+            "        <volCount>1</volCount>\n"
+            "        <volume>\n"
+            "          <brickCount>%d</brickCount>\n%s"
+            "        </volume>\n"
+            "      </snapshot>\n"
+            % (num, uuid.uuid4(), bricks_per_snap, bricks))
+    return _cli_output("  <snapStatus>\n    <snapshots>\n%s    </snapshots>\n"
+                       "  </snapStatus>\n" % "".join(snaps))
+
+
+def volume_info_xml(num_of_volumes, bricks_per_volume=3):
+    """Output of 'gluster volume info --xml'"""
+    volumes = []
+    for num in range(num_of_volumes):
+        bricks = "".join(
+            "          <brick uuid=\"%s\">server%d:/bricks/brick%d/"
+            "vol%d_brick%d<name>server%d:/bricks/brick%d/vol%d_brick%d"
+            "</name><hostUuid>%s</hostUuid><isArbiter>0</isArbiter>"
+            "</brick>\n" % ((uuid.uuid4(), brick, num % 10, num, brick,
+                             brick, num % 10, num, brick, uuid.uuid4()))
+            for brick in range(bricks_per_volume))
+        volumes.append(
+            "      <volume>\n"
+            "        <name>vol%d</name>\n"
+            "        <id>%s</id>\n"
+            "        <status>1</status>\n"
+            "        <statusStr>Started</statusStr>\n"
+            "        <brickCount>%d</brickCount>\n"
+            "        <replicaCount>%d</replicaCount>\n"
+            "        <typeStr>Replicate</typeStr>\n"
+            "        <bricks>\n%s        </bricks>\n"
+            "        <optCount>2</optCount>\n"
+            "        <options>\n"
+            "          <option><name>performance.readdir-ahead</name>"
+            "<value>on</value></option>\n"
+            "          <option><name>transport.address-family</name>"
+            "<value>inet</value></option>\n"
+            "        </options>\n"
+            "      </volume>\n"
+            % (num, uuid.uuid4(), bricks_per_volume, bricks_per_volume,
+               bricks))
+    return _cli_output("  <volInfo>\n    <volumes>\n%s    </volumes>\n"
+                       "    <count>%d</count>\n  </volInfo>\n"
+                       % ("".join(volumes), num_of_volumes))
+
+
+def heal_info_xml(num_of_entries, num_of_bricks=3):
+    """Output of 'gluster volume heal <vol> info --xml'"""
+    bricks = []
+    for brick in range(num_of_bricks):
+        files = "".join(
+            "        <file gfid=\"%s\">/dir%d/file%d</file>\n"
+            % (uuid.uuid4(), num % 100, num)
+            for num in range(num_of_entries // num_of_bricks))
+        bricks.append(
+            "      <brick hostUuid=\"%s\">\n"
+            "        <name>server%d:/bricks/brick0/testvol_brick%d</name>\n"
+            "%s"
+            "        <status>Connected</status>\n"
+            "        <numberOfEntries>%d</numberOfEntries>\n"
+            "      </brick>\n"
+            % (uuid.uuid4(), brick, brick, files,
+               num_of_entries // num_of_bricks))
+    return _cli_output("  <healInfo>\n    <bricks>\n%s    </bricks>\n"
+                       "  </healInfo>\n" % "".join(bricks))
+
+
+def legacy_snap_status(out):
+    """Parsing of get_snap_status before xml_parser"""
+    root = etree.XML(out)
+    snap_status_list = []
+    for snap in root.findall("snapStatus/snapshots/snapshot"):
+        snap_status = {}
+        for element in list(snap):
+            if element.tag == "volume":
+                status = {}
+                status["brick"] = []
+                for elmt in list(element):
+                    if elmt.tag == "brick":
+                        brick_info = {}
+                        for el in list(elmt):
+                            brick_info[el.tag] = el.text
+                        status["brick"].append(brick_info)
+                    else:
+                        status[elmt.tag] = elmt.text
+                snap_status[element.tag] = status
+            else:
+                snap_status[element.tag] = element.text
+        snap_status_list.append(snap_status)
+    return snap_status_list
+
+
+def legacy_snap_status_by_snapname(out, snapname):
+    """Lookup of get_snap_status_by_snapname before xml_parser"""
+    for snap_status in legacy_snap_status(out):
+        if snap_status.get("name") == snapname:
+            return snap_status
+    return None
+
+
+def legacy_volume_info(out):
+    """Parsing of get_volume_info before xml_parser"""
+    root = etree.XML(out)
+    volinfo = {}
+    for volume in root.findall("volInfo/volumes/volume"):
+        for elem in list(volume):
+            if elem.tag == "name":
+                volname = elem.text
+                volinfo[volname] = {}
+            elif elem.tag == "bricks":
+                volinfo[volname]["bricks"] = {}
+                tag_list = [x.tag for x in list(elem) if x]
+                if 'brick' in tag_list:
+                    volinfo[volname]["bricks"]["brick"] = []
+                for el in list(elem):
+                    if el.tag == 'brick':
+                        brick_info_dict = {}
+                        for elmt in list(el):
+                            brick_info_dict[elmt.tag] = elmt.text
+                        (volinfo[volname]["bricks"]["brick"].
+                         append(brick_info_dict))
+            elif elem.tag == "options":
+                volinfo[volname]["options"] = {}
+                for option in elem.findall("option"):
+                    for el in list(option):
+                        if el.tag == "name":
+                            opt = el.text
+                        if el.tag == "value":
+                            volinfo[volname]["options"][opt] = el.text
+            else:
+                volinfo[volname][elem.tag] = elem.text
+    return volinfo
+
+
+def legacy_heal_info(out):
+    """Parsing of get_heal_info before xml_parser"""
+    root = etree.XML(out)
+    heal_info_data = []
+    for brick in root.findall("healInfo/bricks/brick"):
+        brick_heal_info = {}
+        brick_files_to_heal = []
+        file_to_heal_exist = False
+        for element in list(brick):
+            if element.tag == "file":
+                file_to_heal_exist = True
+                file_info = {}
+                file_info[element.attrib['gfid']] = element.text
+                brick_files_to_heal.append(file_info)
+            else:
+                brick_heal_info[element.tag] = element.text
+        if file_to_heal_exist:
+            brick_heal_info['file'] = brick_files_to_heal
+        heal_info_data.append(brick_heal_info)
+    return heal_info_data
+
+
+def new_volume_info(out):
+    """Parsing of get_volume_info with xml_parser"""
+    volinfo = {}
+    for volume in get_xml_records(out, "volInfo/volumes/volume",
+                                  _VOLUME_INFO_SCHEMA):
+        volinfo[volume.pop("name")] = volume
+    return volinfo
+
+
+def timeit(cases, repeat):
+    """Run every (func, arg, ...) of cases repeat times, alternating them,
+    and return the results and the best run time of each case"""
+    results = [None] * len(cases)
+    times = [[] for _ in cases]
+    for run in range(repeat):
+        order = list(range(len(cases)))
+        if run % 2:
+            order.reverse()
+        for index in order:
+            func, args = cases[index][0], cases[index][1:]
+            gc.collect()
+            start = time.time()
+            results[index] = func(*args)
+            times[index].append(time.time() - start)
+    return results, [min(case_times) for case_times in times]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parsing of the gluster XML outputs")
+    parser.add_argument('--snapshots', type=int, default=1000,
+                        help="Number of snapshots in snapshot status")
+    parser.add_argument('--volumes', type=int, default=500,
+                        help="Number of volumes in volume info")
+    parser.add_argument('--heal-entries', type=int, default=100000,
+                        help="Number of entries in heal info")
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+                        help="Number of runs of every case")
+    args = parser.parse_args()
+
+    snap_status = snapshot_status_xml(args.snapshots)
+    volume_info = volume_info_xml(args.volumes)
+    heal_info = heal_info_xml(args.heal_entries)
+    middle_snap = "snap%d" % (args.snapshots // 2)
+    cases = [
+        ("snapshot status, %d snaps" % args.snapshots,
+         (legacy_snap_status, snap_status),
+         (get_xml_records, snap_status, "snapStatus/snapshots/snapshot",
+          _SNAP_STATUS_SCHEMA)),
+        ("snapshot status, lookup of %s" % middle_snap,
+         (legacy_snap_status_by_snapname, snap_status, middle_snap),
+         (find_xml_record, snap_status, "snapStatus/snapshots/snapshot",
+          _SNAP_STATUS_SCHEMA, {'name': middle_snap})),
+        ("volume info, %d volumes" % args.volumes,
+         (legacy_volume_info, volume_info),
+         (new_volume_info, volume_info)),
+        ("heal info, %d entries" % args.heal_entries,
+         (legacy_heal_info, heal_info),
+         (get_xml_records, heal_info, "healInfo/bricks/brick",
+          _heal_info_brick)),
+    ]
+
+    print("%-40s %10s %10s %8s" % ("case", "before", "after", "speedup"))
+    for name, legacy, new in cases:
+        (legacy_result, new_result), (before, after) = timeit(
+            [legacy, new], args.repeat)
+        if legacy_result != new_result:
+            raise SystemExit("%s: the results differ" % name)
+        print("%-40s %9.3fs %9.3fs %7.1fx"
+              % (name, before, after, before / after))
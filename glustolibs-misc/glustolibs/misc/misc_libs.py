@@ -21,7 +21,7 @@ import sys
 import time
 
 from glusto.core import Glusto as g
-from glustolibs.gluster.lib_utils import is_rhel6, is_rhel7
+from glustolibs.gluster.lib_utils import is_rhel6, is_rhel7, run_on_nodes
 
 
 def create_dirs(list_of_nodes, list_of_dir_paths):
@@ -32,27 +32,22 @@ def create_dirs(list_of_nodes, list_of_dir_paths):
         list_of_dir_paths (list): List of dirs abs path.
 
     Returns:
-        bool: True of creation of all dirs on all nodes is successful.
+        NodeResults: Outcome on every node (see lib_utils.run_on_nodes).
+            True of creation of all dirs on all nodes is successful.
             False otherwise.
     """
-    if not isinstance(list_of_nodes, list):
-        list_of_nodes = [list_of_nodes]
-
     if isinstance(list_of_dir_paths, list):
         list_of_dir_paths = ' '.join(list_of_dir_paths)
 
-    _rc = True
-    # Create upload dir on each node
-    for node in list_of_nodes:
-        ret, _, err = g.run(node, "mkdir -p %s" % list_of_dir_paths)
-        if ret != 0:
-            g.log.error("Failed to create the dirs: %s on node: %s - %s" %
-                        (list_of_dir_paths.split(" "), node, err))
-            _rc = False
-    if _rc:
+    # Create upload dir on all the nodes at once
+    results = run_on_nodes(list_of_nodes, "mkdir -p %s" % list_of_dir_paths)
+    for node in results.failed_nodes:
+        g.log.error("Failed to create the dirs: %s on node: %s - %s" %
+                    (list_of_dir_paths.split(" "), node, results[node].err))
+    if results:
         g.log.info("Successfully created dirs: %s on nodes:%s" %
-                   (list_of_dir_paths.split(" "), list_of_nodes))
-    return _rc
+                   (list_of_dir_paths.split(" "), list(results)))
+    return results
 
 
 def path_exists(list_of_nodes, list_of_paths):
@@ -63,28 +58,23 @@ def path_exists(list_of_nodes, list_of_paths):
         list_of_paths (list): List of abs paths to verify if path exist.
 
     Returns:
-        bool: True if all paths exists on all nodes. False otherwise.
+        NodeResults: Outcome on every node (see lib_utils.run_on_nodes).
+            True if all paths exists on all nodes. False otherwise.
     """
-    if not isinstance(list_of_nodes, list):
-        list_of_nodes = [list_of_nodes]
-
     if not isinstance(list_of_paths, list):
         list_of_paths = (list_of_paths.split(" "))
 
-    _rc = True
-    for node in list_of_nodes:
-        for path in list_of_paths:
-            cmd = "ls -l %s" % path
-            ret, _, err = g.run(node, cmd)
-            if ret != 0:
-                g.log.error("Path: %s not found on node: %s - %s" %
-                            (path, node, err))
-                _rc = False
+    # A single ls per node, the missing paths are reported on stderr
+    results = run_on_nodes(list_of_nodes,
+                           "ls -ld %s" % ' '.join(list_of_paths))
+    for node in results.failed_nodes:
+        g.log.error("Paths: %s not found on node: %s - %s" %
+                    (list_of_paths, node, results[node].err))
 
-    if _rc:
+    if results:
         g.log.info("Paths: %s exists on nodes: %s" %
-                   (list_of_paths, list_of_nodes))
-    return _rc
+                   (list_of_paths, list(results)))
+    return results
 
 
 def upload_scripts(list_of_nodes, list_of_scripts_abs_path,
@@ -195,27 +185,21 @@ def yum_install_packages(list_of_nodes, yum_packages):
         yum_packages (list): List of yum packages.
 
     Returns:
-        bool: True if installation of packages is successful on all nodes.
+        NodeResults: Outcome on every node (see lib_utils.run_on_nodes).
+            True if installation of packages is successful on all nodes.
             False otherwise.
     """
-    if not isinstance(list_of_nodes, list):
-        list_of_nodes = [list_of_nodes]
-
     if isinstance(yum_packages, list):
         yum_packages = ' '.join(yum_packages)
 
-    _rc = True
-    for node in list_of_nodes:
-        cmd = "yum -y install %s" % yum_packages
-        ret, _, err = g.run(node, cmd)
-        if ret != 0:
-            g.log.error("Unable to install yum packages: %s on node: %s - %s" %
-                        (yum_packages, node, err))
-            _rc = False
-    if _rc:
+    results = run_on_nodes(list_of_nodes, "yum -y install %s" % yum_packages)
+    for node in results.failed_nodes:
+        g.log.error("Unable to install yum packages: %s on node: %s - %s" %
+                    (yum_packages, node, results[node].err))
+    if results:
         g.log.info("Successfully installed yum packages: %s on nodes: %s" %
-                   (yum_packages, list_of_nodes))
-        return _rc
+                   (yum_packages, list(results)))
+    return results
 
 
 def yum_remove_packages(list_of_nodes, yum_packages):
@@ -548,18 +532,15 @@ def drop_caches(hosts):
                       dropped (Servers/ Clients)
 
     Returns:
-        bool: True , post successful completion.Else,False.
+        NodeResults: Outcome on every host (see lib_utils.run_on_nodes).
+            True , post successful completion.Else,False.
     """
     cmd = "echo 3 > /proc/sys/vm/drop_caches"
-    results = g.run_parallel(hosts, cmd)
-    _rc = True
-    for host, ret_values in results.items():
-        retcode, _, _ = ret_values
-        if retcode != 0:
-            g.log.error("Unable to drop cache on host %s", host)
-            _rc = False
+    results = run_on_nodes(hosts, cmd)
+    for host in results.failed_nodes:
+        g.log.error("Unable to drop cache on host %s", host)
 
-    return _rc
+    return results
 
 
 def daemon_reload(node):